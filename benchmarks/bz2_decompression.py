@@ -0,0 +1,113 @@
+import argparse
+import bz2
+import os
+import random
+import tarfile
+import tempfile
+import time
+from functools import partial
+
+from src.parallel_bz2 import ParallelBZ2File
+
+
+def _generate_archive(archive_path: str, size_mb: int) -> None:
+    """Generate bzip2 compressed text of roughly specified uncompressed size"""
+
+    rng = random.Random(0)
+    words = [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))
+        )
+        for _ in range(20000)
+    ]
+
+    with bz2.open(archive_path, "wb", compresslevel=9) as file:
+        written = 0
+        while written < size_mb * 1024**2:
+            line = (" ".join(rng.choices(words, k=12)) + "\n").encode()
+            file.write(line)
+            written += len(line)
+
+
+def _time_read(open_file) -> tuple[float, int]:
+    """Read file object to the end and return elapsed seconds and decompressed bytes"""
+
+    start_time = time.perf_counter()
+    total = 0
+    with open_file() as file:
+        while chunk := file.read(1024**2):
+            total += len(chunk)
+    return time.perf_counter() - start_time, total
+
+
+def run_benchmark(archive_path: str, workers: int, repeat: int) -> None:
+    """Compare single-threaded and parallel bzip2 decompression of an archive"""
+
+    size_mb = os.path.getsize(archive_path) / 1024**2
+    print(f"Archive: {archive_path} ({size_mb:.1f} MB compressed), workers: {workers}")
+
+    candidates = {
+        "bz2.open": partial(bz2.open, archive_path, "rb"),
+        "ParallelBZ2File": partial(ParallelBZ2File, archive_path, max_workers=workers),
+    }
+
+    timings = {}
+    for name, open_file in candidates.items():
+        elapsed, total = min(_time_read(open_file) for _ in range(repeat))
+        timings[name] = elapsed
+        print(
+            f"{name:<16} {elapsed:7.2f}s  {total / 1024**2 / elapsed:8.1f} MB/s decompressed"
+        )
+
+    print(f"Speedup: {timings['bz2.open'] / timings['ParallelBZ2File']:.2f}x")
+
+    # Archives are also checked end to end through tarfile stream mode
+    if tarfile.is_tarfile(archive_path):
+        with (
+            ParallelBZ2File(archive_path, max_workers=workers) as file,
+            tarfile.open(fileobj=file, mode="r|") as tar,
+        ):
+            members = sum(1 for _ in tar)
+        print(f"Tar members read through ParallelBZ2File: {members}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark parallel bzip2 decompression against the bz2 module",
+    )
+    parser.add_argument(
+        "archive",
+        type=str,
+        nargs="?",
+        help="Path to .bz2 archive, a synthetic one is generated if omitted",
+    )
+    parser.add_argument(
+        "--size-mb",
+        type=int,
+        default=64,
+        help="Uncompressed size of generated archive in MB",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of decompression processes",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs, best one is reported",
+    )
+    args = parser.parse_args()
+
+    archive_path = args.archive
+    if archive_path is None:
+        archive_path = os.path.join(
+            tempfile.gettempdir(), f"synthetic-docs-{args.size_mb}mb.bz2"
+        )
+        if not os.path.exists(archive_path):
+            print(f"Generating {args.size_mb} MB synthetic archive")
+            _generate_archive(archive_path, args.size_mb)
+
+    run_benchmark(archive_path, args.workers, args.repeat)
@@ -0,0 +1,248 @@
+import argparse
+import os
+import random
+import tarfile
+from functools import lru_cache
+
+SPHINX_UNDERLINES = ["*", "=", "-"]
+INFO_UNDERLINES = ["*", "=", "-", "."]
+
+
+@lru_cache
+def _words(count: int = 5000) -> list[str]:
+    """Generate a fixed vocabulary of random lowercase words"""
+
+    rng = random.Random(0)
+    return [
+        "".join(
+            rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))
+        )
+        for _ in range(count)
+    ]
+
+
+def _body_lines(rng: random.Random, words: list[str]) -> list[str]:
+    """Generate one paragraph, code block or list of body text"""
+
+    kind = rng.random()
+    if kind < 0.2:
+        lines = ["   >>> " + " ".join(rng.choices(words, k=rng.randint(2, 6)))]
+        lines += [
+            "   " + " ".join(rng.choices(words, k=rng.randint(2, 8)))
+        ] * rng.randint(0, 3)
+    elif kind < 0.35:
+        lines = [
+            "* " + " ".join(rng.choices(words, k=rng.randint(4, 10)))
+            for _ in range(rng.randint(2, 5))
+        ]
+    else:
+        lines = [
+            " ".join(rng.choices(words, k=rng.randint(8, 14)))
+            for _ in range(rng.randint(2, 6))
+        ]
+    return lines + [""]
+
+
+def generate_text(
+    size_bytes: int,
+    separator_density: float = 20.0,
+    underlines: list[str] = SPHINX_UNDERLINES,
+    seed: int = 0,
+) -> str:
+    """
+    Generate Sphinx-style plain text docs of roughly specified size
+
+    Args:
+        size_bytes (int): Approximate size of generated text in bytes
+        separator_density (float): Section underlines per 1000 lines
+        underlines (list[str]): Characters used for section underlines
+        seed (int): Seed of the random generator
+
+    Returns:
+        str: Generated docs text
+    """
+
+    rng = random.Random(seed)
+    words = _words()
+    lines = [" ".join(rng.choices(words, k=4)), ""]
+    written = 0
+    sections = 0
+    while written < size_bytes:
+        # Start new section once the lines written call for another separator
+        if sections < len(lines) * separator_density / 1000:
+            sections += 1
+            title = " ".join(rng.choices(words, k=rng.randint(1, 5))).capitalize()
+            chunk = [title, rng.choice(underlines) * len(title), ""]
+        else:
+            chunk = _body_lines(rng, words)
+
+        lines.extend(chunk)
+        written += sum(len(line) + 1 for line in chunk)
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_info(
+    package: str,
+    size_bytes: int,
+    separator_density: float = 20.0,
+    seed: int = 0,
+) -> str:
+    """
+    Generate GNU Info file of roughly specified size
+
+    Nodes are separated by '\\x1f' node headers, each with a chapter title, and the file
+    ends with a tag table of node byte offsets
+
+    Args:
+        package (str): Package name used in node headers
+        size_bytes (int): Approximate size of generated file in bytes
+        separator_density (float): Section underlines per 1000 lines
+        seed (int): Seed of the random generator
+
+    Returns:
+        str: Generated Info file content
+    """
+
+    file_name = f"{package}.info"
+    node_size = max(1024, size_bytes // 50)
+    node_count = max(1, size_bytes // node_size)
+    node_names = ["Top"] + [f"Node {index}" for index in range(1, node_count)]
+
+    parts = [
+        f"This is {file_name}, produced by makeinfo version 7.1 from {package}.texi.\n\n"
+    ]
+    offsets = []
+    offset = len(parts[0].encode())
+    for index, node in enumerate(node_names):
+        up = "(dir)" if node == "Top" else "Top"
+        header = f"\x1f\nFile: {file_name},  Node: {node}"
+        if index + 1 < len(node_names):
+            header += f",  Next: {node_names[index + 1]}"
+        if index > 0:
+            header += f",  Prev: {node_names[index - 1]}"
+        header += f",  Up: {up}\n\n"
+
+        title = f"{index} {node}"
+        body = generate_text(
+            node_size,
+            separator_density,
+            INFO_UNDERLINES,
+            seed=seed * 100003 + index,
+        )
+        part = f"{header}{title}\n{'*' * len(title)}\n\n{body}"
+
+        offsets.append((node, offset))
+        offset += len(part.encode())
+        parts.append(part)
+
+    tag_table = "".join(
+        f"Node: {node}\x7f{node_offset}\n" for node, node_offset in offsets
+    )
+    parts.append(f"\x1f\nTag Table:\n{tag_table}\x1f\nEnd Tag Table\n")
+    return "".join(parts)
+
+
+def build_corpus(
+    root: str,
+    size_mb: float = 16.0,
+    files: int = 200,
+    separator_density: float = 20.0,
+    info_packages: int = 8,
+) -> dict[str, str]:
+    """
+    Build a synthetic docs tree laid out like the extracted downloads of all sources
+
+    Python docs go to one version directory with the Sphinx text layout, GNU docs to one
+    Info file per package, the Python version directory is also packed as .tar.bz2.
+    Each source gets a versions.yaml so its config can be created with root as cwd
+
+    Args:
+        root (str): Directory the corpus is created in
+        size_mb (float): Combined size of Python and GNU docs in MB
+        files (int): Number of Python docs files
+        separator_density (float): Section underlines per 1000 lines
+        info_packages (int): Number of GNU Info files
+
+    Returns:
+        dict[str, str]: Paths of 'python_version_dir', 'gnu_extracted' and 'archive'
+    """
+
+    python_extracted = os.path.join(root, "src", "python_docs", "extracted")
+    version_dir = os.path.join(python_extracted, "python-3.12.0-docs-text")
+    gnu_extracted = os.path.join(root, "src", "gnu_docs", "extracted")
+    archive_path = os.path.join(root, "python-3.12.0-docs-text.tar.bz2")
+
+    python_bytes = int(size_mb * 1024**2 * 0.75)
+    gnu_bytes = int(size_mb * 1024**2) - python_bytes
+
+    for index in range(files):
+        file_path = os.path.join(
+            version_dir,
+            ["library", "reference", "howto", "tutorial"][index % 4],
+            f"doc{index:04d}.txt",
+        )
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(
+                generate_text(python_bytes // files, separator_density, seed=index)
+            )
+
+    os.makedirs(gnu_extracted, exist_ok=True)
+    for index in range(info_packages):
+        package = f"package{index:02d}"
+        with open(
+            os.path.join(gnu_extracted, f"{package}.info"), "w", encoding="utf-8"
+        ) as file:
+            file.write(
+                generate_info(
+                    package, gnu_bytes // info_packages, separator_density, seed=index
+                )
+            )
+
+    for project in ("python_docs", "gnu_docs"):
+        with open(os.path.join(root, "src", project, "versions.yaml"), "w") as file:
+            file.write("url: ''\nversions: {}\n")
+
+    with tarfile.open(archive_path, "w:bz2") as tar:
+        tar.add(version_dir, arcname=os.path.basename(version_dir))
+
+    return {
+        "python_version_dir": version_dir,
+        "gnu_extracted": gnu_extracted,
+        "archive": archive_path,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Python and GNU docs corpus",
+    )
+    parser.add_argument(
+        "root",
+        type=str,
+        help="Directory the corpus is created in",
+    )
+    parser.add_argument(
+        "--size-mb",
+        type=float,
+        default=16.0,
+        help="Combined size of generated docs in MB",
+    )
+    parser.add_argument(
+        "--files",
+        type=int,
+        default=200,
+        help="Number of Python docs files",
+    )
+    parser.add_argument(
+        "--separator-density",
+        type=float,
+        default=20.0,
+        help="Section underlines per 1000 lines",
+    )
+    args = parser.parse_args()
+
+    paths = build_corpus(args.root, args.size_mb, args.files, args.separator_density)
+    for name, path in paths.items():
+        print(f"{name}: {path}")
@@ -0,0 +1,329 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from benchmarks.corpus import build_corpus
+from src.config import OutputGroup
+from src.docs_processor import (
+    _extract_sections,
+    _process_output_group,
+    process_documentation,
+    split_sections,
+)
+from src.segmenter import _is_separator_line
+from src.sources import load_source
+from src.utils import _extract_archive
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _best_time(func: Callable[[], int], repeat: int) -> tuple[float, int]:
+    """Run function repeatedly and return best elapsed seconds and its item count"""
+
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        items = func()
+        timings.append((time.perf_counter() - start_time, items))
+    return min(timings)
+
+
+def _input_bytes(paths: list[str]) -> int:
+    """Sum sizes of files"""
+
+    return sum(os.path.getsize(path) for path in paths)
+
+
+def _corpus_files(path: str) -> list[str]:
+    """List all files below path in deterministic order"""
+
+    return sorted(
+        os.path.join(root, file_name)
+        for root, _, files in os.walk(path)
+        for file_name in files
+    )
+
+
+def run_benchmarks(root: str, repeat: int, workers: int) -> dict[str, dict]:
+    """
+    Time pipeline hot paths on a synthetic corpus
+
+    Args:
+        root (str): Corpus directory created by build_corpus
+        repeat (int): Number of timed runs per case, best one is reported
+        workers (int): Number of processes for decompression and processing
+
+    Returns:
+        dict[str, dict]: Seconds, items, items per second and MB per second by case
+    """
+
+    python_source = load_source("python")
+    gnu_source = load_source("gnu")
+    python_config = python_source.config_class(
+        process_workers=workers, decompress_workers=workers
+    )
+    gnu_config = gnu_source.config_class(
+        process_workers=workers, decompress_workers=workers
+    )
+
+    version_dir = os.path.join(python_config.extracted_path, "python-3.12.0-docs-text")
+    python_files = _corpus_files(version_dir)
+    gnu_files = _corpus_files(gnu_config.extracted_path)
+    archive_path = os.path.join(root, "python-3.12.0-docs-text.tar.bz2")
+
+    def extract_sections() -> int:
+        return sum(
+            1
+            for file_path in python_files
+            for _ in _extract_sections(file_path, python_config, python_source.segment)
+        ) + sum(
+            1
+            for file_path in gnu_files
+            for _ in _extract_sections(file_path, gnu_config, gnu_source.segment)
+        )
+
+    lines = []
+    for file_path in python_files + gnu_files:
+        with open(file_path, "r", encoding="utf-8") as file:
+            lines.extend(line.strip() for line in file)
+
+    def is_separator_line() -> int:
+        separators = gnu_config.section_separators
+        for line in lines:
+            _is_separator_line(line, separators)
+        return len(lines)
+
+    output_dir = os.path.join(root, "output")
+
+    def process_output_group() -> int:
+        group = OutputGroup(
+            output_file=os.path.join(output_dir, "python-03.12.00.jsonl"),
+            label="version 3.12",
+            input_files=python_files,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            _process_output_group(
+                group,
+                python_config,
+                (
+                    _extract_sections(file_path, python_config, split_sections)
+                    for file_path in python_files
+                ),
+            )
+        with open(group.output_file, "rb") as file:
+            return sum(1 for _ in file)
+
+    def extract_archive() -> int:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        roots = _extract_archive(archive_path, output_dir, workers)
+        return len(_corpus_files(os.path.join(output_dir, *roots)))
+
+    def full_process_documentation() -> int:
+        # Remove outputs so the manifest does not skip any group
+        for config in (python_config, gnu_config):
+            shutil.rmtree(config.output_path, ignore_errors=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_documentation(
+                [(python_source, python_config), (gnu_source, gnu_config)], workers
+            )
+
+        records = 0
+        for config in (python_config, gnu_config):
+            for output_file in _corpus_files(config.output_path):
+                if output_file.endswith(".jsonl"):
+                    with open(output_file, "rb") as file:
+                        records += sum(1 for _ in file)
+        return records
+
+    all_bytes = _input_bytes(python_files + gnu_files)
+    cases = {
+        "_extract_sections": (extract_sections, all_bytes),
+        "_is_separator_line": (is_separator_line, all_bytes),
+        "_process_output_group": (process_output_group, _input_bytes(python_files)),
+        "_extract_archive": (extract_archive, _input_bytes(python_files)),
+        "process_documentation": (full_process_documentation, all_bytes),
+    }
+
+    results = {}
+    for name, (func, size) in cases.items():
+        elapsed, items = _best_time(func, repeat)
+        results[name] = {
+            "seconds": round(elapsed, 4),
+            "items": items,
+            "items_per_second": round(items / max(elapsed, 1e-9), 1),
+            "mb_per_second": round(size / 1024**2 / max(elapsed, 1e-9), 2),
+        }
+        print(
+            f"{name:<24} {elapsed:8.3f}s  {items:>9} items  "
+            f"{results[name]['items_per_second']:>12,.0f} items/s  "
+            f"{results[name]['mb_per_second']:>8.1f} MB/s"
+        )
+
+    return results
+
+
+def _machine_info(workers: int) -> dict[str, str]:
+    """Describe machine and interpreter a run was measured on"""
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count()),
+        "workers": str(workers),
+    }
+
+
+def check_regressions(
+    results: dict[str, dict],
+    baseline: dict,
+    tolerance: float,
+) -> list[str]:
+    """
+    Compare throughput of every case against the saved baseline
+
+    Args:
+        results (dict[str, dict]): Results of the current run
+        baseline (dict): Saved baseline with 'machine' and 'results'
+        tolerance (float): Allowed relative throughput drop (e.g. 0.25 for 25%)
+
+    Returns:
+        list[str]: Descriptions of cases slower than allowed
+    """
+
+    regressions = []
+    for name, result in results.items():
+        expected = baseline["results"].get(name)
+        if not expected:
+            continue
+
+        ratio = result["mb_per_second"] / max(expected["mb_per_second"], 1e-9)
+        print(f"{name:<24} {ratio:6.2f}x baseline")
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{name}: {result['mb_per_second']} MB/s vs baseline "
+                f"{expected['mb_per_second']} MB/s"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark docs pipeline hot paths on a synthetic corpus",
+    )
+    parser.add_argument(
+        "--size-mb",
+        type=float,
+        default=16.0,
+        help="Combined size of generated docs in MB",
+    )
+    parser.add_argument(
+        "--files",
+        type=int,
+        default=200,
+        help="Number of generated Python docs files",
+    )
+    parser.add_argument(
+        "--separator-density",
+        type=float,
+        default=20.0,
+        help="Section underlines per 1000 lines",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes for decompression and processing",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs, best one is reported",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=BASELINE_FILE,
+        help="Path of baseline results file",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save results of this run as the new baseline",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error if any case is slower than the baseline allows",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative throughput drop against the baseline",
+    )
+    args = parser.parse_args()
+
+    baseline_path = os.path.abspath(args.baseline)
+    corpus_root = tempfile.mkdtemp(prefix="docs-benchmark-")
+    working_dir = os.getcwd()
+    try:
+        print(
+            f"Generating {args.size_mb} MB corpus "
+            f"(separator density {args.separator_density}/1000 lines)"
+        )
+        build_corpus(corpus_root, args.size_mb, args.files, args.separator_density)
+
+        # Docs configs resolve their paths from the working directory
+        os.chdir(corpus_root)
+        results = run_benchmarks(corpus_root, args.repeat, args.workers)
+    finally:
+        os.chdir(working_dir)
+        shutil.rmtree(corpus_root, ignore_errors=True)
+
+    settings = {
+        "size_mb": args.size_mb,
+        "files": args.files,
+        "separator_density": args.separator_density,
+    }
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "machine": _machine_info(args.workers),
+                    "settings": settings,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+        print(f"Saved baseline to {baseline_path}")
+
+    if args.check:
+        if not os.path.exists(baseline_path):
+            sys.exit(f"Baseline file does not exist: {baseline_path}")
+
+        with open(baseline_path, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+        if baseline.get("machine") != _machine_info(args.workers):
+            print("Warning: baseline was measured on a different machine or setup")
+        if baseline.get("settings") != settings:
+            print("Warning: baseline was measured with different corpus settings")
+
+        regressions = check_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("Performance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No performance regressions")
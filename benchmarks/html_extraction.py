@@ -0,0 +1,255 @@
+import argparse
+import functools
+import random
+import time
+from typing import Any, Callable
+
+from bs4 import BeautifulSoup
+
+from src.config import VersionCheck
+from src.gnu_docs import version_updater as gnu_updater
+from src.python_docs import version_updater as python_updater
+from src.utils import _parse_update_date
+
+# Version page parsers by source
+PARSERS = {
+    "python": python_updater.parse_version_page,
+    "gnu": gnu_updater.parse_version_page,
+}
+
+# Checks pages of a source are parsed for
+CHECKS = {
+    "python": VersionCheck(
+        key="03.12",
+        label="3.12",
+        url="https://docs.python.org/3.12/download.html",
+        metadata={},
+    ),
+    "gnu": VersionCheck(
+        key="bash",
+        label="bash",
+        url="https://www.gnu.org/software/bash/manual/",
+        metadata={},
+    ),
+}
+
+
+def _full_parse_python(content: bytes, check: VersionCheck) -> dict[str, Any]:
+    """Parse a Python docs page from a full BeautifulSoup tree"""
+
+    soup = BeautifulSoup(content, "html.parser")
+    update_element = None
+    p_element = soup.find("p")
+    if p_element is not None:
+        update_element = p_element.find_next("b")
+
+    title_tag = soup.find("title")
+    title = title_tag.text if title_tag else None
+    links = [link["href"] for link in soup.find_all("a", href=True)]
+
+    return {
+        "last_update": (
+            _parse_update_date(update_element.text.strip()) if update_element else None
+        ),
+        "specific_version": python_updater._extract_specific_version(
+            title, check.label
+        ),
+        "download_url": python_updater._find_download_link(links, check.label),
+    }
+
+
+def _full_parse_gnu(content: bytes, check: VersionCheck) -> dict[str, Any]:
+    """Parse a GNU manual page from a full BeautifulSoup tree"""
+
+    soup = BeautifulSoup(content, "html.parser")
+    last_updated = None
+    for address_element in soup.find_all("address"):
+        if "last updated" in address_element.text:
+            last_updated = _parse_update_date(address_element.text.strip())
+
+    links = [link["href"] for link in soup.find_all("a", href=True)]
+    return {
+        "last_update": last_updated,
+        "download_url": gnu_updater._find_download_link(links, check.url),
+    }
+
+
+# Full tree parsers the version page parsers are compared to, by source
+FULL_PARSERS = {
+    "python": _full_parse_python,
+    "gnu": _full_parse_gnu,
+}
+
+
+def _navigation(rng: random.Random, count: int) -> str:
+    """Generate a list of navigation links"""
+
+    return "".join(
+        f'<li><a class="reference internal" href="{rng.randrange(10**6)}.html">'
+        f"Section {index}</a></li>\n"
+        for index in range(count)
+    )
+
+
+def python_page(rng: random.Random) -> bytes:
+    """Generate a page shaped like a Python docs download page"""
+
+    formats = "".join(
+        f'<tr><td>{name}</td><td><a href="archives/python-3.12.7-docs-{kind}">'
+        f"Download</a></td></tr>\n"
+        for name, kind in [
+            ("PDF", "pdf-a4.zip"),
+            ("HTML", "html.tar.bz2"),
+            ("Plain text", "text.tar.bz2"),
+            ("Texinfo", "texinfo.tar.bz2"),
+            ("EPUB", "epub.zip"),
+        ]
+    )
+    stylesheets = '<link rel="stylesheet" href="_static/pydoctheme.css" />\n' * 20
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8" />\n'
+        "<title>Download &#8212; Python 3.12.7 documentation</title>\n"
+        f"{stylesheets}</head><body>\n"
+        "<h1>Download Python 3.12 Documentation</h1>\n"
+        "<p>Download an archive containing all the documents for this version.</p>\n"
+        "<p><b>Last updated on: Oct 17, 2026 (09:12 UTC).</b></p>\n"
+        f"<table>{formats}</table>\n"
+        f'<div class="sphinxsidebar"><ul>{_navigation(rng, 400)}</ul></div>\n'
+        '<div class="footer">&copy; Copyright 2001-2026, Python Software Foundation.'
+        "<p>Last updated on Oct 17, 2026.</p></div>\n"
+        "</body></html>\n"
+    ).encode()
+
+
+def gnu_page(rng: random.Random) -> bytes:
+    """Generate a page shaped like a GNU manual index page"""
+
+    formats = "".join(
+        f'<li><a href="bash.{kind}">{kind}</a></li>\n'
+        for kind in ["html", "html_node.tar.gz", "info.tar.gz", "txt", "pdf"]
+    )
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8" />\n'
+        "<title>Bash Reference Manual - GNU Project</title></head><body>\n"
+        f'<div id="navigation"><ul>{_navigation(rng, 200)}</ul></div>\n'
+        f"<h2>Bash Reference Manual</h2><ul>{formats}</ul>\n"
+        f'<div id="footer"><ul>{_navigation(rng, 100)}</ul>\n'
+        "<address>Please send FSF &amp; GNU inquiries to gnu@gnu.org.</address>\n"
+        "<address>Copyright &copy; 2026 Free Software Foundation, Inc.</address>\n"
+        "<address>last updated September 22, 2026</address></div>\n"
+        "</body></html>\n"
+    ).encode()
+
+
+# Synthetic page generators by source
+PAGES = {
+    "python": python_page,
+    "gnu": gnu_page,
+}
+
+
+def _best_time(func: Callable[[], Any], repeat: int, number: int) -> float:
+    """Run function number times per run and return best seconds per call"""
+
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start_time) / number)
+    return min(timings)
+
+
+def run_benchmark(
+    pages: dict[str, bytes],
+    repeat: int,
+    number: int,
+) -> dict[str, dict[str, float]]:
+    """
+    Compare full tree parsing of version pages with the targeted extractor
+
+    Args:
+        pages (dict[str, bytes]): Page content by source
+        repeat (int): Number of timed runs per case, best one is reported
+        number (int): Number of parses per timed run
+
+    Returns:
+        dict[str, dict[str, float]]: Milliseconds per page of both parsers by source
+    """
+
+    results = {}
+    for source, content in pages.items():
+        check = CHECKS[source]
+        expected = FULL_PARSERS[source](content, check)
+        actual = PARSERS[source](content, check)
+        if actual != expected:
+            raise AssertionError(
+                f"Page info of {source} page differs: {actual} != {expected}"
+            )
+
+        full = _best_time(
+            functools.partial(FULL_PARSERS[source], content, check), repeat, number
+        )
+        targeted = _best_time(
+            functools.partial(PARSERS[source], content, check), repeat, number
+        )
+        results[source] = {"full": full * 1000, "targeted": targeted * 1000}
+        print(
+            f"{source:<8} {len(content) / 1024:7.1f} KB  full {full * 1000:7.2f} ms  "
+            f"targeted {targeted * 1000:7.2f} ms  speedup {full / targeted:5.1f}x"
+        )
+
+    return results
+
+
+def _load_pages(paths: list[str]) -> dict[str, bytes]:
+    """Load saved pages given as '<source>=<path>'"""
+
+    pages = {}
+    for item in paths:
+        source, _, path = item.partition("=")
+        if source not in PARSERS or not path:
+            raise ValueError(
+                f"Invalid page: {item}. Expected '<source>=<path>' with source in "
+                f"{', '.join(PARSERS)}"
+            )
+        with open(path, "rb") as file:
+            pages[source] = file.read()
+    return pages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark version page parsing against a full BeautifulSoup parse",
+    )
+    parser.add_argument(
+        "--page",
+        type=str,
+        action="append",
+        default=[],
+        help="Saved page to parse instead of a synthetic one, as '<source>=<path>'",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs per case, best one is reported",
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=20,
+        help="Number of parses per timed run",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of synthetic pages",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = {source: generate(rng) for source, generate in PAGES.items()}
+    pages.update(_load_pages(args.page))
+    run_benchmark(pages, args.repeat, args.number)
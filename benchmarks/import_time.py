@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "import_baseline.json")
+
+# Imported by the interpreter at startup regardless of the script
+IGNORED_MODULES = {"site", "encodings"}
+
+# Heavy dependencies that neither CLI help nor a search may import
+FORBIDDEN_MODULES = ["huggingface_hub", "bs4", "requests", "yaml", "dotenv"]
+
+# Command line arguments of lang.py by case, 'search' runs a real query against the
+# local index, or reports that none was built
+CASES = {
+    "help": ["--help"],
+    "lang_help": ["lang", "--help"],
+    "search_help": ["search", "--help"],
+    "data_help": ["data", "--help"],
+    "search": ["search", "import"],
+}
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int, str]]:
+    """
+    Parse '-X importtime' output into imported modules
+
+    Args:
+        stderr (str): Standard error of a run with '-X importtime'
+
+    Returns:
+        list[tuple[str, int, int, str]]: Module, cumulative microseconds, nesting depth
+            and the top-level import it was done for
+    """
+
+    imports = []
+    pending = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # Nested imports are indented by two spaces per level and listed before
+        # the import they were done for
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        pending.append((name.strip(), int(cumulative), depth))
+        if depth == 0:
+            imports.extend((*item, name.strip()) for item in pending)
+            pending = []
+    return imports
+
+
+def measure_case(arguments: list[str], repeat: int) -> tuple[float, dict[str, int]]:
+    """
+    Run the CLI under '-X importtime' and return its best import time
+
+    Imports done for the interpreter's site module are left out, they do not depend
+    on this repository
+
+    Args:
+        arguments (list[str]): Command line arguments of lang.py
+        repeat (int): Number of runs, best one is reported
+
+    Returns:
+        tuple[float, dict[str, int]]: Milliseconds spent importing and cumulative
+            microseconds by module of the best run
+
+    Raises:
+        RuntimeError: If the CLI exits with an error, as a crash at import would
+            otherwise be measured as a fast run
+    """
+
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "lang.py", *arguments],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        # Checked here to report the CLI's errors without the import timings
+        if result.returncode:
+            errors = "\n".join(
+                line
+                for line in result.stderr.splitlines()
+                if not line.startswith("import time:")
+            )
+            raise RuntimeError(
+                f"lang.py {' '.join(arguments)} exited with {result.returncode}:\n"
+                f"{errors}"
+            )
+
+        imports = [
+            item
+            for item in _parse_importtime(result.stderr)
+            if item[3] not in IGNORED_MODULES
+        ]
+        milliseconds = (
+            sum(cumulative for _, cumulative, depth, _ in imports if depth == 0) / 1000
+        )
+        if best is None or milliseconds < best[0]:
+            best = (
+                milliseconds,
+                {name: cumulative for name, cumulative, _, _ in imports},
+            )
+    return best
+
+
+def run_benchmarks(repeat: int) -> tuple[dict[str, dict], list[str]]:
+    """
+    Measure import time of every CLI case and check for forbidden imports
+
+    Args:
+        repeat (int): Number of runs per case, best one is reported
+
+    Returns:
+        tuple[dict[str, dict], list[str]]: Milliseconds and slowest modules by case,
+            descriptions of forbidden imports
+    """
+
+    results = {}
+    violations = []
+    for name, arguments in CASES.items():
+        milliseconds, modules = measure_case(arguments, repeat)
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:5]
+        results[name] = {
+            "milliseconds": round(milliseconds, 2),
+            "slowest": {module: cumulative for module, cumulative in slowest},
+        }
+        print(
+            f"{name:<12} {milliseconds:8.2f} ms  "
+            + ", ".join(
+                f"{module} {cumulative / 1000:.1f}" for module, cumulative in slowest
+            )
+        )
+
+        for module in FORBIDDEN_MODULES:
+            if module in modules:
+                violations.append(f"{name}: imports {module}")
+
+    return results, violations
+
+
+def _machine_info() -> dict[str, str]:
+    """Describe machine and interpreter a run was measured on"""
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark lang.py startup import time with '-X importtime'",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of runs per case, best one is reported",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=BASELINE_FILE,
+        help="Path of baseline results file",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save results of this run as the new baseline",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error on forbidden imports or cases slower than the baseline allows",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed relative import time increase against the baseline",
+    )
+    args = parser.parse_args()
+
+    results, violations = run_benchmarks(args.repeat)
+    baseline_path = os.path.abspath(args.baseline)
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as file:
+            json.dump({"machine": _machine_info(), "results": results}, file, indent=2)
+        print(f"Saved baseline to {baseline_path}")
+
+    if args.check:
+        regressions = list(violations)
+        if os.path.exists(baseline_path):
+            with open(baseline_path, "r", encoding="utf-8") as file:
+                baseline = json.load(file)
+
+            if baseline.get("machine") != _machine_info():
+                print("Warning: baseline was measured on a different machine")
+
+            for name, result in results.items():
+                expected = baseline["results"].get(name)
+                if expected and result["milliseconds"] > expected["milliseconds"] * (
+                    1 + args.tolerance
+                ):
+                    regressions.append(
+                        f"{name}: {result['milliseconds']} ms vs baseline "
+                        f"{expected['milliseconds']} ms"
+                    )
+        else:
+            print(f"Warning: baseline file does not exist: {baseline_path}")
+
+        if regressions:
+            print("Import time regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No import time regressions")
@@ -1,19 +1,35 @@
 import argparse
+import sys
 
-from src.data_uploader import data_uploader
-from src.gnu_docs.gnu_docs import main as gnu_docs_main
-from src.metadata_updater import metadata_updater
-from src.python_docs.python_docs import main as python_docs_main
+from src.config import DEDUP_MODES, OUTPUT_FORMATS
+from src.sources import load_source, resolve, source_names
 
-# Language names
-LANGUAGE_HANDLERS = {
-    "python": python_docs_main,
-    "gnu": gnu_docs_main,
+# Subcommand handlers as 'module:function', so a command only imports what it runs
+HANDLERS = {
+    "data": "src.data_uploader:data_uploader",
+    "metadata": "src.metadata_updater:metadata_updater",
+    "lang": "src.pipeline:run_pipeline",
+    "search": "src.search_index:search_command",
 }
 
 
 def main():
     parser = argparse.ArgumentParser(description="Lang-Docs CLI")
+    parser.add_argument(
+        "--report",
+        type=str,
+        help="Write JSON run report with per-stage timings, counters and per-host request stats to this path",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cpu", "memory"],
+        help="Profile the command with cProfile ('cpu') or tracemalloc ('memory')",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        help="Path of saved profile (default: profile-<command>.prof or profile-<command>-memory.txt)",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Subparser for uploading data
@@ -36,6 +52,29 @@ def main():
         type=str,
         help="HuggingFace token with user write access to repositories and PRs",
     )
+    upload_parser.add_argument(
+        "--batch-files",
+        type=int,
+        default=100,
+        help="Maximum number of files per commit",
+    )
+    upload_parser.add_argument(
+        "--batch-mb",
+        type=float,
+        default=1024,
+        help="Maximum MB of added files per commit",
+    )
+    upload_parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=8,
+        help="Number of files hashed and uploaded concurrently",
+    )
+    upload_parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Delete remote data files that have no local copy",
+    )
 
     # Subparser for updating metadata
     metadata_parser = subparsers.add_parser(
@@ -61,22 +100,167 @@ def main():
     lang_parser.add_argument(
         "lang",
         type=str,
-        help="Specify docs lang for precessing (e.g. 'python', 'javascript') ",
+        help="Specify docs lang for precessing (e.g. 'python', 'javascript') or 'all' to process every lang at once",
+    )
+    lang_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream archives straight into output files without writing downloads or extracted files",
+    )
+    lang_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes parsing docs files",
+    )
+    lang_parser.add_argument(
+        "--decompress-workers",
+        type=int,
+        default=1,
+        help="Number of processes decompressing blocks of each downloaded bzip2 archive, ignored with --stream",
+    )
+    lang_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Number of concurrent network requests shared by all langs",
+    )
+    lang_parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="Requests per second per host, 0 disables the limit",
+    )
+    lang_parser.add_argument(
+        "--bandwidth",
+        type=float,
+        help="Combined download bandwidth limit in MB/s",
+    )
+    lang_parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="jsonl",
+        help="Output format, compressed formats and parquet are written as shards with an index",
+    )
+    lang_parser.add_argument(
+        "--shard-size-mb",
+        type=float,
+        help="Size cap of output shards in MB",
+    )
+    lang_parser.add_argument(
+        "--dedup",
+        choices=DEDUP_MODES,
+        help="Deduplicate sections across versions into a content store with per-version references or into one union output with version lists",
+    )
+    lang_parser.add_argument(
+        "--deltas",
+        action="store_true",
+        help="Write added, changed and removed sections between consecutive versions",
+    )
+    lang_parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Update the local full-text search index with changed outputs",
+    )
+
+    # Subparser for searching processed docs
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search processed docs sections in the local full-text index",
+    )
+    search_parser.add_argument(
+        "query",
+        type=str,
+        help="Plain text query, every term has to match",
+    )
+    search_parser.add_argument(
+        "--lang",
+        type=str,
+        help="Only search docs of this lang (e.g. 'python')",
+    )
+    search_parser.add_argument(
+        "--version",
+        type=str,
+        help="Only search docs of this version (e.g. '3.12')",
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of results",
+    )
+    search_parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Update the index from local outputs of all langs before searching",
     )
     args = parser.parse_args()
 
+    report = None
+    if args.report:
+        report = resolve("src.instrumentation:RunReport")(sys.argv)
+        resolve("src.instrumentation:add_hook")(report)
+
+    try:
+        if args.profile:
+            output_file = args.profile_output or (
+                f"profile-{args.command}.prof"
+                if args.profile == "cpu"
+                else f"profile-{args.command}-memory.txt"
+            )
+            resolve("src.instrumentation:profile_call")(
+                lambda: run_command(args), args.profile, output_file
+            )
+        else:
+            run_command(args)
+    finally:
+        if report is not None:
+            resolve("src.instrumentation:remove_hook")(report)
+            report.save(args.report)
+
+
+def run_command(args: argparse.Namespace) -> None:
+    """Run parsed subcommand"""
+
+    handler = resolve(HANDLERS[args.command])
+
     # Process commands
     if args.command == "data":
-        data_uploader(lang=args.lang, repo_id=args.repo_id, token=args.token)
+        handler(
+            lang=args.lang,
+            repo_id=args.repo_id,
+            token=args.token,
+            batch_files=args.batch_files,
+            batch_mb=args.batch_mb,
+            upload_workers=args.upload_workers,
+            delete=args.delete,
+        )
     elif args.command == "metadata":
-        metadata_updater(repo_id=args.repo_id, token=args.token)
+        handler(repo_id=args.repo_id, token=args.token)
     elif args.command == "lang":
-        if args.lang in LANGUAGE_HANDLERS.keys():
-            LANGUAGE_HANDLERS[args.lang]()
-        else:
-            raise ValueError(
-                f"Specified docs lang is not supported. Available values: {', '.join([docs_lang for docs_lang in LANGUAGE_HANDLERS.keys()])}"
-            )
+        names = source_names() if args.lang == "all" else [args.lang]
+        handler(
+            [load_source(name) for name in names],
+            stream=args.stream,
+            workers=args.workers,
+            decompress_workers=args.decompress_workers,
+            concurrency=args.concurrency,
+            rate=args.rate or None,
+            bandwidth=args.bandwidth,
+            output_format=args.format,
+            shard_size_mb=args.shard_size_mb,
+            dedup=args.dedup,
+            deltas=args.deltas,
+            index=args.index,
+        )
+    elif args.command == "search":
+        handler(
+            query=args.query,
+            lang=args.lang,
+            version=args.version,
+            limit=args.limit,
+            reindex=args.reindex,
+        )
 
 
 if __name__ == "__main__":
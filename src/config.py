@@ -0,0 +1,121 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+# Output formats and dedup modes, kept here so the CLI can offer them without
+# importing the writers
+OUTPUT_FORMATS = ["jsonl", "jsonl.gz", "jsonl.zst", "parquet"]
+DEDUP_MODES = ["references", "union"]
+
+
+@dataclass
+class DocsConfig:
+    """Configuration shared by all docs sources"""
+
+    project_name: str = ""
+    max_retry_attempts: Optional[int] = None
+    max_workers: int = 8
+    max_bandwidth: Optional[float] = None
+    connect_timeout: float = 10.0
+    read_timeout: float = 60.0
+    streaming: bool = False
+    process_workers: int = 1
+    output_format: str = "jsonl"
+    shard_size_mb: Optional[float] = None
+    dedup: Optional[str] = None
+    decompress_workers: int = 1
+    section_separators: list[str] = field(default_factory=lambda: ["*", "=", "-"])
+
+    def __post_init__(self):
+        # Paths
+        self.base_dir = os.path.join(os.getcwd(), "src", self.project_name)
+        self.downloads_path = os.path.join(self.base_dir, "downloads")
+        self.download_manifest_file = os.path.join(self.downloads_path, "manifest.json")
+        self.extracted_path = os.path.join(self.base_dir, "extracted")
+        self.output_path = os.path.join(self.base_dir, "data")
+        self.output_manifest_file = os.path.join(self.output_path, ".manifest.json")
+        self.dataset_manifest_file = os.path.join(
+            self.base_dir, "dataset_manifest.json"
+        )
+        self.versions_file = os.path.join(self.base_dir, "versions.yaml")
+        self.http_cache_file = os.path.join(self.base_dir, "http_cache.json")
+
+        if not os.path.exists(self.versions_file):
+            raise ValueError(f"Versions file does not exist: {self.versions_file}")
+
+
+@dataclass
+class Section:
+    """Metadata for sections"""
+
+    title: str
+    content: str
+    source_file: str
+    # Extra columns written with the section, such as links between Info nodes
+    metadata: dict[str, Optional[str]] = field(default_factory=dict)
+
+
+@dataclass
+class VersionCheck:
+    """Docs page to check for a version entry in versions.yaml"""
+
+    key: str
+    label: str
+    url: str
+    metadata: dict[str, Any]
+
+
+@dataclass
+class PageElements:
+    """Elements of a docs page read when checking a version"""
+
+    title: Optional[str] = None
+    update_text: Optional[str] = None
+    addresses: list[str] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+
+
+@dataclass
+class OutputGroup:
+    """Input files processed into one output file"""
+
+    output_file: str
+    label: str
+    input_files: list[str]
+
+
+@dataclass
+class DocsSource:
+    """
+    Docs source plugin run by the shared pipeline
+
+    A source only supplies discovery, link extraction and segmentation, downloading,
+    extraction, caching and writing are handled by the pipeline
+
+    Args:
+        name (str): Source name used on the command line (e.g. 'python', 'gnu')
+        config_class (type[DocsConfig]): Configuration class of the source
+        discover_versions (Callable): Returns pages to check and entries kept as they are
+        parse_version_page (Callable): Extracts page info such as download link from a page
+        build_version_entry (Callable): Builds versions.yaml entry from page info, which
+            is None when the page check failed
+        output_groups (Callable): Groups extracted files into output files
+        stream_output (Callable): Maps archive member path to output file and label
+        segment (Callable): Splits file content into sections
+        version_outputs (Callable | None): Lists output files of consecutive versions in
+            versions.yaml order, None for sources without version deltas
+    """
+
+    name: str
+    config_class: type[DocsConfig]
+    discover_versions: Callable[
+        [DocsConfig, dict], tuple[list[VersionCheck], dict[str, dict]]
+    ]
+    parse_version_page: Callable[[bytes, VersionCheck], dict[str, Any]]
+    build_version_entry: Callable[
+        [DocsConfig, VersionCheck, Optional[dict[str, Any]]], dict[str, Any]
+    ]
+    output_groups: Callable[[DocsConfig], list[OutputGroup]]
+    stream_output: Callable[[DocsConfig, str], tuple[str, str]]
+    segment: Callable[[bytes, str, DocsConfig], Iterator[Section]]
+    version_outputs: Optional[Callable[[DocsConfig], list[str]]] = None
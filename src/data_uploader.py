@@ -1,71 +1,394 @@
 import argparse
 import glob
+import hashlib
 import os
+import time
 from datetime import datetime
+from typing import Optional
 
-from huggingface_hub import CommitOperationAdd, HfApi
-from huggingface_hub.utils import GatedRepoError, RepositoryNotFoundError
+import requests
+from huggingface_hub import (
+    CommitInfo,
+    CommitOperationAdd,
+    CommitOperationDelete,
+    HfApi,
+    RepoFile,
+)
+from huggingface_hub.utils import (
+    EntryNotFoundError,
+    GatedRepoError,
+    HfHubHTTPError,
+    RepositoryNotFoundError,
+)
 
-from src.utils import _get_huggingface_token
+from src.instrumentation import measure
+from src.jsonl_writer import INDEX_SUFFIX
+from src.utils import (
+    _get_huggingface_token,
+    _load_json_file,
+    _map_concurrently,
+    _save_json_file,
+)
 
+# Suffixes of files only used locally, such as offset indexes of JSONL outputs
+LOCAL_ONLY_SUFFIXES = (INDEX_SUFFIX,)
 
-def _upload_data_to_hf(lang: str, repo_id: str, token: str) -> None:
+
+def _local_file_hashes(file_path: str) -> dict[str, str]:
+    """Compute SHA-256 and git blob id of a local file in one pass"""
+
+    sha256 = hashlib.sha256()
+    blob_id = hashlib.sha1(f"blob {os.path.getsize(file_path)}\0".encode())
+    with open(file_path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            sha256.update(chunk)
+            blob_id.update(chunk)
+    return {"sha256": sha256.hexdigest(), "blob_id": blob_id.hexdigest()}
+
+
+def _remote_file_hashes(
+    client: HfApi,
+    repo_id: str,
+    path_in_repo: str,
+) -> dict[str, dict[str, Optional[str]]]:
+    """List files below path in repo with their LFS SHA-256 and git blob id"""
+
+    try:
+        entries = list(
+            client.list_repo_tree(
+                repo_id,
+                path_in_repo=path_in_repo,
+                recursive=True,
+                repo_type="dataset",
+            )
+        )
+    except EntryNotFoundError:
+        return {}
+
+    return {
+        entry.path: {
+            "sha256": entry.lfs.sha256 if entry.lfs else None,
+            "blob_id": entry.blob_id,
+        }
+        for entry in entries
+        if isinstance(entry, RepoFile)
+    }
+
+
+def _is_file_changed(
+    local_hashes: dict[str, str],
+    remote_hashes: Optional[dict[str, Optional[str]]],
+) -> bool:
+    """Check if local file differs from remote file, LFS files are compared by SHA-256"""
+
+    if remote_hashes is None:
+        return True
+    if remote_hashes["sha256"]:
+        return remote_hashes["sha256"] != local_hashes["sha256"]
+    return remote_hashes["blob_id"] != local_hashes["blob_id"]
+
+
+def _plan_operations(
+    local_files: dict[str, str],
+    remote_files: dict[str, dict[str, Optional[str]]],
+    max_workers: int = 8,
+    delete: bool = False,
+) -> tuple[list[CommitOperationAdd | CommitOperationDelete], dict[str, str]]:
+    """
+    Build commit operations for added, changed and deleted files
+
+    Local files are hashed in parallel and compared with remote file metadata, files
+    with identical content are left out. Remote files without a local copy are only
+    deleted when asked to, as a partial or failed local run would unpublish them
+
+    Args:
+        local_files (dict[str, str]): Local file paths keyed by path in repo
+        remote_files (dict[str, dict]): Remote hashes keyed by path in repo
+        max_workers (int): Number of files hashed concurrently
+        delete (bool): Delete remote files without a local copy
+
+    Returns:
+        tuple[list, dict[str, str]]: Commit operations and SHA-256 of local files keyed
+            by path in repo
+    """
+
+    repo_paths = sorted(local_files)
+    local_hashes = _map_concurrently(
+        lambda repo_path: _local_file_hashes(local_files[repo_path]),
+        repo_paths,
+        max_workers,
+    )
+
+    operations = [
+        CommitOperationAdd(
+            path_in_repo=repo_path, path_or_fileobj=local_files[repo_path]
+        )
+        for repo_path, hashes in zip(repo_paths, local_hashes)
+        if _is_file_changed(hashes, remote_files.get(repo_path))
+    ]
+    if delete:
+        operations += [
+            CommitOperationDelete(path_in_repo=repo_path)
+            for repo_path in sorted(set(remote_files) - set(local_files))
+        ]
+    return operations, {
+        repo_path: hashes["sha256"]
+        for repo_path, hashes in zip(repo_paths, local_hashes)
+    }
+
+
+def _journal_value(
+    operation: CommitOperationAdd | CommitOperationDelete,
+    local_hashes: dict[str, str],
+) -> str:
+    """Value recorded in the upload journal once an operation is committed"""
+
+    if isinstance(operation, CommitOperationDelete):
+        return "deleted"
+    return local_hashes[operation.path_in_repo]
+
+
+def _batch_operations(
+    operations: list[CommitOperationAdd | CommitOperationDelete],
+    max_files: int,
+    max_bytes: int,
+) -> list[list[CommitOperationAdd | CommitOperationDelete]]:
+    """Split operations into batches bounded by file count and added bytes"""
+
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for operation in operations:
+        size = (
+            os.path.getsize(operation.path_or_fileobj)
+            if isinstance(operation, CommitOperationAdd)
+            else 0
+        )
+        # Files larger than the byte bound go into a batch of their own
+        if batch and (len(batch) >= max_files or batch_bytes + size > max_bytes):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+
+        batch.append(operation)
+        batch_bytes += size
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _commit_batch(
+    client: HfApi,
+    repo_id: str,
+    token: str,
+    batch: list[CommitOperationAdd | CommitOperationDelete],
+    commit_message: str,
+    revision: str,
+    upload_workers: int,
+    retries: int = 3,
+) -> CommitInfo:
     """
-    Upload data files from specified docs directory
+    Pre-upload LFS files of a batch in parallel and commit the batch, retrying on errors
+
+    The batch is committed to an open pull request, so a retry after a commit whose
+    response was lost never opens a second one
+
+    Args:
+        client (HfApi): Hub client
+        repo_id (str): HuggingFace repository id
+        token (str): HuggingFace token
+        batch (list): Operations of the batch
+        commit_message (str): Commit message
+        revision (str): Revision of the pull request the batch is committed to
+        upload_workers (int): Number of files uploaded concurrently
+        retries (int): Number of attempts before the error is raised
+
+    Returns:
+        CommitInfo: Created commit
+    """
+
+    additions = [
+        operation for operation in batch if isinstance(operation, CommitOperationAdd)
+    ]
+    for attempt in range(1, retries + 1):
+        try:
+            if additions:
+                client.preupload_lfs_files(
+                    repo_id,
+                    additions=additions,
+                    token=token,
+                    repo_type="dataset",
+                    revision=revision,
+                    num_threads=upload_workers,
+                )
+            return client.create_commit(
+                repo_id=repo_id,
+                operations=batch,
+                commit_message=commit_message,
+                token=token,
+                repo_type="dataset",
+                revision=revision,
+                num_threads=upload_workers,
+            )
+
+        except (HfHubHTTPError, requests.RequestException) as e:
+            if attempt == retries:
+                raise
+            delay = 2**attempt
+            print(f"Batch upload failed: {e}, retrying in {delay}s")
+            time.sleep(delay)
+
+
+def _upload_data_to_hf(
+    lang: str,
+    repo_id: str,
+    token: str,
+    client: Optional[HfApi] = None,
+    batch_files: int = 100,
+    batch_mb: float = 1024,
+    upload_workers: int = 8,
+    delete: bool = False,
+) -> None:
+    """
+    Upload added, changed and deleted data files from specified docs directory
+
+    Operations are committed in bounded batches to one pull request, opened before the
+    first batch. Its revision and committed files are recorded in a local journal, so a
+    rerun after a failure continues with the remaining files on the same pull request.
+    The journal is removed once all batches are committed
 
     Args:
         lang (str): Docs lang directory containing dataset files (e.g. 'python', 'javascript')
         repo_id (str): HuggingFace repository id (e.g. 'example-org/example-repo')
         token (str): HuggingFace token with user write access to repositories and PRs
+        client (HfApi | None): Hub client, created from token if not given
+        batch_files (int): Maximum number of files per commit
+        batch_mb (float): Maximum MB of added files per commit
+        upload_workers (int): Number of files uploaded concurrently
+        delete (bool): Delete remote data files without a local copy
     """
 
     base = os.path.join(os.getcwd(), "src")
     lang = f"{lang}_docs"
     target_folder = os.path.join(base, lang, "data")
     path_in_repo = f"data/{lang}"
+    journal_file = os.path.join(base, lang, "upload_journal.json")
 
     if not os.path.exists(target_folder):
         raise FileNotFoundError(f"'{target_folder}' does not exist")
 
-    client = HfApi(token=token)
+    client = client or HfApi(token=token)
     try:
         client.auth_check(repo_id=repo_id, repo_type="dataset", token=token)
     except (GatedRepoError, RepositoryNotFoundError) as e:
         print(f"Repository access error: {e}")
         return
 
-    # Collect files for commit
-    operations = [
-        CommitOperationAdd(
-            path_in_repo=f"{path_in_repo}/{os.path.relpath(file_path, target_folder)}",
-            path_or_fileobj=file_path,
-        )
+    # Collect local files by their path in repo, hidden files are skipped by glob
+    local_files = {
+        f"{path_in_repo}/{os.path.relpath(file_path, target_folder)}": file_path
         for file_path in glob.glob(os.path.join(target_folder, "**"), recursive=True)
-        if os.path.isfile(file_path)
-    ]
+        if os.path.isfile(file_path) and not file_path.endswith(LOCAL_ONLY_SUFFIXES)
+    }
 
     # Add versions.yaml if it exists
     versions_file = os.path.join(base, lang, "versions.yaml")
     if os.path.exists(versions_file):
-        operations.append(
-            CommitOperationAdd(
-                path_in_repo=f"{path_in_repo}/versions.yaml",
-                path_or_fileobj=versions_file,
+        local_files[f"{path_in_repo}/versions.yaml"] = versions_file
+
+    # Journal of an interrupted upload to the same repository
+    journal = _load_json_file(journal_file)
+    if journal.get("repo_id") != repo_id:
+        journal = {"repo_id": repo_id, "pr_revision": None, "files": {}}
+
+    with measure("upload", lang) as event:
+        remote_files = _remote_file_hashes(client, repo_id, path_in_repo)
+        operations, local_hashes = _plan_operations(
+            local_files, remote_files, upload_workers, delete
+        )
+
+        remote_only = len(set(remote_files) - set(local_files))
+        if remote_only and not delete:
+            print(
+                f"Keeping {remote_only} remote files of {lang} without a local copy, "
+                "pass --delete to remove them"
             )
+
+        # Skip operations already committed by an interrupted run
+        operations = [
+            operation
+            for operation in operations
+            if journal["files"].get(operation.path_in_repo)
+            != _journal_value(operation, local_hashes)
+        ]
+        if not operations:
+            print(f"No changes to upload for {lang}")
+            if os.path.exists(journal_file):
+                os.remove(journal_file)
+            return
+
+        added = [
+            operation
+            for operation in operations
+            if isinstance(operation, CommitOperationAdd)
+        ]
+        event.records = len(operations)
+        event.bytes = sum(
+            os.path.getsize(operation.path_or_fileobj) for operation in added
         )
 
-    # Commit to HuggingFace
-    client.create_commit(
-        commit_message=f"Update {lang} | {datetime.now().date()}",
-        operations=operations,
-        repo_id=repo_id,
-        repo_type="dataset",
-        token=token,
-        create_pr=True,
-    )
+        batches = _batch_operations(operations, batch_files, int(batch_mb * 1024**2))
+        resumed = " (resuming)" if journal["files"] else ""
+        print(
+            f"Uploading {lang}{resumed}: {len(added)} added or changed, "
+            f"{len(operations) - len(added)} deleted in {len(batches)} batches"
+        )
+
+        # Open the pull request once, every batch is committed to it
+        if journal["pr_revision"] is None:
+            pull_request = client.create_pull_request(
+                repo_id,
+                title=f"Update {lang} | {datetime.now().date()}",
+                token=token,
+                repo_type="dataset",
+            )
+            journal["pr_revision"] = pull_request.git_reference
+            _save_json_file(journal_file, journal)
+
+        # Commit to HuggingFace
+        for index, batch in enumerate(batches, 1):
+            _commit_batch(
+                client,
+                repo_id,
+                token,
+                batch,
+                f"Update {lang} | {datetime.now().date()} ({index}/{len(batches)})",
+                journal["pr_revision"],
+                upload_workers,
+            )
+            journal["files"].update(
+                {
+                    operation.path_in_repo: _journal_value(operation, local_hashes)
+                    for operation in batch
+                }
+            )
+            _save_json_file(journal_file, journal)
+            print(f"Committed batch {index}/{len(batches)} ({len(batch)} files)")
 
+        os.remove(journal_file)
+        print(f"Uploaded {lang} to {journal['pr_revision']}")
 
-def data_uploader(lang: str, repo_id: str, token: str) -> None:
+
+def data_uploader(
+    lang: str,
+    repo_id: str,
+    token: str,
+    batch_files: int = 100,
+    batch_mb: float = 1024,
+    upload_workers: int = 8,
+    delete: bool = False,
+) -> None:
     """
     Upload docs data to HuggingFace
 
@@ -73,6 +396,10 @@ def data_uploader(lang: str, repo_id: str, token: str) -> None:
         lang (str): Docs lang directory containing dataset files (e.g. 'python', 'javascript')
         repo_id (str): HuggingFace repository id (e.g. 'example-org/example-repo')
         token (str): HuggingFace token with user write access to repositories and PRs
+        batch_files (int): Maximum number of files per commit
+        batch_mb (float): Maximum MB of added files per commit
+        upload_workers (int): Number of files hashed and uploaded concurrently
+        delete (bool): Delete remote data files without a local copy
     """
 
     # Handle token retrieval
@@ -82,6 +409,10 @@ def data_uploader(lang: str, repo_id: str, token: str) -> None:
         lang=lang,
         repo_id=repo_id,
         token=token,
+        batch_files=batch_files,
+        batch_mb=batch_mb,
+        upload_workers=upload_workers,
+        delete=delete,
     )
 
 
@@ -104,10 +435,37 @@ if __name__ == "__main__":
         type=str,
         help="HuggingFace token with user write access to repositories and PRs",
     )
+    parser.add_argument(
+        "--batch-files",
+        type=int,
+        default=100,
+        help="Maximum number of files per commit",
+    )
+    parser.add_argument(
+        "--batch-mb",
+        type=float,
+        default=1024,
+        help="Maximum MB of added files per commit",
+    )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=8,
+        help="Number of files hashed and uploaded concurrently",
+    )
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Delete remote data files that have no local copy",
+    )
     args = parser.parse_args()
 
     data_uploader(
         lang=args.lang,
         repo_id=args.repo_id,
         token=args.token,
+        batch_files=args.batch_files,
+        batch_mb=args.batch_mb,
+        upload_workers=args.upload_workers,
+        delete=args.delete,
     )
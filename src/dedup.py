@@ -0,0 +1,111 @@
+import hashlib
+from typing import Any, Iterable, Iterator, Optional
+
+from src.config import DEDUP_MODES, Section
+from src.shard_writer import OutputWriter
+
+
+def section_hash(title: str, content: str) -> str:
+    """Hash title and content of a section into a short hex digest"""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(title.encode())
+    digest.update(b"\0")
+    digest.update(content.encode())
+    return digest.hexdigest()
+
+
+class SectionDeduplicator:
+    """
+    Deduplicator of sections shared between the versions of a source
+
+    Sections are keyed by a hash of their title and content. In 'references' mode every
+    unique section is written once to the content store and versions get rows of
+    section hash and file name in document order. In 'union' mode unique sections are
+    kept in memory with the list of versions containing them until union_records is
+    called
+
+    Args:
+        mode (str): 'references' or 'union'
+        content_writer (OutputWriter | None): Writer of the content store, required in
+            'references' mode
+    """
+
+    def __init__(self, mode: str, content_writer: Optional[OutputWriter] = None):
+        if mode not in DEDUP_MODES:
+            raise ValueError(
+                f"Unknown dedup mode: {mode}. Available values: {', '.join(DEDUP_MODES)}"
+            )
+        if mode == "references" and content_writer is None:
+            raise ValueError("Dedup mode 'references' requires a content store writer")
+
+        self.mode = mode
+        self.content_writer = content_writer
+        self.sections = 0
+
+        self._seen: set[str] = set()
+        self._union: dict[str, dict[str, Any]] = {}
+
+    @property
+    def unique_sections(self) -> int:
+        """Number of unique sections seen so far"""
+
+        return len(self._union) if self.mode == "union" else len(self._seen)
+
+    def references(self, sections: Iterable[Section]) -> Iterator[dict[str, str]]:
+        """Write unseen sections to the content store and yield reference rows"""
+
+        for section in sections:
+            key = section_hash(section.title, section.content)
+            self.sections += 1
+            if key not in self._seen:
+                self._seen.add(key)
+                self.content_writer.write(
+                    {
+                        "section_hash": key,
+                        "section_title": section.title,
+                        "section_content": section.content,
+                    }
+                )
+
+            yield {
+                "section_hash": key,
+                "file_name": section.source_file,
+                **section.metadata,
+            }
+
+    def add(self, sections: Iterable[Section], version: str) -> int:
+        """Add sections of a version to the union and return their number"""
+
+        count = 0
+        for section in sections:
+            key = section_hash(section.title, section.content)
+            count += 1
+            record = self._union.get(key)
+            if record is None:
+                self._union[key] = {
+                    "section_hash": key,
+                    "section_title": section.title,
+                    "section_content": section.content,
+                    "file_name": section.source_file,
+                    **section.metadata,
+                    "versions": [version],
+                }
+            elif record["versions"][-1] != version:
+                record["versions"].append(version)
+
+        self.sections += count
+        return count
+
+    def union_records(self) -> Iterator[dict[str, Any]]:
+        """Yield unique sections with their versions in first-seen order"""
+
+        yield from self._union.values()
+
+    def summary(self) -> str:
+        """Human readable summary of sections before and after deduplication"""
+
+        return (
+            f"{self.sections} sections, {self.unique_sections} unique "
+            f"({self.sections / max(self.unique_sections, 1):.1f}x)"
+        )
@@ -0,0 +1,201 @@
+import itertools
+import os
+from collections import Counter
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator
+
+from src.config import DocsConfig, DocsSource
+from src.dedup import section_hash
+from src.docs_processor import (
+    _open_writer,
+    _output_exists,
+    _output_stem,
+    _record_output,
+    _remove_output,
+)
+from src.instrumentation import measure
+from src.shard_writer import OutputWriter, read_output
+from src.utils import _hash_files, _hash_values, _load_json_file, _save_json_file
+
+SectionKey = tuple[str, int]
+
+
+def _keyed_sections(
+    records: Iterable[dict[str, Any]],
+) -> Iterator[tuple[SectionKey, str, dict[str, Any]]]:
+    """
+    Key section records by file name and section title with their content hash
+
+    Titles repeated within a file are told apart by their occurrence number
+
+    Args:
+        records (Iterable[dict[str, Any]]): Section records of one version
+
+    Yields:
+        tuple[SectionKey, str, dict[str, Any]]: Section key, content hash and record
+    """
+
+    occurrences = Counter()
+    for record in records:
+        location = section_hash(record["file_name"], record["section_title"])
+        occurrences[location] += 1
+        yield (
+            (location, occurrences[location]),
+            section_hash(record["section_title"], record["section_content"]),
+            record,
+        )
+
+
+def write_delta(
+    read_base: Callable[[], Iterable[dict[str, Any]]],
+    target_records: Iterable[dict[str, Any]],
+    writer: OutputWriter,
+) -> Counter:
+    """
+    Write sections added, changed and removed between two versions
+
+    Only section keys and content hashes of the base version are held in memory. The
+    target version is streamed once, the base version twice: once to build its index
+    and once more to write removed sections, which are written without content
+
+    Args:
+        read_base (Callable[[], Iterable[dict[str, Any]]]): Opens a stream of base
+            version records
+        target_records (Iterable[dict[str, Any]]): Records of the target version
+        writer (OutputWriter): Writer of the delta output
+
+    Returns:
+        Counter: Number of sections by change
+    """
+
+    base_index = {
+        key: content_hash for key, content_hash, _ in _keyed_sections(read_base())
+    }
+
+    changes = Counter()
+    for key, content_hash, record in _keyed_sections(target_records):
+        base_hash = base_index.pop(key, None)
+        if base_hash == content_hash:
+            continue
+
+        change = "added" if base_hash is None else "changed"
+        changes[change] += 1
+        writer.write(
+            {
+                "change": change,
+                "section_title": record["section_title"],
+                "section_content": record["section_content"],
+                "file_name": record["file_name"],
+            }
+        )
+
+    # Keys left in the index are missing from the target version
+    if base_index:
+        for key, _, record in _keyed_sections(read_base()):
+            if key not in base_index:
+                continue
+
+            changes["removed"] += 1
+            writer.write(
+                {
+                    "change": "removed",
+                    "section_title": record["section_title"],
+                    "section_content": "",
+                    "file_name": record["file_name"],
+                }
+            )
+
+    return changes
+
+
+def _delta_file(config: DocsConfig, target_file: str) -> str:
+    """Build delta output path of a version"""
+
+    return os.path.join(
+        config.output_path, "deltas", f"{_output_stem(target_file)}-delta.jsonl"
+    )
+
+
+def generate_deltas(jobs: list[tuple[DocsSource, DocsConfig]]) -> None:
+    """
+    Write delta outputs between consecutive versions of sources listing their versions
+
+    Versions follow the order of versions.yaml and a delta is only written between
+    neighbouring versions that both have a full sections output. A delta is rebuilt
+    when the content hash of either version changes. Only deltas of versions no longer
+    listed are removed, deltas next to a version whose output is missing are kept
+
+    Args:
+        jobs (list[tuple[DocsSource, DocsConfig]]): Sources with their configs
+    """
+
+    for source, config in jobs:
+        if source.version_outputs is None:
+            continue
+
+        manifest = _load_json_file(config.output_manifest_file)
+        dataset_manifest = _load_json_file(config.dataset_manifest_file)
+        version_files = source.version_outputs(config)
+        output_files = {
+            output_file
+            for output_file in version_files
+            if dataset_manifest.get(os.path.basename(output_file), {}).get("kind")
+            == "sections"
+        }
+
+        delta_files = {}
+        for base_file, target_file in itertools.pairwise(version_files):
+            # Skipping over a missing version would overwrite the delta of its successor
+            if base_file not in output_files or target_file not in output_files:
+                continue
+
+            delta_file = _delta_file(config, target_file)
+            delta_files[os.path.basename(delta_file)] = (
+                base_file,
+                target_file,
+                delta_file,
+            )
+
+        listed = {
+            os.path.basename(_delta_file(config, output_file))
+            for output_file in version_files[1:]
+        }
+        for name, entry in list(dataset_manifest.items()):
+            if entry.get("kind") == "delta" and name not in listed:
+                _remove_output(config, os.path.join(config.output_path, "deltas", name))
+
+        for name, (base_file, target_file, delta_file) in delta_files.items():
+            label = f"delta {_output_stem(base_file)} to {_output_stem(target_file)}"
+            manifest_entry = {
+                "base": dataset_manifest[os.path.basename(base_file)]["sha256"],
+                "target": dataset_manifest[os.path.basename(target_file)]["sha256"],
+                "config_hash": _hash_values(config.output_format, config.shard_size_mb),
+                "code_version": _hash_files([__file__]),
+            }
+            if (
+                _output_exists(config, delta_file, dataset_manifest)
+                and manifest.get(name) == manifest_entry
+            ):
+                print(f"Skipping {label}: output up to date")
+                continue
+
+            os.makedirs(os.path.dirname(delta_file), exist_ok=True)
+            with measure("process", f"{config.project_name}/{label}") as event:
+                with _open_writer(delta_file, config) as writer:
+                    changes = write_delta(
+                        partial(read_output, base_file),
+                        read_output(target_file),
+                        writer,
+                    )
+
+                event.records = writer.records
+                event.bytes = writer.bytes_written
+
+            _record_output(config, delta_file, writer, "delta")
+            manifest[name] = manifest_entry
+            _save_json_file(config.output_manifest_file, manifest)
+            print(
+                f"Successfully wrote {label}: {changes['added']} added, "
+                f"{changes['changed']} changed, {changes['removed']} removed "
+                f"({writer.summary()})"
+            )
@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.config import DocsConfig, DocsSource
+from src.fetch_scheduler import FetchScheduler
+from src.utils import (
+    BandwidthLimiter,
+    _load_json_file,
+    _load_versions,
+    _save_json_file,
+    _sync_archive,
+)
+
+
+def download_and_extract(
+    jobs: list[tuple[DocsSource, DocsConfig]],
+    scheduler: FetchScheduler,
+    max_workers: int,
+    limiter: BandwidthLimiter,
+) -> None:
+    """
+    Download and extract docs archives of all sources
+
+    Archives of every source share one bounded thread pool and one bandwidth budget,
+    download manifests are saved as each archive completes
+
+    Args:
+        jobs (list[tuple[DocsSource, DocsConfig]]): Sources to download with their configs
+        scheduler (FetchScheduler): Scheduler shared by all downloads
+        max_workers (int): Number of archives processed concurrently
+        limiter (BandwidthLimiter): Bandwidth budget shared by all downloads
+    """
+
+    manifests = {}
+    pending = []
+    for _, config in jobs:
+        os.makedirs(config.downloads_path, exist_ok=True)
+        os.makedirs(config.extracted_path, exist_ok=True)
+        manifests[config.download_manifest_file] = _load_json_file(
+            config.download_manifest_file
+        )
+
+        for version_info in _load_versions(str(config.versions_file)).values():
+            if (
+                config.max_retry_attempts is not None
+                and version_info["skip"] >= config.max_retry_attempts
+            ):
+                print(
+                    f"Skipping version {version_info['specific']}: maximum retries reached"
+                )
+                continue
+
+            download_url = version_info["plain_text_link"]
+            if download_url:
+                pending.append((config, download_url, version_info["specific"]))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(
+                _sync_archive,
+                download_url,
+                config,
+                manifests[config.download_manifest_file],
+                label,
+                scheduler,
+                limiter,
+            ): config
+            for config, download_url, label in pending
+        }
+
+        # Manifests are only written from this thread
+        for future in as_completed(futures):
+            future.result()
+            manifest_file = futures[future].download_manifest_file
+            _save_json_file(manifest_file, manifests[manifest_file])
@@ -0,0 +1,574 @@
+import inspect
+import itertools
+import mmap
+import os
+import shutil
+import tarfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator, Optional
+
+import requests
+import urllib3
+
+from src import dedup, jsonl_writer, segmenter, shard_writer
+from src.config import DocsConfig, DocsSource, OutputGroup, Section
+from src.dedup import SectionDeduplicator
+from src.fetch_scheduler import FetchScheduler
+from src.instrumentation import StageEvent, emit, measure
+from src.segmenter import iter_sections
+from src.shard_writer import (
+    OutputWriter,
+    is_sharded,
+    open_output_writer,
+    output_marker,
+    shard_directory,
+)
+from src.utils import (
+    BandwidthLimiter,
+    _file_fingerprints,
+    _hash_files,
+    _hash_values,
+    _load_json_file,
+    _load_versions,
+    _map_concurrently,
+    _save_json_file,
+    _stream_archive_members,
+)
+
+Segmenter = Callable[[bytes, str, DocsConfig], Iterator[Section]]
+
+# Streamed outputs of one source are recorded from several threads
+_dataset_manifest_lock = threading.Lock()
+
+
+def split_sections(
+    buffer: bytes,
+    source_file: str,
+    config: DocsConfig,
+) -> Iterator[Section]:
+    """Split content of a docs file into sections at separator underlines"""
+
+    for title, content in iter_sections(buffer, config.section_separators):
+        yield Section(title=title, content=content, source_file=source_file)
+
+
+def _extract_sections(
+    file_path: str,
+    config: DocsConfig,
+    segment: Segmenter,
+) -> Iterator[Section]:
+    """Extract documentation sections from a memory-mapped file"""
+
+    source_file = os.path.basename(file_path)
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from segment(buffer, source_file, config)
+
+
+def _extract_section_list(
+    file_path: str,
+    config: DocsConfig,
+    segment: Segmenter,
+) -> list[Section]:
+    """Extract all documentation sections from a file in a pool worker"""
+
+    return list(_extract_sections(file_path, config, segment))
+
+
+def _write_sections(writer: OutputWriter, sections: Iterable[Section]) -> None:
+    """Write sections to output file as JSON lines"""
+
+    writer.write_many(
+        {
+            "section_title": section.title,
+            "section_content": section.content,
+            "file_name": section.source_file,
+            **section.metadata,
+        }
+        for section in sections
+    )
+
+
+def _build_settings(source: DocsSource, config: DocsConfig) -> dict[str, str]:
+    """Hash processing config and code version that outputs of a source depend on"""
+
+    code_files = {
+        __file__,
+        dedup.__file__,
+        segmenter.__file__,
+        jsonl_writer.__file__,
+        shard_writer.__file__,
+        inspect.getfile(source.segment),
+        inspect.getfile(source.output_groups),
+    }
+    return {
+        "config_hash": _hash_values(
+            config.section_separators,
+            config.output_format,
+            config.shard_size_mb,
+            config.dedup,
+        ),
+        "code_version": _hash_files(sorted(code_files))
+        + f"-{jsonl_writer.ENCODER_NAME}",
+    }
+
+
+def _open_writer(output_file: str, config: DocsConfig) -> OutputWriter:
+    """Open writer for output file in configured format and shard layout"""
+
+    return open_output_writer(output_file, config.output_format, config.shard_size_mb)
+
+
+def _output_stem(output_file: str) -> str:
+    """Name of an output file without its extension, used as config name and version"""
+
+    return os.path.basename(output_file).removesuffix(".jsonl")
+
+
+def _shared_output_file(config: DocsConfig, name: str) -> str:
+    """Path of an output shared by all versions of a source, such as the content store"""
+
+    prefix = config.project_name.removesuffix("_docs")
+    return os.path.join(config.output_path, "shared", f"{prefix}-{name}.jsonl")
+
+
+def _record_output(
+    config: DocsConfig,
+    output_file: str,
+    writer: OutputWriter,
+    kind: str = "sections",
+) -> None:
+    """
+    Record a written output in the dataset manifest of its source
+
+    The entry holds the data files path in the Hub repo, used as the output's config,
+    with its rows, bytes on disk, bytes and SHA-256 of the serialized JSON lines
+
+    Args:
+        config (DocsConfig): Config of the source the output belongs to
+        output_file (str): Path of the single JSONL output file
+        writer (OutputWriter): Closed writer of the output
+        kind (str): Rows of the output, 'sections', 'references', 'content', 'union'
+            or 'delta'
+    """
+
+    path = os.path.relpath(output_file, config.output_path)
+    if is_sharded(config.output_format, config.shard_size_mb):
+        path = os.path.join(
+            os.path.relpath(shard_directory(output_file), config.output_path),
+            f"*.{config.output_format}",
+        )
+
+    with _dataset_manifest_lock:
+        manifest = _load_json_file(config.dataset_manifest_file)
+        manifest[os.path.basename(output_file)] = {
+            "config_name": _output_stem(output_file),
+            "kind": kind,
+            "path": f"data/{config.project_name}/{path.replace(os.sep, '/')}",
+            "rows": writer.records,
+            "bytes": writer.bytes_written,
+            "num_bytes": writer.text_bytes,
+            "sha256": writer.sha256,
+        }
+        _save_json_file(config.dataset_manifest_file, dict(sorted(manifest.items())))
+
+
+def _remove_output(config: DocsConfig, output_file: str) -> None:
+    """Remove output file or shard directory and its dataset manifest entry"""
+
+    if not os.path.exists(output_file) and not os.path.isdir(
+        shard_directory(output_file)
+    ):
+        return
+
+    for file_path in (output_file, output_file + jsonl_writer.INDEX_SUFFIX):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    shutil.rmtree(shard_directory(output_file), ignore_errors=True)
+    with _dataset_manifest_lock:
+        manifest = _load_json_file(config.dataset_manifest_file)
+        manifest.pop(os.path.basename(output_file), None)
+        _save_json_file(config.dataset_manifest_file, manifest)
+
+
+def _output_exists(
+    config: DocsConfig, output_file: str, dataset_manifest: dict
+) -> bool:
+    """Check if output is completely written and recorded in the dataset manifest"""
+
+    marker = output_marker(output_file, config.output_format, config.shard_size_mb)
+    return os.path.exists(marker) and os.path.basename(output_file) in dataset_manifest
+
+
+def _process_output_group(
+    group: OutputGroup,
+    config: DocsConfig,
+    file_sections: Iterable[Iterable[Section]],
+    deduplicator: Optional[SectionDeduplicator] = None,
+) -> None:
+    """Write sections of all input files of a group to its output file"""
+
+    with measure("process", f"{config.project_name}/{group.label}") as event:
+        # Union of all versions is written once every group is collected
+        if deduplicator is not None and deduplicator.mode == "union":
+            event.records = sum(
+                deduplicator.add(sections, _output_stem(group.output_file))
+                for sections in file_sections
+            )
+            print(f"Collected {group.label} ({event.records} sections)")
+            return
+
+        os.makedirs(os.path.dirname(group.output_file), exist_ok=True)
+        with _open_writer(group.output_file, config) as writer:
+            for sections in file_sections:
+                if deduplicator is None:
+                    _write_sections(writer, sections)
+                else:
+                    writer.write_many(deduplicator.references(sections))
+
+        event.records = writer.records
+        event.bytes = writer.bytes_written
+
+    _record_output(
+        config,
+        group.output_file,
+        writer,
+        "sections" if deduplicator is None else "references",
+    )
+    print(f"Successfully processed {group.label} ({writer.summary()})")
+
+
+def _open_deduplicator(config: DocsConfig) -> Optional[SectionDeduplicator]:
+    """Create deduplicator of a source in its configured mode, None without dedup"""
+
+    if config.dedup is None:
+        return None
+    if config.dedup == "union":
+        return SectionDeduplicator("union")
+
+    content_file = _shared_output_file(config, "content")
+    os.makedirs(os.path.dirname(content_file), exist_ok=True)
+    return SectionDeduplicator("references", _open_writer(content_file, config))
+
+
+def _close_deduplicator(config: DocsConfig, deduplicator: SectionDeduplicator) -> None:
+    """Finish the content store or write the union output of a source and record it"""
+
+    if deduplicator.mode == "references":
+        output_file = _shared_output_file(config, "content")
+        writer = deduplicator.content_writer
+        writer.close()
+        kind = "content"
+
+    else:
+        output_file = _shared_output_file(config, "union")
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with measure("process", f"{config.project_name}/union") as event:
+            with _open_writer(output_file, config) as writer:
+                writer.write_many(deduplicator.union_records())
+
+            event.records = writer.records
+            event.bytes = writer.bytes_written
+        kind = "union"
+
+    _record_output(config, output_file, writer, kind)
+    print(
+        f"Deduplicated {config.project_name}: {deduplicator.summary()}, "
+        f"{kind} {writer.summary()}"
+    )
+
+
+def process_documentation(
+    jobs: list[tuple[DocsSource, DocsConfig]],
+    process_workers: int = 1,
+) -> None:
+    """
+    Process output groups of all sources whose outputs are missing or stale
+
+    Input files of every stale group are parsed on one process pool shared by all
+    sources, results are written in file order. Sources with dedup enabled are
+    rebuilt as a whole once any of their groups is stale
+
+    Args:
+        jobs (list[tuple[DocsSource, DocsConfig]]): Sources to process with their configs
+        process_workers (int): Number of processes parsing docs files
+    """
+
+    stale_groups = []
+    for source, config in jobs:
+        os.makedirs(config.output_path, exist_ok=True)
+        manifest = _load_json_file(config.output_manifest_file)
+        dataset_manifest = _load_json_file(config.dataset_manifest_file)
+        build_settings = _build_settings(source, config)
+        group_entries = [
+            (
+                group,
+                {
+                    "inputs": _file_fingerprints(
+                        group.input_files, config.extracted_path
+                    ),
+                    **build_settings,
+                },
+            )
+            for group in source.output_groups(config)
+        ]
+
+        if config.dedup is None:
+            for name in ("content", "union"):
+                _remove_output(config, _shared_output_file(config, name))
+
+            # Skip outputs built from the same inputs, config and code
+            for group, manifest_entry in group_entries:
+                if _output_exists(
+                    config, group.output_file, dataset_manifest
+                ) and manifest_entry == manifest.get(
+                    os.path.basename(group.output_file)
+                ):
+                    print(f"Skipping {group.label}: output up to date")
+                    continue
+
+                stale_groups.append((source, config, group, manifest, manifest_entry))
+            continue
+
+        # Deduplicated outputs depend on every group, one stale group rebuilds them all
+        if config.dedup == "union":
+            output_files = [_shared_output_file(config, "union")]
+        else:
+            output_files = [_shared_output_file(config, "content")] + [
+                group.output_file for group, _ in group_entries
+            ]
+        if all(
+            manifest_entry == manifest.get(os.path.basename(group.output_file))
+            for group, manifest_entry in group_entries
+        ) and all(
+            _output_exists(config, output_file, dataset_manifest)
+            for output_file in output_files
+        ):
+            print(f"Skipping {config.project_name}: deduplicated outputs up to date")
+            continue
+
+        for name in ("content", "union"):
+            _remove_output(config, _shared_output_file(config, name))
+        if config.dedup == "union":
+            for group, _ in group_entries:
+                _remove_output(config, group.output_file)
+        stale_groups.extend(
+            (source, config, group, manifest, manifest_entry)
+            for group, manifest_entry in group_entries
+        )
+
+    tasks = [
+        (file_path, config, source.segment)
+        for source, config, group, _, _ in stale_groups
+        for file_path in group.input_files
+    ]
+
+    with (
+        ProcessPoolExecutor(max_workers=process_workers)
+        if process_workers > 1
+        else nullcontext()
+    ) as executor:
+        if executor is None or not tasks:
+            file_sections = (_extract_sections(*task) for task in tasks)
+        else:
+            file_sections = executor.map(
+                _extract_section_list,
+                *zip(*tasks),
+                chunksize=max(1, len(tasks) // (process_workers * 4)),
+            )
+
+        file_sections = iter(file_sections)
+        for _, source_groups in itertools.groupby(
+            stale_groups, key=lambda stale_group: stale_group[1].project_name
+        ):
+            source_groups = list(source_groups)
+            config = source_groups[0][1]
+            deduplicator = _open_deduplicator(config)
+
+            for _, config, group, manifest, manifest_entry in source_groups:
+                _process_output_group(
+                    group,
+                    config,
+                    itertools.islice(file_sections, len(group.input_files)),
+                    deduplicator,
+                )
+                manifest[os.path.basename(group.output_file)] = manifest_entry
+                _save_json_file(config.output_manifest_file, manifest)
+
+            if deduplicator is not None:
+                _close_deduplicator(config, deduplicator)
+
+
+def _partial_output_file(output_file: str) -> str:
+    """Path a streamed output is written to until complete, keeping its file stem"""
+
+    return os.path.join(
+        os.path.dirname(output_file), ".partial", os.path.basename(output_file)
+    )
+
+
+def _replace_output(config: DocsConfig, output_file: str) -> None:
+    """Move a completely written partial output into place of the old output"""
+
+    partial_file = _partial_output_file(output_file)
+    if is_sharded(config.output_format, config.shard_size_mb):
+        for file_path in (output_file, output_file + jsonl_writer.INDEX_SUFFIX):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        shutil.rmtree(shard_directory(output_file), ignore_errors=True)
+        os.replace(shard_directory(partial_file), shard_directory(output_file))
+        return
+
+    shutil.rmtree(shard_directory(output_file), ignore_errors=True)
+    os.replace(
+        partial_file + jsonl_writer.INDEX_SUFFIX,
+        output_file + jsonl_writer.INDEX_SUFFIX,
+    )
+    os.replace(partial_file, output_file)
+
+
+def _discard_partial_output(config: DocsConfig, output_file: str) -> None:
+    """Remove an incomplete streamed output and invalidate the recorded inputs of it"""
+
+    partial_file = _partial_output_file(output_file)
+    for file_path in (partial_file, partial_file + jsonl_writer.INDEX_SUFFIX):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    shutil.rmtree(shard_directory(partial_file), ignore_errors=True)
+
+    # Next run must not take the output for one built from the current inputs
+    with _dataset_manifest_lock:
+        manifest = _load_json_file(config.output_manifest_file)
+        if manifest.pop(os.path.basename(output_file), None) is not None:
+            _save_json_file(config.output_manifest_file, manifest)
+
+
+def _close_stream_writer(
+    writer: OutputWriter,
+    config: DocsConfig,
+    output_file: str,
+    label: str,
+) -> None:
+    """Close writer of a streamed output file, move it in place, record and report it"""
+
+    writer.close()
+    _replace_output(config, output_file)
+    _record_output(config, output_file, writer)
+    emit(
+        StageEvent(
+            stage="process",
+            key=f"{config.project_name}/{label}",
+            seconds=writer.elapsed,
+            bytes=writer.bytes_written,
+            records=writer.records,
+        )
+    )
+    print(f"Successfully processed {label} ({writer.summary()})")
+
+
+def _process_archive_stream(
+    source: DocsSource,
+    config: DocsConfig,
+    url: str,
+    scheduler: FetchScheduler,
+    limiter: BandwidthLimiter,
+) -> None:
+    """
+    Stream docs archive from URL straight into output files without intermediate files
+
+    Every output is written to a '.partial' directory next to it and only replaces the
+    old output once complete, an output interrupted by a failed stream is discarded
+    """
+
+    os.makedirs(config.output_path, exist_ok=True)
+
+    writer = None
+    current_output_file = None
+    label = None
+    try:
+        for member_name, content in _stream_archive_members(
+            url,
+            scheduler=scheduler,
+            timeout=(config.connect_timeout, config.read_timeout),
+            limiter=limiter,
+        ):
+            # Consecutive archive members may share an output file
+            output_file, member_label = source.stream_output(config, member_name)
+            if output_file != current_output_file:
+                if writer is not None:
+                    _close_stream_writer(writer, config, current_output_file, label)
+                    writer = None
+
+                os.makedirs(
+                    os.path.dirname(_partial_output_file(output_file)), exist_ok=True
+                )
+                writer = _open_writer(_partial_output_file(output_file), config)
+                current_output_file = output_file
+                label = member_label
+
+            _write_sections(
+                writer, source.segment(content, os.path.basename(member_name), config)
+            )
+
+        if writer is not None:
+            _close_stream_writer(writer, config, current_output_file, label)
+            writer = None
+
+    # Errors of the body read through the raw response are raised by urllib3
+    except (
+        requests.RequestException,
+        urllib3.exceptions.HTTPError,
+        tarfile.TarError,
+        OSError,
+    ) as e:
+        print(f"Streaming failed for {url}: {e}")
+        emit(StageEvent(stage="process", key=f"{config.project_name}/{url}", errors=1))
+
+    finally:
+        if writer is not None:
+            writer.close()
+            _discard_partial_output(config, current_output_file)
+
+
+def process_documentation_stream(
+    jobs: list[tuple[DocsSource, DocsConfig]],
+    scheduler: FetchScheduler,
+    max_workers: int,
+    limiter: BandwidthLimiter,
+) -> None:
+    """
+    Download, decompress and process archives of all sources in one streaming pass
+
+    Args:
+        jobs (list[tuple[DocsSource, DocsConfig]]): Sources to stream with their configs
+        scheduler (FetchScheduler): Scheduler shared by all downloads
+        max_workers (int): Number of archives streamed concurrently
+        limiter (BandwidthLimiter): Bandwidth budget shared by all downloads
+    """
+
+    pending = []
+    for source, config in jobs:
+        for version_info in _load_versions(str(config.versions_file)).values():
+            if (
+                config.max_retry_attempts is not None
+                and version_info["skip"] >= config.max_retry_attempts
+            ):
+                print(
+                    f"Skipping version {version_info['specific']}: maximum retries reached"
+                )
+                continue
+
+            download_url = version_info["plain_text_link"]
+            if download_url:
+                pending.append((source, config, download_url))
+
+    _map_concurrently(
+        lambda job: _process_archive_stream(*job, scheduler, limiter),
+        pending,
+        max_workers,
+    )
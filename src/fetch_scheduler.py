@@ -0,0 +1,324 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, Self
+from urllib.parse import urlsplit
+
+import requests
+
+# Responses telling a client to slow down or retry later
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Latest request latencies kept per host for percentiles
+LATENCY_SAMPLES = 1000
+
+PERCENTILES = [50, 90, 99]
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def _retry_after(response: requests.Response) -> float:
+    """Seconds a response asks to wait before retrying, 0 if not given in seconds"""
+
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
+
+class _HostState:
+    """Token bucket, concurrency limit and latency samples of one host"""
+
+    def __init__(self, burst: float, max_concurrency: int):
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.successes = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttled = 0
+
+
+class _StreamedResponse:
+    """
+    Streamed response holding its host slot until it is closed
+
+    Attributes are those of the wrapped response, closing it directly or through the
+    context manager frees the slot once
+
+    Args:
+        response (requests.Response): Response whose body is still being read
+        free_slot (Callable[[], None]): Frees the host slot of the request
+    """
+
+    def __init__(self, response: requests.Response, free_slot: Callable[[], None]):
+        self._response = response
+        self._free_slot: Optional[Callable[[], None]] = free_slot
+
+    def __getattr__(self, name: str):
+        return getattr(self._response, name)
+
+    def close(self) -> None:
+        try:
+            self._response.close()
+        finally:
+            free_slot, self._free_slot = self._free_slot, None
+            if free_slot is not None:
+                free_slot()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class FetchScheduler:
+    """
+    Scheduler of HTTP requests shared by all fetches of a run, limiting each host
+
+    Every host gets a token bucket capping its request rate and a concurrency limit
+    adapted to its responses: the limit is halved when a host throttles, fails or times
+    out and grows by one after a full window of successful requests, up to the maximum.
+    Failed attempts are retried with exponential backoff and full jitter, honoring
+    Retry-After. A streamed response holds its host slot until it is closed, so the
+    concurrency limit also bounds the body transfers of archive downloads
+
+    Args:
+        session (requests.Session): Session sending all requests
+        requests_per_second (float | None): Request rate per host, None disables it
+        max_concurrency (int): Maximum number of requests in flight per host
+        timeout (tuple[float, float]): Default connect and read timeouts in seconds
+        retries (int): Number of retries of a failed request
+        backoff (float): Backoff of the first retry in seconds, doubled on every retry
+        max_backoff (float): Cap of a single backoff in seconds
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        requests_per_second: Optional[float] = None,
+        max_concurrency: int = 8,
+        timeout: tuple[float, float] = (10.0, 60.0),
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.session = session
+        self.rate = requests_per_second
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._condition = threading.Condition()
+        self._hosts: dict[str, _HostState] = {}
+
+    def _host(self, host: str) -> _HostState:
+        """State of a host, created on its first request, called with the lock held"""
+
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(max(1.0, self.rate or 0.0), self.max_concurrency)
+            self._hosts[host] = state
+        return state
+
+    def _acquire(self, host: str) -> None:
+        """Block until host has a free slot and a token for one request"""
+
+        with self._condition:
+            state = self._host(host)
+            while state.in_flight >= state.limit:
+                self._condition.wait()
+            state.in_flight += 1
+
+            wait = 0.0
+            if self.rate:
+                # Bucket holds at most one second of requests
+                now = time.monotonic()
+                state.tokens = min(
+                    max(1.0, self.rate),
+                    state.tokens + (now - state.last_refill) * self.rate,
+                )
+                state.last_refill = now
+                state.tokens -= 1
+                wait = -state.tokens / self.rate if state.tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+
+    def _release(
+        self,
+        host: str,
+        latency: Optional[float],
+        outcome: str,
+        free_slot: bool = True,
+    ) -> None:
+        """
+        Free a host slot and adapt its concurrency limit to the request outcome
+
+        Args:
+            host (str): Host the request was sent to
+            latency (float | None): Seconds until response headers, None without one
+            outcome (str): 'ok', 'throttled' for a retryable status, 'error' for a
+                failed connection or timeout or 'aborted' for a request that failed for
+                reasons unrelated to the host, which leaves the limit unchanged
+            free_slot (bool): Free the slot now, False while a streamed body is read
+        """
+
+        with self._condition:
+            state = self._hosts[host]
+            if free_slot:
+                state.in_flight -= 1
+            state.requests += 1
+            if latency is not None:
+                state.latencies.append(latency)
+
+            if outcome == "ok":
+                state.successes += 1
+                if state.successes >= state.limit:
+                    state.successes = 0
+                    state.limit = min(self.max_concurrency, state.limit + 1)
+            elif outcome != "aborted":
+                if outcome == "error":
+                    state.errors += 1
+                else:
+                    state.throttled += 1
+                state.successes = 0
+                state.limit = max(1, state.limit // 2)
+            self._condition.notify_all()
+
+    def _free_slot(self, host: str) -> None:
+        """Free the host slot held by a streamed response"""
+
+        with self._condition:
+            self._hosts[host].in_flight -= 1
+            self._condition.notify_all()
+
+    def _backoff(self, attempt: int, retry_after: float = 0.0) -> float:
+        """Seconds to wait before a retry, drawn with full jitter"""
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        return min(max(delay, retry_after), self.max_backoff)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's limits, retrying failed attempts
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Arguments of requests.Session.request, the scheduler's timeout is
+                used when none is given
+
+        Returns:
+            requests.Response: Response of the last attempt, which may still have a
+                retryable status once retries are exhausted. A streamed response keeps
+                its host slot until it is closed, so it has to be closed or used as a
+                context manager
+
+        Raises:
+            requests.RequestException: Error of the last attempt
+        """
+
+        host = urlsplit(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.retries + 1):
+            self._acquire(host)
+            start_time = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._release(host, None, "error")
+                if attempt == self.retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"Retrying {url} in {delay:.1f}s: {e}")
+            except Exception:
+                self._release(host, None, "aborted")
+                raise
+            else:
+                retry = response.status_code in RETRY_STATUSES
+                final = not retry or attempt == self.retries
+                streamed = final and kwargs.get("stream", False)
+                self._release(
+                    host,
+                    time.perf_counter() - start_time,
+                    "throttled" if retry else "ok",
+                    free_slot=not streamed,
+                )
+                if streamed:
+                    return _StreamedResponse(response, lambda: self._free_slot(host))
+                if final:
+                    return response
+
+                response.close()
+                delay = self._backoff(attempt, _retry_after(response))
+                print(f"Retrying {url} in {delay:.1f}s: HTTP {response.status_code}")
+
+            with self._condition:
+                self._hosts[host].retries += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request, same arguments as requests.Session.get"""
+
+        return self.request("GET", url, **kwargs)
+
+    def host_stats(self) -> dict[str, dict]:
+        """
+        Request counters, current concurrency limit and latency percentiles by host
+
+        Returns:
+            dict[str, dict]: Requests, retries, errors, throttled responses, concurrency
+                limit and p50/p90/p99 latency in milliseconds of every host
+        """
+
+        with self._condition:
+            hosts = {
+                host: (state, sorted(state.latencies))
+                for host, state in self._hosts.items()
+            }
+
+            return {
+                host: {
+                    "requests": state.requests,
+                    "retries": state.retries,
+                    "errors": state.errors,
+                    "throttled": state.throttled,
+                    "concurrency": state.limit,
+                    **{
+                        f"p{percentile}_ms": (
+                            round(_percentile(latencies, percentile) * 1000, 1)
+                            if latencies
+                            else None
+                        )
+                        for percentile in PERCENTILES
+                    },
+                }
+                for host, (state, latencies) in sorted(hosts.items())
+            }
+
+    def summary(self) -> str:
+        """Human readable latency percentiles and counters, one line per host"""
+
+        return "\n".join(
+            f"{host}: {stats['requests']} requests, {stats['retries']} retries, "
+            f"{stats['errors']} errors, concurrency {stats['concurrency']}, latency "
+            + ", ".join(
+                f"p{percentile} {stats[f'p{percentile}_ms']} ms"
+                for percentile in PERCENTILES
+            )
+            for host, stats in self.host_stats().items()
+        )
@@ -1,96 +1,59 @@
-import json
 import os
+from itertools import groupby
 
-from src.gnu_docs.config import DocsConfig, Section
-
-
-def _extract_sections(file_path: str, config: DocsConfig) -> list[Section]:
-    """Extract documentation sections from a file"""
-
-    sections = []
-    current_title = None
-    current_content = []
-
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-        for i in range(1, len(lines)):
-            current_line = lines[i].strip()
-            previous_line = lines[i - 1].strip()
-
-            if _is_separator_line(current_line, config):
-                if current_title:
-                    sections.append(
-                        Section(
-                            title=current_title,
-                            content="\n".join(current_content).strip(),
-                            source_file=os.path.basename(file_path),
-                        )
-                    )
-                current_title = previous_line
-                current_content = []
-            else:
-                current_content.append(current_line)
-
-        # Handle final section
-        if current_title:
-            sections.append(
-                Section(
-                    title=current_title,
-                    content="\n".join(current_content).strip(),
-                    source_file=os.path.basename(file_path),
-                )
-            )
-
-    return sections
-
-
-def _is_separator_line(line: str, config: DocsConfig) -> bool:
-    """Check if line is a section separator"""
-
-    return any(line.startswith(sep * 4) for sep in config.section_separators)
-
-
-def _process_version_directory(
-    version_dir: str,
-    output_file: str,
-    version_number: str,
-    config: DocsConfig,
-) -> None:
-    """Process all files in a version directory and save sections to output file"""
-
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-    with open(output_file, "w", encoding="utf-8") as out_file:
-        sections = _extract_sections(version_dir, config)
-
-        for section in sections:
-            json.dump(
-                {
-                    "section_title": section.title,
-                    "section_content": section.content,
-                    "file_name": section.source_file,
-                },
-                out_file,
-            )
-            out_file.write("\n")
-
-        print(f"Successfully processed {version_number}")
-
-
-def process_documentation(config: DocsConfig) -> None:
-    """Process all version directories and extract documentation sections"""
-
-    for version_dir in os.listdir(config.extracted_path):
-        version_path = os.path.join(config.extracted_path, version_dir)
-
-        if os.path.isfile(version_path):
-            output_file = os.path.join(
-                config.output_path, f"{version_dir.split('.')[0]}-00.00.00.jsonl"
-            )
-            _process_version_directory(
-                version_path,
-                output_file,
-                version_dir,
-                config,
-            )
+from src.config import OutputGroup
+from src.gnu_docs.config import DocsConfig
+from src.gnu_docs.info_reader import SUBFILE_PATTERN
+
+
+def _package_name(file_name: str) -> str:
+    """Package of an extracted docs file, shared by the subfiles of split manuals"""
+
+    return file_name.split(".")[0]
+
+
+def _output_file(package: str, config: DocsConfig) -> str:
+    """Build output file path of a package"""
+
+    return os.path.join(config.output_path, f"{package}-00.00.00.jsonl")
+
+
+def _file_order(file_name: str) -> tuple[str, int]:
+    """Sort key putting the main file of a manual first, then subfiles by number"""
+
+    match = SUBFILE_PATTERN.search(file_name)
+    if match is None:
+        return file_name, 0
+    return file_name[: match.start()], int(match.group()[1:])
+
+
+def output_groups(config: DocsConfig) -> list[OutputGroup]:
+    """Give every package its own output file, holding all files of split manuals"""
+
+    file_names = sorted(
+        (
+            file_name
+            for file_name in os.listdir(config.extracted_path)
+            if os.path.isfile(os.path.join(config.extracted_path, file_name))
+        ),
+        key=lambda file_name: (_package_name(file_name), _file_order(file_name)),
+    )
+
+    return [
+        OutputGroup(
+            output_file=_output_file(package, config),
+            label=package,
+            input_files=[
+                os.path.join(config.extracted_path, file_name)
+                for file_name in package_files
+            ],
+        )
+        for package, package_files in groupby(file_names, key=_package_name)
+    ]
+
+
+def stream_output(config: DocsConfig, member_name: str) -> tuple[str, str]:
+    """Map archive member to the output file of its package"""
+
+    package = _package_name(os.path.basename(member_name))
+    return _output_file(package, config), package
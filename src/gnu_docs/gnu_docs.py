@@ -1,18 +1,20 @@
+from src.config import DocsSource
+from src.gnu_docs import docs_processor, info_reader, version_updater
 from src.gnu_docs.config import DocsConfig
-from src.gnu_docs.docs_downloader import download_and_extract
-from src.gnu_docs.docs_processor import process_documentation
-from src.gnu_docs.version_updater import update_versions
+from src.pipeline import run_pipeline
 
+SOURCE = DocsSource(
+    name="gnu",
+    config_class=DocsConfig,
+    discover_versions=version_updater.discover_versions,
+    parse_version_page=version_updater.parse_version_page,
+    build_version_entry=version_updater.build_version_entry,
+    output_groups=docs_processor.output_groups,
+    stream_output=docs_processor.stream_output,
+    segment=info_reader.split_nodes,
+)
 
-def main():
-    """Main execution flow"""
-    config = DocsConfig()
-
-    # Update versions
-    update_versions(config)
 
-    # Download and extract docs
-    download_and_extract(config)
-
-    # Process docs files
-    process_documentation(config)
+def main(stream: bool = False, workers: int = 1):
+    """Main execution flow"""
+    run_pipeline([SOURCE], stream=stream, workers=workers)
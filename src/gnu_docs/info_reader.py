@@ -0,0 +1,282 @@
+import mmap
+import os
+import re
+from contextlib import ExitStack
+from typing import Callable, Iterator, Optional, Union
+
+from src.config import Section
+from src.gnu_docs.config import DocsConfig
+from src.segmenter import _clean_content
+
+Buffer = Union[bytes, mmap.mmap]
+
+# Tag table offsets of split manuals and older makeinfo versions are approximate, node
+# headers are searched this many bytes around them
+NODE_SEARCH_WINDOW = 1000
+
+# Suffix of the subfiles of a split manual (e.g. 'bash.info-1')
+SUBFILE_PATTERN = re.compile(r"-\d+$")
+
+_HEADER_FIELD = re.compile(
+    rb"(File|Node|Next|Prev|Up):[ \t]*(\x7f[^\x7f]*\x7f|[^,\t\n]*)"
+)
+_TAG_ENTRY = re.compile(rb"^Node: ([^\x7f\n]*)\x7f(\d+)", re.MULTILINE)
+_INDIRECT_ENTRY = re.compile(rb"^([^:\n]+): (\d+)", re.MULTILINE)
+
+
+def _parse_header(line: bytes) -> dict[str, str]:
+    """Parse fields of a node header line, unquoting names quoted with DEL characters"""
+
+    return {
+        name.decode(): value.strip(b"\x7f").strip().decode("utf-8", errors="replace")
+        for name, value in _HEADER_FIELD.findall(line)
+    }
+
+
+def _node_header(buffer: Buffer, position: int) -> Optional[tuple[dict[str, str], int]]:
+    """
+    Parse header of the node whose separator is at a position
+
+    Args:
+        buffer (Buffer): Content of an Info file
+        position (int): Offset of a node separator
+
+    Returns:
+        tuple[dict[str, str], int] | None: Header fields and offset of the node content,
+            None if the separator starts a table instead of a node
+    """
+
+    line_start = buffer.find(b"\n", position) + 1
+    if line_start == 0 or buffer[position + 1 : line_start].strip(b"\f\r\n"):
+        return None
+
+    line_end = buffer.find(b"\n", line_start)
+    if line_end == -1:
+        line_end = len(buffer)
+
+    header = _parse_header(buffer[line_start:line_end])
+    if "Node" not in header:
+        return None
+    return header, line_end + 1
+
+
+def _read_node(buffer: Buffer, position: int) -> Optional[tuple[dict[str, str], str]]:
+    """Read header fields and content of the node whose separator is at a position"""
+
+    node = _node_header(buffer, position)
+    if node is None:
+        return None
+
+    header, content_start = node
+    content_end = buffer.find(b"\x1f", content_start)
+    if content_end == -1:
+        content_end = len(buffer)
+    return header, _clean_content(buffer[content_start:content_end])
+
+
+def walk_nodes(buffer: Buffer) -> Iterator[tuple[dict[str, str], str]]:
+    """
+    Read all nodes of an Info file by walking its node separators in file order
+
+    Args:
+        buffer (Buffer): Content of an Info file or subfile
+
+    Yields:
+        tuple[dict[str, str], str]: Header fields and content of every node
+    """
+
+    position = buffer.find(b"\x1f")
+    while position != -1:
+        node = _read_node(buffer, position)
+        if node is not None:
+            yield node
+        position = buffer.find(b"\x1f", position + 1)
+
+
+def read_tag_table(
+    buffer: Buffer,
+) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+    """
+    Read the indirect table and the node entries of the tag table of an Info file
+
+    Args:
+        buffer (Buffer): Content of the main Info file
+
+    Returns:
+        tuple[list[tuple[str, int]], list[tuple[str, int]]]: Subfile names with their
+            offsets, empty for manuals that are not split, and node names with their
+            offsets in tag table order. Anchors ('Ref:' entries) are left out
+    """
+
+    def table(title: bytes) -> bytes:
+        start = buffer.rfind(b"\x1f\n" + title)
+        if start == -1:
+            return b""
+        end = buffer.find(b"\x1f", start + 1)
+        return buffer[start : end if end != -1 else len(buffer)]
+
+    indirect = [
+        (name.decode(), int(offset))
+        for name, offset in _INDIRECT_ENTRY.findall(table(b"Indirect:\n"))
+    ]
+    nodes = [
+        (name.decode("utf-8", errors="replace"), int(offset))
+        for name, offset in _TAG_ENTRY.findall(table(b"Tag Table:\n"))
+    ]
+    return indirect, nodes
+
+
+def _locate_node(buffer: Buffer, name: str, guess: int) -> Optional[int]:
+    """Find separator of a node's header around its expected offset"""
+
+    position = buffer.find(b"\x1f", max(0, guess - NODE_SEARCH_WINDOW))
+    while position != -1 and position <= guess + NODE_SEARCH_WINDOW:
+        node = _node_header(buffer, position)
+        if node is not None and node[0]["Node"] == name:
+            return position
+        position = buffer.find(b"\x1f", position + 1)
+    return None
+
+
+def _locate_nodes(
+    files: list[tuple[int, Buffer]],
+    tags: list[tuple[str, int]],
+    split: bool,
+) -> Optional[list[tuple[Buffer, int]]]:
+    """
+    Resolve tag table entries to the file and separator offset of each node
+
+    Args:
+        files (list[tuple[int, Buffer]]): Offset of every file in the tag table's
+            coordinates and the file's content, in indirect table order
+        tags (list[tuple[str, int]]): Node names with their tag table offsets
+        split (bool): Whether files are subfiles of a split manual
+
+    Returns:
+        list[tuple[Buffer, int]] | None: File and separator offset of every node, None
+            when any node is not found where the tag table places it
+    """
+
+    located = []
+    for name, offset in tags:
+        index = len(files) - 1
+        while index > 0 and files[index][0] > offset:
+            index -= 1
+
+        file_offset, buffer = files[index]
+        # Offsets of subfiles count from their first separator, after the preamble
+        base = max(buffer.find(b"\x1f"), 0) if split else 0
+        position = _locate_node(buffer, name, offset - file_offset + base)
+        if position is None:
+            return None
+        located.append((buffer, position))
+    return located
+
+
+def iter_nodes(
+    buffer: Buffer,
+    open_subfile: Optional[Callable[[str], Buffer]] = None,
+) -> Iterator[tuple[dict[str, str], str]]:
+    """
+    Read all nodes of an Info manual, jumping to them through its tag table
+
+    Nodes listed in the tag table are read straight from their offsets, across the
+    subfiles of split manuals. Manuals without a usable tag table are read by walking
+    the node separators of every file instead
+
+    Args:
+        buffer (Buffer): Content of the main Info file
+        open_subfile (Callable[[str], Buffer] | None): Opens a subfile of a split manual
+            by name, split manuals yield no nodes without it
+
+    Yields:
+        tuple[dict[str, str], str]: Header fields and content of every node in order
+    """
+
+    indirect, tags = read_tag_table(buffer)
+    if indirect:
+        if open_subfile is None:
+            return
+        files = [(offset, open_subfile(name)) for name, offset in indirect]
+    else:
+        files = [(0, buffer)]
+
+    located = _locate_nodes(files, tags, bool(indirect)) if tags else None
+    if located is None:
+        for _, file_buffer in files:
+            yield from walk_nodes(file_buffer)
+        return
+
+    for file_buffer, position in located:
+        yield _read_node(file_buffer, position)
+
+
+def _node_sections(
+    nodes: Iterator[tuple[dict[str, str], str]],
+    source_file: str,
+) -> Iterator[Section]:
+    """Turn Info nodes into sections with their links to other nodes"""
+
+    for header, content in nodes:
+        yield Section(
+            title=header["Node"],
+            content=content,
+            source_file=header.get("File") or source_file,
+            metadata={
+                "node_up": header.get("Up"),
+                "node_next": header.get("Next"),
+                "node_prev": header.get("Prev"),
+            },
+        )
+
+
+def split_nodes(
+    buffer: Buffer,
+    source_file: str,
+    config: DocsConfig,
+) -> Iterator[Section]:
+    """
+    Split an Info file into one section per node
+
+    Extracted split manuals are read through the tag table of their main file, which
+    opens the subfiles next to it, so subfiles yield nothing on their own. Streamed
+    archives only hold one member at a time, there every file's nodes are walked
+
+    Args:
+        buffer (Buffer): Content of an Info file, may be a memory map
+        source_file (str): Name of the Info file
+        config (DocsConfig): Config with the path of extracted files
+
+    Yields:
+        Section: Node name as title, node content and links to other nodes
+    """
+
+    if SUBFILE_PATTERN.search(source_file):
+        main_file = os.path.join(
+            config.extracted_path, SUBFILE_PATTERN.sub("", source_file)
+        )
+        if not config.streaming and os.path.isfile(main_file):
+            return
+        yield from _node_sections(walk_nodes(buffer), source_file)
+        return
+
+    if config.streaming:
+        yield from _node_sections(iter_nodes(buffer), source_file)
+        return
+
+    with ExitStack() as stack:
+
+        def open_subfile(name: str) -> Buffer:
+            file_path = os.path.join(config.extracted_path, name)
+            if not os.path.isfile(file_path):
+                print(f"Missing subfile of {source_file}: {name}")
+                return b""
+
+            file = stack.enter_context(open(file_path, "rb"))
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+            return stack.enter_context(
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            )
+
+        yield from _node_sections(iter_nodes(buffer, open_subfile), source_file)
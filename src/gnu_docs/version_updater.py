@@ -1,21 +1,21 @@
 from datetime import datetime
 from typing import Any, Optional
 
-import requests
-import yaml
-from bs4 import BeautifulSoup
-
+from src.config import VersionCheck
 from src.gnu_docs.config import DocsConfig, VersionMetadata
+from src.page_extractor import extract_page
 from src.utils import _parse_update_date
 
+# Substring of the href of the Info docs download link
+DOWNLOAD_LINK_MARKER = ".info.tar.gz"
+
 
-def _find_download_link(soup: BeautifulSoup, url: str) -> Optional[str]:
-    """Find docs download link from the page"""
+def _find_download_link(links: list[str], url: str) -> Optional[str]:
+    """Find docs download link among the links of the page"""
 
     try:
-        for link in soup.find_all("a", href=True):
-            href: str = link["href"]
-            if ".info.tar.gz" in href:
+        for href in links:
+            if DOWNLOAD_LINK_MARKER in href:
                 return url.format(version=href.split(".")[0]) + href
         return None
 
@@ -24,43 +24,36 @@ def _find_download_link(soup: BeautifulSoup, url: str) -> Optional[str]:
         return None
 
 
+def parse_version_page(content: bytes, check: VersionCheck) -> dict[str, Optional[str]]:
+    """Parse last update date and download link from docs page"""
+
+    page = extract_page(content, ["addresses", "links"], DOWNLOAD_LINK_MARKER)
+
+    # Extract last update date
+    last_updated = None
+    for address in page.addresses:
+        if "last updated" in address:
+            last_updated = _parse_update_date(address.strip())
+
+    return {
+        "last_update": last_updated,
+        "download_url": _find_download_link(page.links, check.url),
+    }
+
+
 def _extract_version_info(
     version: str,
-    url: str,
     current_metadata: dict[str, Any],
-):
-    """Extract version information from docs page"""
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Extract last update date
-        address_elements = soup.find_all("address")
-        for address_element in address_elements:
-            if "last updated" in address_element.text:
-                update_element = address_element
-
-                last_updated = (
-                    _parse_update_date(update_element.text.strip())
-                    if update_element
-                    else None
-                )
-
-        # Extract download link
-        download_url = _find_download_link(soup, url)
-
-        return VersionMetadata(
-            last_checked=datetime.now().date().isoformat(),
-            last_update=last_updated or current_metadata["last_update"],
-            download_url=download_url or current_metadata["plain_text_link"],
-            specific_version=version or current_metadata["specific"],
-        )
+    page_info: dict[str, Optional[str]],
+) -> VersionMetadata:
+    """Extract version information from parsed docs page"""
 
-    except Exception as e:
-        print(f"Error processing {version}: {e}")
-        return _handle_version_error(current_metadata)
+    return VersionMetadata(
+        last_checked=datetime.now().date().isoformat(),
+        last_update=page_info["last_update"] or current_metadata["last_update"],
+        download_url=page_info["download_url"] or current_metadata["plain_text_link"],
+        specific_version=version or current_metadata["specific"],
+    )
 
 
 def _handle_version_error(metadata: dict[str, Any]) -> VersionMetadata:
@@ -74,27 +67,39 @@ def _handle_version_error(metadata: dict[str, Any]) -> VersionMetadata:
     )
 
 
-def update_versions(config: DocsConfig) -> None:
-    """Update version information for all versions"""
-
-    with open(config.versions_file, "r") as file:
-        data: dict = yaml.safe_load(file)
+def discover_versions(
+    config: DocsConfig,
+    data: dict,
+) -> tuple[list[VersionCheck], dict[str, dict]]:
+    """List docs pages to check for all versions"""
 
-    updated_versions = {}
-    unchanged_versions = {}
-    for version, metadata in dict(data["versions"]).items():
-        url = str(data["url"]).format(version=version)
-
-        updated_info = _extract_version_info(version, url, metadata)
-        updated_versions[version] = {
-            "last_checked": updated_info.last_checked,
-            "last_update": updated_info.last_update,
-            "plain_text_link": updated_info.download_url,
-            "specific": updated_info.specific_version,
-        }
-
-        print(f"Finished checking {version}")
-
-    data["versions"] = {**unchanged_versions, **updated_versions}
-    with open(config.versions_file, "w") as file:
-        yaml.dump(data, file, default_flow_style=False)
+    checks = [
+        VersionCheck(
+            key=version,
+            label=version,
+            url=str(data["url"]).format(version=version),
+            metadata=metadata,
+        )
+        for version, metadata in dict(data["versions"]).items()
+    ]
+    return checks, {}
+
+
+def build_version_entry(
+    config: DocsConfig,
+    check: VersionCheck,
+    page_info: Optional[dict[str, Optional[str]]],
+) -> dict[str, Any]:
+    """Build versions.yaml entry from parsed page info or from a failed check"""
+
+    if page_info is None:
+        updated_info = _handle_version_error(check.metadata)
+    else:
+        updated_info = _extract_version_info(check.key, check.metadata, page_info)
+
+    return {
+        "last_checked": updated_info.last_checked,
+        "last_update": updated_info.last_update,
+        "plain_text_link": updated_info.download_url,
+        "specific": updated_info.specific_version,
+    }
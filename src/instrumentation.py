@@ -0,0 +1,196 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Iterator
+
+STAGES = ["update", "download", "extract", "process", "index", "upload"]
+
+
+@dataclass
+class StageEvent:
+    """Counters of one stage run for one item, such as a version or output file"""
+
+    stage: str
+    key: str
+    seconds: float = 0.0
+    bytes: int = 0
+    records: int = 0
+    errors: int = 0
+
+
+_hooks: list[Callable[[StageEvent], None]] = []
+
+
+def add_hook(hook: Callable[[StageEvent], None]) -> None:
+    """Register callable receiving every finished stage event"""
+
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[StageEvent], None]) -> None:
+    """Unregister stage event hook"""
+
+    _hooks.remove(hook)
+
+
+def emit(event: StageEvent) -> None:
+    """Pass finished stage event to all registered hooks"""
+
+    for hook in _hooks:
+        hook(event)
+
+
+def emit_hosts(stats: dict[str, dict]) -> None:
+    """Pass request stats by host of a fetch scheduler to registered run reports"""
+
+    for hook in _hooks:
+        if isinstance(hook, RunReport):
+            hook.hosts.update(stats)
+
+
+@contextmanager
+def measure(stage: str, key: str) -> Iterator[StageEvent]:
+    """
+    Time a stage for one item and emit its event when done
+
+    The caller fills in bytes, records and errors on the yielded event, an exception
+    escaping the block is counted as an error. Nothing is emitted without hooks
+
+    Args:
+        stage (str): Stage name (e.g. 'download', 'process')
+        key (str): Item the stage ran for (e.g. 'python_docs/3.12.1')
+
+    Yields:
+        StageEvent: Event to record counters on
+    """
+
+    event = StageEvent(stage=stage, key=key)
+    start_time = time.perf_counter()
+    try:
+        yield event
+    except BaseException:
+        event.errors += 1
+        raise
+    finally:
+        event.seconds = time.perf_counter() - start_time
+        if _hooks:
+            emit(event)
+
+
+class RunReport:
+    """
+    Stage event hook collecting a machine readable report of a run
+
+    Totals are kept per stage and per source, where the source is the part of an event
+    key before the first '/'. Stage seconds are summed over items, so stages running
+    items concurrently can add up to more than the wall-clock time. Request stats of
+    the fetch scheduler are kept per host
+
+    Args:
+        command (list[str]): Command line of the run
+    """
+
+    def __init__(self, command: list[str]):
+        self.command = command
+        self.events: list[StageEvent] = []
+        self.hosts: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._started = datetime.now()
+        self._start_time = time.perf_counter()
+
+    def __call__(self, event: StageEvent) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self) -> dict:
+        """Build report with stage, source and host totals and all item events"""
+
+        stages = {}
+        sources = {}
+        for event in self.events:
+            source = event.key.split("/")[0]
+            for totals in (
+                stages.setdefault(event.stage, {}),
+                sources.setdefault(source, {}).setdefault(event.stage, {}),
+            ):
+                totals["items"] = totals.get("items", 0) + 1
+                totals["seconds"] = round(totals.get("seconds", 0.0) + event.seconds, 4)
+                totals["bytes"] = totals.get("bytes", 0) + event.bytes
+                totals["records"] = totals.get("records", 0) + event.records
+                totals["errors"] = totals.get("errors", 0) + event.errors
+
+        return {
+            "command": self.command,
+            "started": self._started.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._start_time, 4),
+            "stages": {
+                stage: stages[stage]
+                for stage in STAGES + sorted(set(stages) - set(STAGES))
+                if stage in stages
+            },
+            "sources": dict(sorted(sources.items())),
+            "hosts": dict(sorted(self.hosts.items())),
+            "items": [
+                {**asdict(event), "seconds": round(event.seconds, 4)}
+                for event in self.events
+            ],
+        }
+
+    def save(self, file_path: str) -> None:
+        """Write report as JSON to file"""
+
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2)
+        print(f"Saved run report to {file_path}")
+
+
+def profile_call(func: Callable[[], None], mode: str, output_file: str) -> None:
+    """
+    Run function under cProfile or tracemalloc and save the results
+
+    cProfile stats are dumped in pstats format and only cover the calling thread,
+    tracemalloc writes the top allocation sites and peak traced memory as text
+
+    Args:
+        func (Callable[[], None]): Function to run
+        mode (str): 'cpu' for cProfile or 'memory' for tracemalloc
+        output_file (str): Path of saved profile
+    """
+
+    if mode == "cpu":
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(func)
+        finally:
+            profiler.dump_stats(output_file)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+    elif mode == "memory":
+        tracemalloc.start(25)
+        try:
+            func()
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            lines = [f"Peak traced memory: {peak / 1024**2:.1f} MB", ""]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:50]]
+            with open(output_file, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+            print("\n".join(lines[:22]))
+
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    print(f"Saved {mode} profile to {output_file}")
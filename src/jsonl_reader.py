@@ -0,0 +1,177 @@
+import mmap
+import os
+import random
+import sys
+from array import array
+from typing import Any, Iterator, Optional, Self, Sequence, Union
+
+from src.jsonl_writer import INDEX_SUFFIX, parse_record, save_offsets
+
+
+def scan_offsets(buffer: Union[bytes, mmap.mmap]) -> array:
+    """Build offset index of JSON lines by scanning for line ends"""
+
+    offsets = array("Q", [0])
+    position = buffer.find(b"\n")
+    while position != -1:
+        offsets.append(position + 1)
+        position = buffer.find(b"\n", position + 1)
+
+    # Last record may lack its line end
+    if offsets[-1] != len(buffer):
+        offsets.append(len(buffer))
+    return offsets
+
+
+def load_offsets(index_file: str) -> Sequence[int]:
+    """Load offset index written by save_offsets"""
+
+    with open(index_file, "rb") as file:
+        offsets = array("Q")
+        offsets.frombytes(file.read())
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+class JsonlReader:
+    """
+    Random access reader of a JSONL file backed by its offset index
+
+    The file is memory-mapped and records are only decoded when accessed, so lookup,
+    slicing and sampling cost the same regardless of file size. Files without a valid
+    index are scanned for line ends once, optionally saving the rebuilt index
+
+    Args:
+        file_path (str): Path of JSONL file
+        index_file (str | None): Path of offset index, '<file_path>.idx' if None
+        rebuild_index (bool): Save index rebuilt for a file with a missing or stale one
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        index_file: Optional[str] = None,
+        rebuild_index: bool = False,
+    ):
+        self.file_path = file_path
+        self.index_file = index_file or file_path + INDEX_SUFFIX
+
+        # The mapping keeps its own handle, so the file can be closed right away
+        with open(file_path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            self._buffer = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+
+        offsets = None
+        if os.path.exists(self.index_file):
+            offsets = load_offsets(self.index_file)
+            # Index of an older write of the file no longer matches its size
+            if not offsets or offsets[-1] != size:
+                offsets = None
+
+        if offsets is None:
+            offsets = scan_offsets(self._buffer)
+            if rebuild_index:
+                save_offsets(self.index_file, offsets)
+        self._offsets = offsets
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(
+        self, key: Union[int, slice]
+    ) -> Union[dict[str, Any], list[dict[str, Any]]]:
+        if isinstance(key, slice):
+            return [self._record(index) for index in range(*key.indices(len(self)))]
+        return self._record(self._position(key))
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.records()
+
+    def _position(self, index: int) -> int:
+        """Resolve negative record index and check bounds"""
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Record index out of range: {index}")
+        return index
+
+    def _record(self, index: int) -> dict[str, Any]:
+        """Decode record at a valid index"""
+
+        return parse_record(
+            self._buffer[self._offsets[index] : self._offsets[index + 1]]
+        )
+
+    def raw(self, index: int) -> bytes:
+        """Undecoded JSON line of a record"""
+
+        index = self._position(index)
+        return self._buffer[self._offsets[index] : self._offsets[index + 1]]
+
+    def records(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        columns: Optional[list[str]] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream records of an index range, optionally keeping only some columns
+
+        Args:
+            start (int): Index of first record
+            stop (int | None): Index after last record, end of file if None
+            columns (list[str] | None): Columns to keep, all if None
+
+        Yields:
+            dict[str, Any]: Records in file order
+        """
+
+        for index in range(*slice(start, stop).indices(len(self))):
+            record = self._record(index)
+            if columns is not None:
+                record = {column: record[column] for column in columns}
+            yield record
+
+    def sample(
+        self,
+        size: float,
+        seed: Optional[int] = None,
+        columns: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Draw a uniform sample of records without replacement, only decoding those drawn
+
+        Args:
+            size (int | float): Number of records, or fraction of records as float
+            seed (int | None): Seed of the random generator
+            columns (list[str] | None): Columns to keep, all if None
+
+        Returns:
+            list[dict[str, Any]]: Sampled records in file order
+        """
+
+        count = round(size * len(self)) if isinstance(size, float) else size
+        indices = sorted(random.Random(seed).sample(range(len(self)), count))
+        records = [self._record(index) for index in indices]
+        if columns is not None:
+            records = [
+                {column: record[column] for column in columns} for record in records
+            ]
+        return records
+
+    def close(self) -> None:
+        """Unmap the file"""
+
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import sys
+import time
+from array import array
+from typing import Any, Iterable, Optional, Self
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Encoder in use, output bytes differ between them
+ENCODER_NAME = "orjson" if orjson is not None else "json"
+
+# Suffix of the offset index written next to a JSONL file
+INDEX_SUFFIX = ".idx"
+
+
+def serialize_lines(records: list[dict[str, Any]]) -> list[bytes]:
+    """Serialize records into separate JSON lines"""
+
+    if orjson is not None:
+        return [
+            orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records
+        ]
+    return [(json.dumps(record) + "\n").encode("utf-8") for record in records]
+
+
+def serialize_records(records: list[dict[str, Any]]) -> bytes:
+    """Serialize records into JSON lines in one go"""
+
+    if orjson is not None:
+        return b"".join(serialize_lines(records))
+    return "".join([json.dumps(record) + "\n" for record in records]).encode("utf-8")
+
+
+def parse_record(line: bytes) -> dict[str, Any]:
+    """Parse one JSON line"""
+
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def save_offsets(index_file: str, offsets: array) -> None:
+    """
+    Write record offsets of a JSONL file as little-endian unsigned 64-bit integers
+
+    The index holds the start offset of every record followed by the file size, so
+    record i spans offsets i to i + 1
+
+    Args:
+        index_file (str): Path of the offset index
+        offsets (array): Offsets of type code 'Q'
+    """
+
+    if sys.byteorder != "little":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    with open(index_file, "wb") as file:
+        offsets.tofile(file)
+
+
+class JsonlWriter:
+    """
+    Buffered JSON lines writer with batched serialization
+
+    Records are collected into batches which are serialized in one go and written through
+    a large file buffer. orjson is used when installed, otherwise the stdlib encoder with
+    its default output format. With an index file the byte offset of every record is
+    kept and written to it on close
+
+    Args:
+        file_path (str): Path of output JSONL file
+        batch_size (int): Number of records serialized per batch
+        buffer_size (int): Size of the file write buffer in bytes
+        index_file (str | None): Path of the offset index, None to write no index
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        batch_size: int = 1000,
+        buffer_size: int = 1024 * 1024,
+        index_file: Optional[str] = None,
+    ):
+        self.file_path = file_path
+        self.index_file = index_file
+        self.batch_size = batch_size
+        self.records = 0
+        self.bytes_written = 0
+
+        self._batch: list[dict[str, Any]] = []
+        self._digest = hashlib.sha256()
+        self._offsets = array("Q", [0]) if index_file else None
+        # Handle outlives __init__, it is closed by close() or on leaving the context
+        self._file = open(file_path, "wb", buffering=buffer_size)  # noqa: SIM115
+        self._start_time = time.perf_counter()
+        self._elapsed = 0.0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Add a record to the current batch"""
+
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[dict[str, Any]]) -> None:
+        """Add records to the current batch"""
+
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Serialize and write the current batch"""
+
+        if not self._batch:
+            return
+
+        if self._offsets is None:
+            data = serialize_records(self._batch)
+        else:
+            lines = serialize_lines(self._batch)
+            end = self._offsets[-1]
+            for line in lines:
+                end += len(line)
+                self._offsets.append(end)
+            data = b"".join(lines)
+
+        self._file.write(data)
+        self._digest.update(data)
+        self.records += len(self._batch)
+        self.bytes_written += len(data)
+        self._batch.clear()
+
+    def close(self) -> None:
+        """Write remaining records and close the file"""
+
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._file.close()
+        if self._offsets is not None:
+            save_offsets(self.index_file, self._offsets)
+        self._elapsed = time.perf_counter() - self._start_time
+
+    @property
+    def text_bytes(self) -> int:
+        """Bytes of serialized JSON lines, the same as written bytes"""
+
+        return self.bytes_written
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 of serialized JSON lines written so far"""
+
+        return self._digest.hexdigest()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the writer has been or was open"""
+
+        return self._elapsed or time.perf_counter() - self._start_time
+
+    @property
+    def records_per_second(self) -> float:
+        """Records written per second while the writer was open"""
+
+        return self.records / max(self.elapsed, 1e-6)
+
+    def summary(self) -> str:
+        """Human readable summary of written records and bytes"""
+
+        return (
+            f"{self.records} records, {self.bytes_written / 1024**2:.1f} MB, "
+            f"{self.records_per_second:,.0f} records/s"
+        )
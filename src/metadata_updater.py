@@ -1,89 +1,156 @@
 import argparse
+import glob
+import os
 from datetime import datetime
 
-from huggingface_hub import HfApi, list_repo_files, metadata_update
+from huggingface_hub import HfApi, metadata_update
 from huggingface_hub.utils import GatedRepoError, RepositoryNotFoundError
 
-from src.utils import _get_huggingface_token
+from src.utils import _get_huggingface_token, _load_json_file
 
 
-def _generate_configs(repo_id: str, token: str) -> list:
-    """Generate lang docs configurations from uploaded datasets on HuggingFace"""
+def _load_dataset_outputs(base: str) -> list[tuple[str, dict]]:
+    """
+    Collect outputs recorded in the dataset manifests of all lang docs directories
 
-    client = HfApi(token=token)
-    try:
-        client.auth_check(repo_id=repo_id, repo_type="dataset", token=token)
-    except (GatedRepoError, RepositoryNotFoundError) as e:
-        print(f"Repository access error: {e}")
-        return []
-
-    # Get files from repo
-    versions = [
-        version
-        for version in list_repo_files(
-            repo_id=repo_id,
-            repo_type="dataset",
-            token=token,
-        )
-        if version.endswith(".jsonl")
-    ]
+    Entries whose files no longer exist locally are left out. The data uploader only
+    deletes their files from the repo when run with '--delete', otherwise they stay in
+    the repo without a config
 
-    # Create specific config entries
-    configs = []
-    for version in versions:
-        # Parse language and version
-        version = version.replace(".jsonl", "")
-        lang_docs = version.split("/")[1]
-        lang = version.split("/")[-1].split("-")[0]
-        version = version.split("/")[-1].split("-")[1]
+    Args:
+        base (str): Directory containing the lang docs directories
+
+    Returns:
+        list[tuple[str, dict]]: Lang docs directory and manifest entry of every output
+    """
+
+    outputs = []
+    for manifest_file in sorted(
+        glob.glob(os.path.join(base, "*_docs", "dataset_manifest.json"))
+    ):
+        lang_docs_dir = os.path.dirname(manifest_file)
+        lang_docs = os.path.basename(lang_docs_dir)
+        for entry in _load_json_file(manifest_file).values():
+            # Paths in repo are 'data/<lang_docs>/...', locally '<lang_docs>/data/...'
+            local_path = os.path.join(
+                lang_docs_dir, "data", *entry["path"].split("/")[2:]
+            )
+            if glob.glob(local_path):
+                outputs.append((lang_docs, entry))
+
+    return outputs
+
+
+def _config_sort_key(config: dict) -> str:
+    """Sort configs by their first data files path"""
+
+    path = config["data_files"][0]["path"]
+    return path if isinstance(path, str) else path[0]
+
+
+def _dataset_info(config_name: str, entries: list[dict]) -> dict:
+    """Build dataset_info entry of a config from its manifest entries"""
+
+    num_bytes = sum(entry["num_bytes"] for entry in entries)
+    return {
+        "config_name": config_name,
+        "splits": [
+            {
+                "name": "train",
+                "num_bytes": num_bytes,
+                "num_examples": sum(entry["rows"] for entry in entries),
+            }
+        ],
+        "download_size": sum(entry["bytes"] for entry in entries),
+        "dataset_size": num_bytes,
+    }
+
+
+def _generate_metadata(base: str) -> tuple[list, list]:
+    """
+    Generate lang docs configurations and split statistics from local dataset manifests
 
-        # Clean up version format
-        # cleaned_version = ".".join([str(int(part)) for part in version.split(".")])
+    Args:
+        base (str): Directory containing the lang docs directories
 
-        # Config entry for each version
+    Returns:
+        tuple[list, list]: Configs and dataset_info entries, in the same order
+    """
+
+    outputs = _load_dataset_outputs(base)
+
+    # Create specific config entries
+    configs = []
+    dataset_info = {}
+    for _, entry in outputs:
         configs.append(
             {
-                "config_name": f"{lang}-{version}",
+                "config_name": entry["config_name"],
                 "data_files": [
                     {
                         "split": "train",
-                        "path": f"data/{lang_docs}/{lang}-{version}.jsonl",
+                        "path": entry["path"],
                     }
                 ],
             }
         )
+        dataset_info[entry["config_name"]] = _dataset_info(
+            entry["config_name"], [entry]
+        )
 
-    # Add general config entry for each unique language
-    unique_langs = set(version.split("/")[1] for version in versions)
+    # Add general config entry for each unique language covering all its layouts,
+    # dedup content stores and deltas have other columns and only get their own config
+    unique_langs = set(lang_docs for lang_docs, _ in outputs)
     for lang_docs in unique_langs:
+        entries = [
+            entry
+            for data_lang_docs, entry in outputs
+            if data_lang_docs == lang_docs
+            and entry.get("kind") not in ("content", "delta")
+        ]
+        patterns = sorted(
+            {
+                entry["path"].replace(f"/{entry['config_name']}", "/*", 1)
+                for entry in entries
+            }
+        )
         configs.append(
             {
                 "config_name": f"{lang_docs}",
                 "data_files": [
                     {
                         "split": "train",
-                        "path": f"data/{lang_docs}/*.jsonl",
+                        "path": patterns[0] if len(patterns) == 1 else patterns,
                     }
                 ],
             }
         )
+        dataset_info[lang_docs] = _dataset_info(lang_docs, entries)
 
-    return sorted(configs, key=lambda x: x["data_files"][0]["path"])
+    configs = sorted(configs, key=_config_sort_key)
+    return configs, [dataset_info[config["config_name"]] for config in configs]
 
 
 def _upload_metadata_to_hf(repo_id: str, token: str) -> None:
-    """Upload lang docs configurations to HuggingFace"""
+    """Upload lang docs configurations and split statistics to HuggingFace"""
 
-    configs = _generate_configs(repo_id, token)
+    configs, dataset_info = _generate_metadata(os.path.join(os.getcwd(), "src"))
     if not configs:
         print("No configs generated")
         return
 
+    client = HfApi(token=token)
+    try:
+        client.auth_check(repo_id=repo_id, repo_type="dataset", token=token)
+    except (GatedRepoError, RepositoryNotFoundError) as e:
+        print(f"Repository access error: {e}")
+        return
+
     # Upload metadata to HuggingFace
     metadata_update(
         commit_message=f"Update readme | {datetime.now().date()}",
-        commit_description="Update readme with lang docs config names",
-        metadata={"configs": configs},
+        commit_description="Update readme with lang docs config names and statistics",
+        metadata={"configs": configs, "dataset_info": dataset_info},
         repo_id=repo_id,
         repo_type="dataset",
         token=token,
@@ -0,0 +1,158 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Iterable, Optional
+
+from src.config import PageElements
+
+# Fields of PageElements an extractor can collect
+PAGE_FIELDS = ["title", "update_text", "addresses", "links"]
+
+# Bytes decoded and fed to the parser between checks for completion
+CHUNK_SIZE = 16 * 1024
+
+# Tag of the single elements whose text is collected into each field
+_FIELD_TAGS = {
+    "title": "title",
+    "update_text": "b",
+}
+
+
+class _PageExtractor(HTMLParser):
+    """
+    Streaming parser collecting only the elements version pages are read for
+
+    No document tree is built: text of the first '<title>', text of the first '<b>'
+    following the first '<p>', text of '<address>' elements and hrefs of links
+    containing a marker are collected as the page is fed
+
+    Args:
+        fields (Iterable[str]): Fields of PageElements to collect
+        link_marker (str): Substring of hrefs of links to collect
+    """
+
+    def __init__(self, fields: Iterable[str], link_marker: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.fields = set(fields)
+        self.link_marker = link_marker
+        self.elements = PageElements()
+
+        unknown = self.fields.difference(PAGE_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown page fields: {', '.join(sorted(unknown))}. "
+                f"Available values: {', '.join(PAGE_FIELDS)}"
+            )
+
+        self._seen_paragraph = False
+        # Depth and text parts of elements whose text is being collected, by field
+        self._depths: dict[str, int] = {}
+        self._parts: dict[str, list[str]] = {}
+        # Index and text parts of open addresses, innermost last
+        self._addresses: list[tuple[int, list[str]]] = []
+
+    @property
+    def complete(self) -> bool:
+        """Whether the rest of the page can no longer change the collected fields"""
+
+        elements = self.elements
+        return (
+            # Every address of the page is needed, so only the end completes them
+            "addresses" not in self.fields
+            and ("title" not in self.fields or elements.title is not None)
+            and ("update_text" not in self.fields or elements.update_text is not None)
+            and ("links" not in self.fields or bool(elements.links))
+        )
+
+    def _wanted(self, tag: str) -> str:
+        """Field a start tag begins collecting text for, empty if none"""
+
+        if tag == "title" and self.elements.title is None:
+            field = "title"
+        elif tag == "b" and self._seen_paragraph and self.elements.update_text is None:
+            field = "update_text"
+        else:
+            return ""
+        return field if field in self.fields and field not in self._depths else ""
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag == "p":
+            self._seen_paragraph = True
+        elif tag == "a" and "links" in self.fields:
+            # Repeated attributes keep their last value
+            href = dict(attrs).get("href")
+            if href and self.link_marker in href:
+                self.elements.links.append(href)
+        elif tag == "address" and "addresses" in self.fields:
+            # Nested addresses are elements of their own, kept in document order
+            self.elements.addresses.append("")
+            self._addresses.append((len(self.elements.addresses) - 1, []))
+
+        for field in self._depths:
+            if _FIELD_TAGS[field] == tag:
+                self._depths[field] += 1
+
+        field = self._wanted(tag)
+        if field:
+            self._depths[field] = 1
+            self._parts[field] = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "address" and self._addresses:
+            index, parts = self._addresses.pop()
+            self.elements.addresses[index] = "".join(parts)
+
+        for field in [field for field in self._depths if _FIELD_TAGS[field] == tag]:
+            self._depths[field] -= 1
+            if self._depths[field]:
+                continue
+
+            del self._depths[field]
+            setattr(self.elements, field, "".join(self._parts.pop(field)))
+
+    def handle_data(self, data: str) -> None:
+        for parts in self._parts.values():
+            parts.append(data)
+        for _, parts in self._addresses:
+            parts.append(data)
+
+    def close(self) -> None:
+        super().close()
+        # Elements left open at the end of the page hold the rest of its text
+        while self._addresses:
+            self.handle_endtag("address")
+        for field in list(self._depths):
+            self._depths[field] = 1
+            self.handle_endtag(_FIELD_TAGS[field])
+
+
+def extract_page(
+    content: bytes,
+    fields: Iterable[str],
+    link_marker: str = "",
+) -> PageElements:
+    """
+    Collect elements of a docs page, stopping as soon as all of them were found
+
+    The page is decoded and parsed incrementally, so the rest of a page is neither
+    decoded nor parsed once the requested elements are complete
+
+    Args:
+        content (bytes): UTF-8 page content
+        fields (Iterable[str]): Fields of PageElements to collect
+        link_marker (str): Substring of hrefs of links to collect
+
+    Returns:
+        PageElements: Collected elements, fields not requested are left empty
+    """
+
+    extractor = _PageExtractor(fields, link_marker)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    for start in range(0, len(content), CHUNK_SIZE):
+        extractor.feed(decoder.decode(content[start : start + CHUNK_SIZE]))
+        if extractor.complete:
+            return extractor.elements
+
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.elements
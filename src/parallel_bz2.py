@@ -0,0 +1,188 @@
+import bz2
+import io
+import mmap
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+# 48-bit markers that start a compressed block and end a stream (digits of pi and sqrt(pi))
+BLOCK_MAGIC = 0x314159265359
+EOS_MAGIC = 0x177245385090
+MAGIC_BITS = 48
+CRC_BITS = 32
+
+
+@dataclass
+class Bz2Block:
+    """Location of a compressed block inside a bzip2 file"""
+
+    bit_start: int
+    bit_end: int
+    level: bytes
+
+
+def _find_bit_pattern(data: bytes, pattern: int) -> list[int]:
+    """Find bit offsets of every occurrence of a 48-bit pattern in data"""
+
+    offsets = []
+    for shift in range(8):
+        # Lay the pattern out at this bit shift and search for its fully covered bytes
+        total_bytes = (shift + MAGIC_BITS + 7) // 8
+        trailing_bits = total_bytes * 8 - shift - MAGIC_BITS
+        pattern_bytes = (pattern << trailing_bits).to_bytes(total_bytes, "big")
+        first_full = 1 if shift else 0
+        last_full = total_bytes - 1 if trailing_bits else total_bytes
+        needle = pattern_bytes[first_full:last_full]
+
+        position = data.find(needle)
+        while position != -1:
+            byte_start = position - first_full
+            if byte_start >= 0 and byte_start + total_bytes <= len(data):
+                window = int.from_bytes(data[byte_start : byte_start + total_bytes])
+                if (window >> trailing_bits) & ((1 << MAGIC_BITS) - 1) == pattern:
+                    offsets.append(byte_start * 8 + shift)
+            position = data.find(needle, position + 1)
+
+    return sorted(offsets)
+
+
+def _find_blocks(data: bytes) -> list[Bz2Block]:
+    """Locate all compressed blocks across the concatenated streams of a bzip2 file"""
+
+    if data[:3] != b"BZh":
+        raise OSError("Not a bzip2 file")
+
+    markers = sorted(
+        [(offset, False) for offset in _find_bit_pattern(data, BLOCK_MAGIC)]
+        + [(offset, True) for offset in _find_bit_pattern(data, EOS_MAGIC)]
+    )
+
+    blocks = []
+    stream_start = 0
+    level = data[3:4]
+    for index, (offset, is_end) in enumerate(markers):
+        # Markers before the current stream header belong to no stream
+        if offset < (stream_start + 4) * 8:
+            continue
+
+        if is_end:
+            # Next stream header follows the byte-aligned stream CRC
+            stream_start = (offset + MAGIC_BITS + CRC_BITS + 7) // 8
+            if data[stream_start : stream_start + 3] != b"BZh":
+                break
+            level = data[stream_start + 3 : stream_start + 4]
+            continue
+
+        if index + 1 >= len(markers):
+            raise OSError("Truncated bzip2 stream")
+        blocks.append(Bz2Block(offset, markers[index + 1][0], level))
+
+    return blocks
+
+
+def _decompress_block(task: tuple[bytes, int, int, bytes]) -> bytes:
+    """Wrap a single compressed block in its own bzip2 stream and decompress it"""
+
+    segment, bit_offset, bit_length, level = task
+
+    value = int.from_bytes(segment) >> (len(segment) * 8 - bit_offset - bit_length)
+    value &= (1 << bit_length) - 1
+
+    # Stream CRC of a single block stream equals the block CRC following the magic
+    block_crc = (value >> (bit_length - MAGIC_BITS - CRC_BITS)) & 0xFFFFFFFF
+    value = (value << (MAGIC_BITS + CRC_BITS)) | (EOS_MAGIC << CRC_BITS) | block_crc
+    bit_length += MAGIC_BITS + CRC_BITS
+
+    padding = -bit_length % 8
+    body = (value << padding).to_bytes((bit_length + padding) // 8)
+    return bz2.decompress(b"BZh" + level + body)
+
+
+class ParallelBZ2File(io.RawIOBase):
+    """
+    Read-only bzip2 file object that decompresses independent blocks across a process pool
+
+    Block boundaries are found by scanning for the 48-bit block magic, each block is
+    rewrapped as a standalone stream and decompressed in a worker process. Results are
+    returned in block order, with a bounded number of blocks in flight
+
+    Args:
+        source (str | bytes): Path to a bzip2 file or its compressed content
+        max_workers (int | None): Number of worker processes, defaults to CPU count
+        prefetch_blocks (int | None): Blocks decompressed ahead of the reader
+    """
+
+    def __init__(
+        self,
+        source: str | bytes,
+        max_workers: Optional[int] = None,
+        prefetch_blocks: Optional[int] = None,
+    ):
+        super().__init__()
+
+        self._mmap = None
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    raise OSError("Not a bzip2 file")
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data = self._mmap
+        else:
+            self._data = source
+
+        try:
+            self._blocks = deque(_find_blocks(self._data))
+        except Exception:
+            if self._mmap is not None:
+                self._mmap.close()
+            # Nothing else to release, keep close() from running on collection
+            super().close()
+            raise
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._prefetch_blocks = prefetch_blocks or self._max_workers * 2
+        self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        self._pending: deque[Future] = deque()
+        self._buffer = memoryview(b"")
+
+    def _submit_blocks(self) -> None:
+        """Keep the configured number of blocks decompressing ahead of the reader"""
+
+        while self._blocks and len(self._pending) < self._prefetch_blocks:
+            block = self._blocks.popleft()
+            byte_start = block.bit_start // 8
+            byte_end = (block.bit_end + 7) // 8
+            task = (
+                bytes(self._data[byte_start:byte_end]),
+                block.bit_start % 8,
+                block.bit_end - block.bit_start,
+                block.level,
+            )
+            self._pending.append(self._executor.submit(_decompress_block, task))
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            self._submit_blocks()
+            if not self._pending:
+                return 0
+            self._buffer = memoryview(self._pending.popleft().result())
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._buffer = memoryview(b"")
+            self._data = b""
+            if self._mmap is not None:
+                self._mmap.close()
+        super().close()
@@ -0,0 +1,108 @@
+from typing import Optional
+
+from src.config import DocsSource
+from src.delta import generate_deltas
+from src.docs_downloader import download_and_extract
+from src.docs_processor import process_documentation, process_documentation_stream
+from src.fetch_scheduler import FetchScheduler
+from src.instrumentation import emit_hosts
+from src.search_index import update_search_index
+from src.utils import BandwidthLimiter, _create_session
+from src.version_updater import update_versions
+
+
+def run_pipeline(
+    sources: list[DocsSource],
+    stream: bool = False,
+    workers: int = 1,
+    decompress_workers: int = 1,
+    concurrency: int = 8,
+    rate: Optional[float] = 5.0,
+    bandwidth: Optional[float] = None,
+    output_format: str = "jsonl",
+    shard_size_mb: Optional[float] = None,
+    dedup: Optional[str] = None,
+    deltas: bool = False,
+    index: bool = False,
+) -> None:
+    """
+    Run update, download and processing stages for all sources at once
+
+    Every stage works on the combined jobs of all sources, so network requests share one
+    session, thread pool, fetch scheduler and bandwidth budget and docs files share one
+    process pool. The scheduler limits the rate and concurrency of requests per host
+
+    Args:
+        sources (list[DocsSource]): Docs sources to run
+        stream (bool): Stream archives straight into output files
+        workers (int): Number of processes parsing docs files
+        decompress_workers (int): Number of processes decompressing the blocks of each
+            extracted bzip2 archive, streamed archives are always read sequentially
+        concurrency (int): Number of concurrent network requests, also the maximum
+            per host
+        rate (float | None): Requests per second per host, None disables the limit
+        bandwidth (float | None): Combined download bandwidth limit in MB/s
+        output_format (str): Output format, 'jsonl', 'jsonl.gz', 'jsonl.zst' or 'parquet'
+        shard_size_mb (float | None): Size cap of output shards in MB
+        dedup (str | None): Cross-version dedup mode, 'references' or 'union'
+        deltas (bool): Write deltas between consecutive versions after processing
+        index (bool): Update the full-text search index with changed outputs
+    """
+
+    # Streamed archives are written concurrently, dedup needs them in version order
+    if stream and dedup is not None:
+        raise ValueError("Deduplication is not supported when streaming archives")
+    # Deltas compare full sections outputs, which dedup does not write
+    if deltas and dedup is not None:
+        raise ValueError("Deltas are not supported together with deduplication")
+
+    max_bandwidth = bandwidth * 1024**2 if bandwidth else None
+    jobs = [
+        (
+            source,
+            source.config_class(
+                max_workers=concurrency,
+                max_bandwidth=max_bandwidth,
+                streaming=stream,
+                process_workers=workers,
+                decompress_workers=decompress_workers,
+                output_format=output_format,
+                shard_size_mb=shard_size_mb,
+                dedup=dedup,
+            ),
+        )
+        for source in sources
+    ]
+    scheduler = FetchScheduler(
+        _create_session(concurrency),
+        requests_per_second=rate,
+        max_concurrency=concurrency,
+    )
+    limiter = BandwidthLimiter(max_bandwidth)
+
+    # Update versions
+    update_versions(jobs, scheduler, concurrency)
+
+    # Stream docs straight from archives into output files
+    if stream:
+        process_documentation_stream(jobs, scheduler, concurrency, limiter)
+    else:
+        # Download and extract docs
+        download_and_extract(jobs, scheduler, concurrency, limiter)
+
+    # Report request latency of every host
+    if scheduler.host_stats():
+        print(scheduler.summary())
+        emit_hosts(scheduler.host_stats())
+
+    # Process docs files
+    if not stream:
+        process_documentation(jobs, workers)
+
+    # Compare consecutive versions
+    if deltas:
+        generate_deltas(jobs)
+
+    # Index sections for search
+    if index:
+        update_search_index([config.base_dir for _, config in jobs])
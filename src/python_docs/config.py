@@ -1,26 +1,15 @@
-import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+
+from src.config import DocsConfig as BaseDocsConfig
 
 
 @dataclass
-class DocsConfig:
+class DocsConfig(BaseDocsConfig):
     """Configuration"""
 
     project_name: str = "python_docs"
     max_retry_attempts: int = 5
     update_threshold_days: int = 365
-    section_separators: list[str] = field(default_factory=lambda: ["*", "=", "-"])
-
-    def __post_init__(self):
-        # Paths
-        self.base_dir = os.path.join(os.getcwd(), "src", self.project_name)
-        self.downloads_path = os.path.join(self.base_dir, "downloads")
-        self.extracted_path = os.path.join(self.base_dir, "extracted")
-        self.output_path = os.path.join(self.base_dir, "data")
-        self.versions_file = os.path.join(self.base_dir, "versions.yaml")
-
-        if not os.path.exists(self.versions_file):
-            raise ValueError(f"Versions file does not exist: {self.versions_file}")
 
 
 @dataclass
@@ -32,12 +21,3 @@ class VersionMetadata:
     download_url: str
     specific_version: str
     retry_count: int = 0
-
-
-@dataclass
-class Section:
-    """Metadata for sections"""
-
-    title: str
-    content: str
-    source_file: str
@@ -1,18 +1,22 @@
+from src.config import DocsSource
+from src.docs_processor import split_sections
+from src.pipeline import run_pipeline
+from src.python_docs import docs_processor, version_updater
 from src.python_docs.config import DocsConfig
-from src.python_docs.docs_downloader import download_and_extract
-from src.python_docs.docs_processor import process_documentation
-from src.python_docs.version_updater import update_versions
 
+SOURCE = DocsSource(
+    name="python",
+    config_class=DocsConfig,
+    discover_versions=version_updater.discover_versions,
+    parse_version_page=version_updater.parse_version_page,
+    build_version_entry=version_updater.build_version_entry,
+    output_groups=docs_processor.output_groups,
+    stream_output=docs_processor.stream_output,
+    segment=split_sections,
+    version_outputs=docs_processor.version_outputs,
+)
 
-def main():
-    """Main execution flow"""
-    config = DocsConfig()
-
-    # Update versions
-    update_versions(config)
 
-    # Download and extract docs
-    download_and_extract(config)
-
-    # Process docs files
-    process_documentation(config)
+def main(stream: bool = False, workers: int = 1):
+    """Main execution flow"""
+    run_pipeline([SOURCE], stream=stream, workers=workers)
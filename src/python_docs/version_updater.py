@@ -1,13 +1,14 @@
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
-import requests
-import yaml
-from bs4 import BeautifulSoup
-
+from src.config import VersionCheck
+from src.page_extractor import extract_page
 from src.python_docs.config import DocsConfig, VersionMetadata
 from src.utils import _parse_update_date
 
+# Substring of the href of the plain text docs download link
+DOWNLOAD_LINK_MARKER = "-docs-text.tar.bz2"
+
 
 def _is_version_outdated(last_update: datetime, update_threshold_days: int) -> bool:
     """Check if version is older than update threshold"""
@@ -15,16 +16,15 @@ def _is_version_outdated(last_update: datetime, update_threshold_days: int) -> b
     return last_update < datetime.now() - timedelta(days=update_threshold_days)
 
 
-def _extract_specific_version(soup: BeautifulSoup, version: str) -> Optional[str]:
+def _extract_specific_version(title: Optional[str], version: str) -> Optional[str]:
     """Extract specific Python version from docs page title"""
 
     try:
-        title_tag = soup.find("title")
-        if not title_tag or not title_tag.text:
+        if not title:
             return None
 
-        title_words = title_tag.text.split()
-        if version in title_tag.text:
+        title_words = title.split()
+        if version in title:
             # Handle version format like 'v3.8.1' or '3.8.1'
             version_text = title_words[3]
             return version_text[1:] if version_text.startswith("v") else version_text
@@ -36,13 +36,12 @@ def _extract_specific_version(soup: BeautifulSoup, version: str) -> Optional[str
         return None
 
 
-def _find_download_link(soup: BeautifulSoup, version: str) -> Optional[str]:
-    """Find docs download link from the page"""
+def _find_download_link(links: list[str], version: str) -> Optional[str]:
+    """Find docs download link among the links of the page"""
 
     try:
-        for link in soup.find_all("a", href=True):
-            href: str = link["href"]
-            if "-docs-text.tar.bz2" in href:
+        for href in links:
+            if DOWNLOAD_LINK_MARKER in href:
                 # Handle relative and absolute URLs
                 if href.startswith("archives"):
                     return f"https://docs.python.org/{version}/{href}"
@@ -54,56 +53,55 @@ def _find_download_link(soup: BeautifulSoup, version: str) -> Optional[str]:
         return None
 
 
+def parse_version_page(content: bytes, check: VersionCheck) -> dict[str, Optional[str]]:
+    """Parse last update date, specific version and download link from docs page"""
+
+    version = check.label
+    # Last update date is the first bold text after the first paragraph
+    page = extract_page(
+        content, ["title", "update_text", "links"], DOWNLOAD_LINK_MARKER
+    )
+
+    return {
+        "last_update": (
+            _parse_update_date(page.update_text.strip())
+            if page.update_text is not None
+            else None
+        ),
+        "specific_version": _extract_specific_version(page.title, version),
+        "download_url": _find_download_link(page.links, version),
+    }
+
+
 def _extract_version_info(
     config: DocsConfig,
     version: str,
-    url: str,
     current_metadata: dict[str, Any],
+    page_info: dict[str, Optional[str]],
 ) -> VersionMetadata:
-    """Extract version information from Python docs page"""
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Extract last update date
-        p_element = soup.find("p")
-        if p_element is not None:
-            update_element = p_element.find_next("b")
-
-        last_updated = (
-            _parse_update_date(update_element.text.strip()) if update_element else None
-        )
+    """Extract version information from parsed Python docs page"""
 
-        if last_updated:
-            if _is_version_outdated(
-                datetime.fromisoformat(last_updated),
-                config.update_threshold_days,
-            ):
-                return _handle_outdated_version(version, current_metadata)
-
-        # Extract specific version and download link
-        specific_version = _extract_specific_version(soup, version)
-        download_url = _find_download_link(soup, version)
-
-        return VersionMetadata(
-            last_checked=datetime.now().date().isoformat(),
-            last_update=last_updated or current_metadata["last_update"],
-            download_url=download_url or current_metadata["plain_text_link"],
-            specific_version=specific_version or current_metadata["specific"],
-            retry_count=0,
-        )
+    last_updated = page_info["last_update"]
+    if last_updated:
+        if _is_version_outdated(
+            datetime.fromisoformat(last_updated),
+            config.update_threshold_days,
+        ):
+            return _handle_outdated_version(version, current_metadata)
 
-    except Exception as e:
-        print(f"Error processing version {version}: {e}")
-        return _handle_version_error(current_metadata, config.max_retry_attempts)
+    return VersionMetadata(
+        last_checked=datetime.now().date().isoformat(),
+        last_update=last_updated or current_metadata["last_update"],
+        download_url=page_info["download_url"] or current_metadata["plain_text_link"],
+        specific_version=page_info["specific_version"] or current_metadata["specific"],
+        retry_count=0,
+    )
 
 
 def _handle_outdated_version(version, metadata: dict[str, Any]) -> VersionMetadata:
     """Handle outdated version by incrementing retry count"""
 
-    print(f"Skipping version {version}: outdated ({metadata["last_update"]})")
+    print(f"Skipping version {version}: outdated ({metadata['last_update']})")
 
     return VersionMetadata(
         last_checked=datetime.now().date().isoformat(),
@@ -135,13 +133,13 @@ def _handle_version_error(
     )
 
 
-def update_versions(config: DocsConfig) -> None:
-    """Update version information for all Python versions"""
-
-    with open(config.versions_file, "r") as file:
-        data: dict = yaml.safe_load(file)
+def discover_versions(
+    config: DocsConfig,
+    data: dict,
+) -> tuple[list[VersionCheck], dict[str, dict]]:
+    """List docs pages to check for all Python versions"""
 
-    updated_versions = {}
+    checks = []
     unchanged_versions = {}
     for version, metadata in dict(data["versions"]).items():
         major, minor = str(version).split(".")
@@ -161,19 +159,36 @@ def update_versions(config: DocsConfig) -> None:
             }
             continue
 
-        url = str(data["url"]).format(version=clean_version)
+        checks.append(
+            VersionCheck(
+                key=f"{int(major):02d}.{int(minor):02d}",
+                label=clean_version,
+                url=str(data["url"]).format(version=clean_version),
+                metadata=metadata,
+            )
+        )
+
+    return checks, unchanged_versions
 
-        updated_info = _extract_version_info(config, clean_version, url, metadata)
-        updated_versions[f"{int(major):02d}.{int(minor):02d}"] = {
-            "last_checked": updated_info.last_checked,
-            "last_update": updated_info.last_update,
-            "plain_text_link": updated_info.download_url,
-            "specific": updated_info.specific_version,
-            "skip": updated_info.retry_count,
-        }
 
-        print(f"Finished checking {clean_version}")
+def build_version_entry(
+    config: DocsConfig,
+    check: VersionCheck,
+    page_info: Optional[dict[str, Optional[str]]],
+) -> dict[str, Any]:
+    """Build versions.yaml entry from parsed page info or from a failed check"""
+
+    if page_info is None:
+        updated_info = _handle_version_error(check.metadata, config.max_retry_attempts)
+    else:
+        updated_info = _extract_version_info(
+            config, check.label, check.metadata, page_info
+        )
 
-    data["versions"] = {**unchanged_versions, **updated_versions}
-    with open(config.versions_file, "w") as file:
-        yaml.dump(data, file, default_flow_style=False)
+    return {
+        "last_checked": updated_info.last_checked,
+        "last_update": updated_info.last_update,
+        "plain_text_link": updated_info.download_url,
+        "specific": updated_info.specific_version,
+        "skip": updated_info.retry_count,
+    }
@@ -0,0 +1,367 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Optional
+
+from src.instrumentation import measure
+from src.shard_writer import INDEX_FILE, read_output, shard_directory
+
+# Rows of an output get rowids from a block of their own, so an output is replaced
+# by deleting a rowid range instead of scanning the whole index
+ROWID_BLOCK = 2**32
+
+# Output kinds holding full sections
+INDEXED_KINDS = ["sections", "union"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    id INTEGER PRIMARY KEY,
+    lang TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    UNIQUE (lang, config_name)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    section_title,
+    section_content,
+    file_name UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def default_index_file() -> str:
+    """Path of the search index shared by all langs"""
+
+    return os.path.join(os.getcwd(), "src", "search_index.sqlite")
+
+
+def _connect(index_file: str) -> sqlite3.Connection:
+    """Open search index, creating its tables if missing"""
+
+    directory = os.path.dirname(index_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(index_file)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _load_manifest(lang_docs_dir: str) -> dict[str, dict[str, Any]]:
+    """Load dataset manifest of a lang docs directory, empty if missing or unreadable"""
+
+    # Read here instead of through src.utils, which imports the network dependencies
+    try:
+        with open(
+            os.path.join(lang_docs_dir, "dataset_manifest.json"), "r", encoding="utf-8"
+        ) as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _local_output_file(lang_docs_dir: str, entry: dict[str, Any]) -> str:
+    """Local single JSONL output path of a dataset manifest entry"""
+
+    # Paths in repo are 'data/<lang_docs>/<relative>', shards end in '/*.<format>'
+    relative = entry["path"].split("/", 2)[2]
+    if "*" in relative:
+        relative = os.path.dirname(relative) + ".jsonl"
+    return os.path.join(lang_docs_dir, "data", *relative.split("/"))
+
+
+def _index_output(
+    connection: sqlite3.Connection,
+    lang: str,
+    entry: dict[str, Any],
+    output_file: str,
+    output_id: Optional[int],
+) -> int:
+    """Replace indexed rows of an output with its current records in one transaction"""
+
+    with connection:
+        if output_id is None:
+            output_id = connection.execute(
+                "INSERT INTO outputs (lang, config_name, sha256, rows) VALUES (?, ?, '', 0)",
+                (lang, entry["config_name"]),
+            ).lastrowid
+        else:
+            connection.execute(
+                "DELETE FROM sections WHERE rowid >= ? AND rowid < ?",
+                (output_id * ROWID_BLOCK, (output_id + 1) * ROWID_BLOCK),
+            )
+
+        cursor = connection.executemany(
+            "INSERT INTO sections (rowid, section_title, section_content, file_name) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (
+                    output_id * ROWID_BLOCK + row,
+                    record["section_title"],
+                    record["section_content"],
+                    record["file_name"],
+                )
+                for row, record in enumerate(read_output(output_file))
+            ),
+        )
+        connection.execute(
+            "UPDATE outputs SET sha256 = ?, rows = ? WHERE id = ?",
+            (entry["sha256"], cursor.rowcount, output_id),
+        )
+
+    return cursor.rowcount
+
+
+def _remove_indexed_output(connection: sqlite3.Connection, output_id: int) -> None:
+    """Delete an output and its rows from the index"""
+
+    with connection:
+        connection.execute(
+            "DELETE FROM sections WHERE rowid >= ? AND rowid < ?",
+            (output_id * ROWID_BLOCK, (output_id + 1) * ROWID_BLOCK),
+        )
+        connection.execute("DELETE FROM outputs WHERE id = ?", (output_id,))
+
+
+def update_search_index(
+    lang_docs_dirs: list[str],
+    index_file: Optional[str] = None,
+) -> None:
+    """
+    Bring full-text search index in line with the outputs of lang docs directories
+
+    Outputs are taken from each directory's dataset manifest. Only outputs whose
+    content hash differs from the indexed one are reindexed, each in one bulk
+    transaction, outputs no longer present are dropped
+
+    Args:
+        lang_docs_dirs (list[str]): Lang docs directories (e.g. 'src/python_docs')
+        index_file (str | None): Path of search index, shared index if None
+    """
+
+    connection = _connect(index_file or default_index_file())
+    changed = False
+    try:
+        for lang_docs_dir in lang_docs_dirs:
+            lang = os.path.basename(lang_docs_dir).removesuffix("_docs")
+            manifest = _load_manifest(lang_docs_dir)
+            indexed = {
+                config_name: (output_id, sha256)
+                for output_id, config_name, sha256 in connection.execute(
+                    "SELECT id, config_name, sha256 FROM outputs WHERE lang = ?",
+                    (lang,),
+                )
+            }
+
+            current = set()
+            for entry in manifest.values():
+                output_file = _local_output_file(lang_docs_dir, entry)
+                if entry.get("kind") not in INDEXED_KINDS or not (
+                    os.path.exists(output_file)
+                    or os.path.exists(
+                        os.path.join(shard_directory(output_file), INDEX_FILE)
+                    )
+                ):
+                    continue
+
+                current.add(entry["config_name"])
+                output_id, sha256 = indexed.get(entry["config_name"], (None, None))
+                if sha256 == entry["sha256"]:
+                    continue
+
+                with measure("index", f"{lang}_docs/{entry['config_name']}") as event:
+                    event.records = _index_output(
+                        connection, lang, entry, output_file, output_id
+                    )
+                changed = True
+                print(f"Indexed {entry['config_name']} ({event.records} sections)")
+
+            for config_name, (output_id, _) in indexed.items():
+                if config_name not in current:
+                    _remove_indexed_output(connection, output_id)
+                    changed = True
+                    print(f"Removed {config_name} from search index")
+
+        # Merge index segments written by the bulk inserts
+        if changed:
+            with connection:
+                connection.execute(
+                    "INSERT INTO sections (sections) VALUES ('optimize')"
+                )
+    finally:
+        connection.close()
+
+
+def _match_query(query: str) -> str:
+    """Quote every term of a plain text query so punctuation is matched literally"""
+
+    return " ".join(
+        '"' + term.replace('"', '""') + '"' for term in query.split() if term
+    )
+
+
+def _version_pattern(version: str) -> str:
+    """LIKE pattern of config names of a version, zero padding numeric parts"""
+
+    if re.fullmatch(r"\d+(\.\d+)*", version):
+        version = ".".join(f"{int(part):02d}" for part in version.split("."))
+    return f"%-{version}%"
+
+
+def search(
+    query: str,
+    lang: Optional[str] = None,
+    version: Optional[str] = None,
+    limit: int = 10,
+    index_file: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    """
+    Search indexed sections ranked by BM25, with title matches weighted higher
+
+    Args:
+        query (str): Plain text query, every term has to match
+        lang (str | None): Only search outputs of this lang (e.g. 'python')
+        version (str | None): Only search outputs of this version (e.g. '3.12')
+        limit (int): Maximum number of results
+        index_file (str | None): Path of search index, shared index if None
+
+    Returns:
+        list[dict[str, Any]]: Results with lang, config name, file name, section
+            title, snippet and rank
+
+    Raises:
+        ValueError: If the query has no terms
+        FileNotFoundError: If the search index was not built yet
+    """
+
+    if not query.split():
+        raise ValueError("Search query is empty")
+
+    index_file = index_file or default_index_file()
+    if not os.path.exists(index_file):
+        raise FileNotFoundError(
+            f"Search index does not exist: {index_file}. Build it with "
+            "'lang <lang> --index' or 'search <query> --reindex'"
+        )
+
+    filters = []
+    parameters: list[Any] = [_match_query(query)]
+    if lang is not None:
+        filters.append("outputs.lang = ?")
+        parameters.append(lang)
+    if version is not None:
+        filters.append("outputs.config_name LIKE ?")
+        parameters.append(_version_pattern(version))
+    parameters.append(limit)
+
+    connection = _connect(index_file)
+    try:
+        rows = connection.execute(
+            f"""
+            SELECT outputs.lang, outputs.config_name, sections.file_name,
+                sections.section_title,
+                snippet(sections, 1, '[', ']', '...', 16),
+                bm25(sections, 10.0, 1.0) AS rank
+            FROM sections
+            JOIN outputs ON outputs.id = sections.rowid / {ROWID_BLOCK}
+            WHERE sections MATCH ? {"".join(f"AND {item} " for item in filters)}
+            ORDER BY rank
+            LIMIT ?
+            """,
+            parameters,
+        ).fetchall()
+    finally:
+        connection.close()
+
+    return [
+        {
+            "lang": row[0],
+            "config_name": row[1],
+            "file_name": row[2],
+            "section_title": row[3],
+            "snippet": row[4],
+            "rank": row[5],
+        }
+        for row in rows
+    ]
+
+
+def search_command(
+    query: str,
+    lang: Optional[str] = None,
+    version: Optional[str] = None,
+    limit: int = 10,
+    reindex: bool = False,
+) -> None:
+    """
+    Print ranked search results, optionally refreshing the index first
+
+    Args:
+        query (str): Plain text query, every term has to match
+        lang (str | None): Only search outputs of this lang (e.g. 'python')
+        version (str | None): Only search outputs of this version (e.g. '3.12')
+        limit (int): Maximum number of results
+        reindex (bool): Update index from local outputs of all langs before searching
+    """
+
+    if reindex:
+        update_search_index(
+            sorted(glob.glob(os.path.join(os.getcwd(), "src", "*_docs")))
+        )
+
+    start_time = time.perf_counter()
+    try:
+        results = search(query, lang, version, limit)
+    except (ValueError, FileNotFoundError) as e:
+        print(e)
+        return
+    elapsed = time.perf_counter() - start_time
+
+    for result in results:
+        print(
+            f"{result['config_name']}  {result['file_name']}  "
+            f"{result['section_title']}\n    {' '.join(result['snippet'].split())}"
+        )
+    print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Search processed docs sections",
+    )
+    parser.add_argument(
+        "query",
+        type=str,
+        help="Plain text query, every term has to match",
+    )
+    parser.add_argument(
+        "--lang",
+        type=str,
+        help="Only search docs of this lang (e.g. 'python')",
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        help="Only search docs of this version (e.g. '3.12')",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of results",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Update the index from local outputs of all langs before searching",
+    )
+    args = parser.parse_args()
+
+    search_command(args.query, args.lang, args.version, args.limit, args.reindex)
@@ -0,0 +1,103 @@
+import mmap
+import os
+import re
+from functools import lru_cache
+from typing import Iterator, Sequence
+
+
+@lru_cache
+def _separator_pattern(separators: tuple[str, ...]) -> re.Pattern[bytes]:
+    """Compile pattern matching any run of four separator characters"""
+
+    return re.compile(b"|".join(re.escape((sep * 4).encode()) for sep in separators))
+
+
+def _is_separator_line(line: str, separators: Sequence[str]) -> bool:
+    """Check if stripped line is a section separator"""
+
+    return any(line.startswith(sep * 4) for sep in separators)
+
+
+def _separator_lines(
+    buffer: bytes,
+    separators: Sequence[str],
+) -> list[tuple[int, int]]:
+    """Find start and end offsets of all separator lines in buffer"""
+
+    found = []
+    last_line_start = -1
+    for match in _separator_pattern(tuple(separators)).finditer(buffer):
+        line_start = buffer.rfind(b"\n", 0, match.start()) + 1
+
+        # First line never counts as separator, other lines are checked once
+        if line_start == 0 or line_start == last_line_start:
+            continue
+        last_line_start = line_start
+
+        line_end = buffer.find(b"\n", match.end())
+        if line_end == -1:
+            line_end = len(buffer)
+
+        line = buffer[line_start:line_end].decode("utf-8").strip()
+        if _is_separator_line(line, separators):
+            found.append((line_start, line_end))
+
+    return found
+
+
+def _clean_content(raw: bytes) -> str:
+    """Strip every line of raw section content and the content as a whole"""
+
+    return "\n".join([line.strip() for line in raw.decode("utf-8").split("\n")]).strip()
+
+
+def iter_sections(
+    buffer: bytes,
+    separators: Sequence[str],
+) -> Iterator[tuple[str, str]]:
+    """
+    Lazily split a docs file buffer into sections
+
+    A section title is the line above a separator underline, its content runs up to the
+    next separator line. Separator candidates are found with one compiled pattern over
+    the whole buffer instead of checking every line
+
+    Args:
+        buffer (bytes): UTF-8 encoded file content, may be a memory map
+        separators (Sequence[str]): Characters forming separator underlines
+
+    Yields:
+        tuple[str, str]: Section title and content
+    """
+
+    # Universal newlines, same as reading the file in text mode
+    if buffer.find(b"\r") != -1:
+        buffer = bytes(buffer).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    current_title = None
+    content_start = 0
+    for line_start, line_end in _separator_lines(buffer, separators):
+        if current_title:
+            yield current_title, _clean_content(buffer[content_start : line_start - 1])
+
+        title_start = buffer.rfind(b"\n", 0, line_start - 1) + 1
+        current_title = buffer[title_start : line_start - 1].decode("utf-8").strip()
+        content_start = line_end + 1
+
+    # Handle final section
+    if current_title:
+        yield current_title, _clean_content(buffer[content_start:])
+
+
+def iter_file_sections(
+    file_path: str,
+    separators: Sequence[str],
+) -> Iterator[tuple[str, str]]:
+    """Lazily split a memory-mapped docs file into sections"""
+
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from iter_sections(buffer, separators)
@@ -0,0 +1,381 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+from typing import Any, Iterable, Iterator, Optional, Self, Union
+
+from src.config import OUTPUT_FORMATS
+from src.jsonl_writer import INDEX_SUFFIX, JsonlWriter, parse_record, serialize_records
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+INDEX_FILE = "index.json"
+
+# Uncompressed bytes written between size cap checks of capped shards
+SIZE_CHECK_BYTES = 64 * 1024
+
+OutputWriter = Union[JsonlWriter, "ShardedWriter"]
+
+
+def is_sharded(output_format: str, shard_size_mb: Optional[float]) -> bool:
+    """Check if output is written as shard directory instead of a single JSONL file"""
+
+    return output_format != "jsonl" or shard_size_mb is not None
+
+
+def shard_directory(output_file: str) -> str:
+    """Directory holding shards of an output file"""
+
+    return output_file.removesuffix(".jsonl")
+
+
+def output_marker(
+    output_file: str,
+    output_format: str,
+    shard_size_mb: Optional[float],
+) -> str:
+    """File whose existence marks a completely written output"""
+
+    if is_sharded(output_format, shard_size_mb):
+        return os.path.join(shard_directory(output_file), INDEX_FILE)
+    return output_file
+
+
+class ShardedWriter:
+    """
+    Writer splitting records into compressed, size-capped shards with a shard index
+
+    Shards are named '<stem>-<index>.<format>' inside a directory named after the output
+    file stem. A new shard is started once the current one reaches the size cap, checked
+    every 64 KB of serialized records. Compressed JSONL is capped by compressed bytes,
+    Parquet by serialized JSON bytes as its size is only known once a shard is written.
+    'index.json' lists every shard with its records and bytes and is written last.
+    The content hash and uncompressed size cover the serialized JSON lines
+
+    Args:
+        output_file (str): Path of the single JSONL file this output replaces
+        output_format (str): One of 'jsonl', 'jsonl.gz', 'jsonl.zst' or 'parquet'
+        shard_size_mb (float | None): Size cap of a shard in MB, None for one shard
+        batch_size (int): Number of records serialized per batch
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        output_format: str,
+        shard_size_mb: Optional[float] = None,
+        batch_size: int = 1000,
+    ):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format: {output_format}. Available values: {', '.join(OUTPUT_FORMATS)}"
+            )
+        if output_format == "jsonl.zst" and zstandard is None:
+            raise ValueError("Output format 'jsonl.zst' requires 'zstandard' package")
+        if output_format == "parquet" and pyarrow is None:
+            raise ValueError("Output format 'parquet' requires 'pyarrow' package")
+
+        self.file_path = output_file
+        self.directory = shard_directory(output_file)
+        self.output_format = output_format
+        self.shard_size = shard_size_mb * 1024**2 if shard_size_mb else None
+        self.batch_size = batch_size
+        self.records = 0
+        self.bytes_written = 0
+        self.text_bytes = 0
+        self.shards: list[dict[str, Any]] = []
+
+        self._stem = os.path.basename(self.directory)
+        self._batch: list[dict[str, Any]] = []
+        self._digest = hashlib.sha256()
+        self._file = None
+        self._compressor = None
+        self._shard_open = False
+        self._shard_records = 0
+        self._shard_rows: list[dict[str, Any]] = []
+        self._shard_text_bytes = 0
+        self._closed = False
+        self._start_time = time.perf_counter()
+        self._elapsed = 0.0
+
+        # Outputs are rewritten as a whole, old shards must not linger
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Add a record to the current batch"""
+
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[dict[str, Any]]) -> None:
+        """Add records to the current batch"""
+
+        for record in records:
+            self.write(record)
+
+    def _shard_path(self) -> str:
+        """Path of the current shard"""
+
+        return os.path.join(
+            self.directory,
+            f"{self._stem}-{len(self.shards):05d}.{self.output_format}",
+        )
+
+    def _open_shard(self) -> None:
+        """Start a new shard file"""
+
+        self._shard_open = True
+        self._shard_records = 0
+        if self.output_format == "parquet":
+            self._shard_rows = []
+            self._shard_text_bytes = 0
+            return
+
+        # Shard stays open across writes until it is full or the writer is closed
+        self._file = open(self._shard_path(), "wb")  # noqa: SIM115
+        if self.output_format == "jsonl.gz":
+            # Fixed mtime keeps identical content byte-identical across runs
+            self._compressor = gzip.GzipFile(
+                fileobj=self._file, mode="wb", compresslevel=6, mtime=0
+            )
+        elif self.output_format == "jsonl.zst":
+            self._compressor = zstandard.ZstdCompressor(level=10).stream_writer(
+                self._file, closefd=False
+            )
+        else:
+            self._compressor = self._file
+
+    def _shard_size(self) -> int:
+        """Current size of the open shard used for the size cap"""
+
+        if self.output_format == "parquet":
+            return self._shard_text_bytes
+        return self._file.tell()
+
+    def _close_shard(self) -> None:
+        """Finish current shard and add it to the shard index"""
+
+        shard_path = self._shard_path()
+        if self.output_format == "parquet":
+            pyarrow.parquet.write_table(
+                pyarrow.Table.from_pylist(self._shard_rows),
+                shard_path,
+                compression="zstd",
+            )
+            self._shard_rows = []
+        else:
+            if self._compressor is not self._file:
+                self._compressor.close()
+            self._file.close()
+            self._file = None
+            self._compressor = None
+
+        self._shard_open = False
+        shard_bytes = os.path.getsize(shard_path)
+        self.bytes_written += shard_bytes
+        self.shards.append(
+            {
+                "file": os.path.basename(shard_path),
+                "records": self._shard_records,
+                "bytes": shard_bytes,
+            }
+        )
+
+    def _write_chunk(self, records: list[dict[str, Any]], data: bytes) -> None:
+        """Write records into the open shard, starting a new one when full"""
+
+        if not self._shard_open:
+            self._open_shard()
+
+        if self.output_format == "parquet":
+            self._shard_rows.extend(records)
+            self._shard_text_bytes += len(data)
+        else:
+            self._compressor.write(data)
+
+        self._digest.update(data)
+        self.text_bytes += len(data)
+        self._shard_records += len(records)
+        self.records += len(records)
+
+        if self.shard_size is None:
+            return
+
+        # Compressors hold back output, flush so file size reflects written records
+        if self._compressor is not None and self._compressor is not self._file:
+            self._compressor.flush()
+        if self._shard_size() >= self.shard_size:
+            self._close_shard()
+
+    def flush(self) -> None:
+        """Serialize current batch, checking the size cap every few kilobytes"""
+
+        if not self._batch:
+            return
+
+        if self.shard_size is None:
+            self._write_chunk(self._batch, serialize_records(self._batch))
+            self._batch.clear()
+            return
+
+        start = 0
+        chunk_bytes = []
+        chunk_size = 0
+        for end, record in enumerate(self._batch, 1):
+            line = serialize_records([record])
+            chunk_bytes.append(line)
+            chunk_size += len(line)
+            if chunk_size >= SIZE_CHECK_BYTES or end == len(self._batch):
+                self._write_chunk(self._batch[start:end], b"".join(chunk_bytes))
+                start = end
+                chunk_bytes = []
+                chunk_size = 0
+        self._batch.clear()
+
+    def close(self) -> None:
+        """Write remaining records, close last shard and write the shard index"""
+
+        if self._closed:
+            return
+
+        self.flush()
+        # Empty outputs still get one empty shard
+        if not self._shard_open and not self.shards:
+            self._open_shard()
+        if self._shard_open:
+            self._close_shard()
+
+        index = {
+            "format": self.output_format,
+            "records": self.records,
+            "bytes": self.bytes_written,
+            "shards": self.shards,
+        }
+        with open(os.path.join(self.directory, INDEX_FILE), "w") as file:
+            json.dump(index, file, indent=2)
+
+        self._closed = True
+        self._elapsed = time.perf_counter() - self._start_time
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 of serialized JSON lines written so far, independent of the format"""
+
+        return self._digest.hexdigest()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the writer has been or was open"""
+
+        return self._elapsed or time.perf_counter() - self._start_time
+
+    @property
+    def records_per_second(self) -> float:
+        """Records written per second while the writer was open"""
+
+        return self.records / max(self.elapsed, 1e-6)
+
+    def summary(self) -> str:
+        """Human readable summary of written records, bytes and shards"""
+
+        return (
+            f"{self.records} records, {self.bytes_written / 1024**2:.1f} MB "
+            f"in {len(self.shards)} {self.output_format} shards, "
+            f"{self.records_per_second:,.0f} records/s"
+        )
+
+
+def open_output_writer(
+    output_file: str,
+    output_format: str = "jsonl",
+    shard_size_mb: Optional[float] = None,
+) -> OutputWriter:
+    """
+    Open writer for an output file in the configured layout
+
+    Plain uncompressed output without size cap keeps the single JSONL file with an
+    offset index for random access, any other format or a size cap writes a shard
+    directory. The output of the other layout is removed so only one copy gets uploaded
+
+    Args:
+        output_file (str): Path of the single JSONL output file
+        output_format (str): One of 'jsonl', 'jsonl.gz', 'jsonl.zst' or 'parquet'
+        shard_size_mb (float | None): Size cap of a shard in MB
+
+    Returns:
+        JsonlWriter | ShardedWriter: Writer for the output
+    """
+
+    if is_sharded(output_format, shard_size_mb):
+        for file_path in (output_file, output_file + INDEX_SUFFIX):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        return ShardedWriter(output_file, output_format, shard_size_mb)
+
+    shutil.rmtree(shard_directory(output_file), ignore_errors=True)
+    return JsonlWriter(output_file, index_file=output_file + INDEX_SUFFIX)
+
+
+def read_output(output_file: str) -> Iterator[dict[str, Any]]:
+    """
+    Stream records of an output in whichever layout it was written
+
+    Only one layout of an output exists at a time, so the single JSONL file is read if
+    present, otherwise the shards in the order of the shard index
+
+    Args:
+        output_file (str): Path of the single JSONL output file
+
+    Yields:
+        dict[str, Any]: Records in written order
+    """
+
+    if os.path.exists(output_file):
+        with open(output_file, "rb") as file:
+            for line in file:
+                yield parse_record(line)
+        return
+
+    directory = shard_directory(output_file)
+    with open(os.path.join(directory, INDEX_FILE), "r", encoding="utf-8") as file:
+        index = json.load(file)
+
+    for shard in index["shards"]:
+        shard_path = os.path.join(directory, shard["file"])
+        if index["format"] == "parquet":
+            for batch in pyarrow.parquet.ParquetFile(shard_path).iter_batches():
+                yield from batch.to_pylist()
+            continue
+
+        with open(shard_path, "rb") as file:
+            if index["format"] == "jsonl.gz":
+                reader = gzip.GzipFile(fileobj=file, mode="rb")
+            elif index["format"] == "jsonl.zst":
+                reader = io.BufferedReader(
+                    zstandard.ZstdDecompressor().stream_reader(file)
+                )
+            else:
+                reader = file
+
+            for line in reader:
+                yield parse_record(line)
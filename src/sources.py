@@ -0,0 +1,64 @@
+from importlib import import_module
+from typing import Any
+
+from src.config import DocsSource
+
+# Entry point group other packages register docs sources under
+ENTRY_POINT_GROUP = "lang_docs.sources"
+
+# Built-in docs sources by command line name as 'module:attribute', imported on use
+BUILTIN_SOURCES = {
+    "python": "src.python_docs.python_docs:SOURCE",
+    "gnu": "src.gnu_docs.gnu_docs:SOURCE",
+}
+
+
+def resolve(target: str) -> Any:
+    """Import object referenced as 'module:attribute'"""
+
+    module_name, _, attribute = target.partition(":")
+    return getattr(import_module(module_name), attribute)
+
+
+def _entry_point_sources() -> dict[str, Any]:
+    """Docs source entry points of installed packages by name"""
+
+    # Scanning installed distributions is slow, only done when a source is not built in
+    from importlib.metadata import entry_points
+
+    return {
+        entry_point.name: entry_point
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+    }
+
+
+def source_names() -> list[str]:
+    """Names of built-in and entry point docs sources"""
+
+    return list(BUILTIN_SOURCES) + sorted(
+        set(_entry_point_sources()) - set(BUILTIN_SOURCES)
+    )
+
+
+def load_source(name: str) -> DocsSource:
+    """
+    Import docs source by command line name
+
+    Built-in sources take precedence over entry points of the same name
+
+    Args:
+        name (str): Source name (e.g. 'python', 'gnu')
+
+    Returns:
+        DocsSource: Docs source plugin
+    """
+
+    if name in BUILTIN_SOURCES:
+        return resolve(BUILTIN_SOURCES[name])
+
+    entry_point = _entry_point_sources().get(name)
+    if entry_point is None:
+        raise ValueError(
+            f"Specified docs lang is not supported. Available values: {', '.join(source_names() + ['all'])}"
+        )
+    return entry_point.load()
@@ -1,11 +1,89 @@
+import hashlib
+import io
+import json
 import os
 import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
 
 import requests
 import yaml
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from src.fetch_scheduler import FetchScheduler
+from src.instrumentation import measure
+from src.parallel_bz2 import ParallelBZ2File
+
+T = TypeVar("T")
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a file download"""
+
+    not_modified: bool
+    size: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by concurrent downloads to cap their combined bandwidth
+
+    Each consumer reserves bytes and sleeps until the bucket has refilled enough to cover
+    them, so the total rate across threads stays below the limit
+
+    Args:
+        max_bytes_per_second (float | None): Bandwidth budget, None disables limiting
+    """
+
+    def __init__(self, max_bytes_per_second: Optional[float] = None):
+        self.rate = max_bytes_per_second
+        self._lock = threading.Lock()
+        self._available = 0.0
+        self._last_refill = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        """Block until size bytes fit into the bandwidth budget"""
+
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            # Allow at most one second of burst
+            self._available = min(
+                self.rate, self._available + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            self._available -= size
+            wait = -self._available / self.rate if self._available < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+
+
+class _ThrottledReader(io.RawIOBase):
+    """Readable wrapper which charges every read against a bandwidth limiter"""
+
+    def __init__(self, raw, limiter: BandwidthLimiter):
+        self._raw = raw
+        self._limiter = limiter
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        self._limiter.consume(len(data))
+        buffer[: len(data)] = data
+        return len(data)
 
 
 def _get_huggingface_token(provided_token: str | None = None) -> str:
@@ -41,38 +119,432 @@ def _load_versions(versions_file: str) -> dict:
         return yaml.safe_load(file)["versions"]
 
 
-def _download_file(url: str, destination: str) -> bool:
-    """Download file from URL to specified destination"""
+def _load_json_file(file_path: str) -> dict:
+    """Load JSON data from file, returning empty dict if file is missing or unreadable"""
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        with open(file_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
 
-        with open(destination, "wb") as file:
-            file.write(response.content)
-        return True
 
-    except requests.RequestException as e:
+def _save_json_file(file_path: str, data: dict) -> None:
+    """Atomically write JSON data to file"""
+
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+    os.replace(temp_path, file_path)
+
+
+def _hash_values(*values) -> str:
+    """Hash JSON serializable values into a hex digest"""
+
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+
+def _hash_files(file_paths: Iterable[str]) -> str:
+    """Hash contents of files into a single hex digest"""
+
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        with open(file_path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _file_fingerprints(
+    file_paths: Iterable[str],
+    base_path: str,
+) -> dict[str, list[int]]:
+    """Map files relative to base path to their modification time and size"""
+
+    fingerprints = {}
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        fingerprints[os.path.relpath(file_path, base_path)] = [
+            stat.st_mtime_ns,
+            stat.st_size,
+        ]
+    return fingerprints
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    """Create HTTP session with a connection pool sized for concurrent requests"""
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _map_concurrently(
+    func: Callable[..., T],
+    items: Iterable,
+    max_workers: int,
+) -> list[T]:
+    """Run function over items on a bounded thread pool and return results in input order"""
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(func, items))
+
+
+def _validator_headers(cache_entry: Optional[dict]) -> dict[str, str]:
+    """Build conditional request headers from stored ETag and Last-Modified values"""
+
+    headers = {}
+    if cache_entry:
+        if cache_entry.get("etag"):
+            headers["If-None-Match"] = cache_entry["etag"]
+        if cache_entry.get("last_modified"):
+            headers["If-Modified-Since"] = cache_entry["last_modified"]
+    return headers
+
+
+def _conditional_get(
+    scheduler: FetchScheduler,
+    url: str,
+    cache_entry: Optional[dict],
+    timeout: tuple[float, float] = (10.0, 60.0),
+) -> requests.Response:
+    """Send GET request with validators from cache entry so unchanged pages return 304"""
+
+    return scheduler.get(url, headers=_validator_headers(cache_entry), timeout=timeout)
+
+
+def _update_http_cache(
+    http_cache: dict,
+    url: str,
+    response: requests.Response,
+    page_info: dict,
+) -> None:
+    """Store response validators and parsed page info for later conditional requests"""
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        http_cache.pop(url, None)
+        return
+
+    http_cache[url] = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "page_info": page_info,
+    }
+
+
+def _resume_validator(part_validators: dict) -> Optional[str]:
+    """Validator for If-Range of a partial file, weak ETags cannot be compared there"""
+
+    etag = part_validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return part_validators.get("last_modified")
+
+
+def _download_file(
+    url: str,
+    destination: str,
+    scheduler: Optional[FetchScheduler] = None,
+    timeout: tuple[float, float] = (10.0, 60.0),
+    chunk_size: int = 1024 * 1024,
+    validators: Optional[dict] = None,
+    limiter: Optional[BandwidthLimiter] = None,
+) -> Optional[DownloadResult]:
+    """
+    Stream file from URL to specified destination
+
+    Data is written in chunks to a '.part' file which is renamed to the destination once
+    complete. Validators of the response that started the partial file are kept in a
+    '.part.json' sidecar, an interrupted download is resumed with a Range request sent
+    with them as If-Range, so a remote file changed since then is fetched from the start
+
+    Args:
+        url (str): URL of the file
+        destination (str): Path where the file is saved
+        scheduler (FetchScheduler | None): Scheduler applying per-host limits and retries
+        timeout (tuple[float, float]): Connect and read timeouts in seconds
+        chunk_size (int): Number of bytes written per chunk
+        validators (dict | None): Stored 'etag' and 'last_modified' of existing destination
+        limiter (BandwidthLimiter | None): Shared bandwidth budget charged per chunk
+
+    Returns:
+        DownloadResult | None: Download outcome, None if download failed
+    """
+
+    http = scheduler or requests
+    partial_path = f"{destination}.part"
+    partial_validators_path = f"{partial_path}.json"
+
+    try:
+        start_time = time.perf_counter()
+        received = 0
+
+        # A stale partial file is removed and the download restarted once its response
+        # is closed, as a streamed response holds its scheduler slot until then
+        stale = True
+        while stale:
+            stale = False
+            resume_from = (
+                os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+            )
+            part_validators = (
+                _load_json_file(partial_validators_path) if resume_from else {}
+            )
+
+            # Partial file without validators cannot be checked against the remote file
+            if resume_from and _resume_validator(part_validators) is None:
+                resume_from = 0
+
+            if resume_from:
+                headers = {
+                    "Range": f"bytes={resume_from}-",
+                    "If-Range": _resume_validator(part_validators),
+                }
+            elif os.path.exists(destination):
+                headers = _validator_headers(validators)
+            else:
+                headers = {}
+
+            with http.get(
+                url, headers=headers, stream=True, timeout=timeout
+            ) as response:
+                # Existing destination is identical to remote file
+                if response.status_code == 304:
+                    return DownloadResult(
+                        not_modified=True,
+                        size=os.path.getsize(destination),
+                        etag=validators.get("etag") if validators else None,
+                        last_modified=validators.get("last_modified")
+                        if validators
+                        else None,
+                    )
+
+                if response.status_code == 416 and resume_from:
+                    # Partial file already holds the whole unchanged remote file
+                    content_range = response.headers.get("Content-Range", "")
+                    if content_range == f"bytes */{resume_from}":
+                        etag = part_validators.get("etag")
+                        last_modified = part_validators.get("last_modified")
+                    else:
+                        stale = True
+                else:
+                    response.raise_for_status()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+
+                    # Remote file changed or server ignored the Range header, start over
+                    if response.status_code != 206:
+                        resume_from = 0
+                        _save_json_file(
+                            partial_validators_path,
+                            {"etag": etag, "last_modified": last_modified},
+                        )
+                    else:
+                        etag = etag or part_validators.get("etag")
+                        last_modified = last_modified or part_validators.get(
+                            "last_modified"
+                        )
+
+                    with open(partial_path, "ab" if resume_from else "wb") as file:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if limiter is not None:
+                                limiter.consume(len(chunk))
+                            file.write(chunk)
+                            received += len(chunk)
+
+            if stale:
+                os.remove(partial_path)
+                os.remove(partial_validators_path)
+
+        os.replace(partial_path, destination)
+        os.remove(partial_validators_path)
+
+        elapsed = max(time.perf_counter() - start_time, 1e-6)
+        resumed = f", resumed at {resume_from / 1024**2:.1f} MB" if resume_from else ""
+        print(
+            f"Fetched {os.path.basename(destination)}: {received / 1024**2:.1f} MB in "
+            f"{elapsed:.1f}s ({received / 1024**2 / elapsed:.2f} MB/s{resumed})"
+        )
+        return DownloadResult(
+            not_modified=False,
+            size=os.path.getsize(destination),
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    except (requests.RequestException, OSError) as e:
         print(f"Download failed for {url}: {e}")
-        return False
+        return None
+
+
+def _sha256_file(file_path: str) -> str:
+    """Compute SHA-256 hex digest of a file"""
+
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
 
 
-def _extract_archive(archive_path: str, extract_path: str) -> bool:
-    """Extract downloaded archive to specified path"""
+def _extract_archive(
+    archive_path: str,
+    extract_path: str,
+    decompress_workers: int = 1,
+) -> Optional[list[str]]:
+    """Extract downloaded archive to specified path and return its top-level entries"""
 
     try:
-        if archive_path.endswith("bz2"):
+        if archive_path.endswith("bz2") and decompress_workers > 1:
+            with (
+                ParallelBZ2File(archive_path, max_workers=decompress_workers) as file,
+                tarfile.open(fileobj=file, mode="r|") as tar,
+            ):
+                tar.extractall(extract_path, filter="data")
+                return sorted({name.split("/")[0] for name in tar.getnames()})
+        elif archive_path.endswith("bz2"):
             with tarfile.open(archive_path, "r:bz2") as tar:
                 tar.extractall(extract_path, filter="data")
-            return True
+                return sorted({name.split("/")[0] for name in tar.getnames()})
         else:
             with tarfile.open(archive_path, "r:gz") as tar:
                 tar.extractall(extract_path, filter="data")
-            return True
+                return sorted({name.split("/")[0] for name in tar.getnames()})
 
-    except tarfile.TarError as e:
+    except (tarfile.TarError, OSError) as e:
         print(f"Extraction failed for {archive_path}: {e}")
-        return False
+        return None
+
+
+def _stream_archive_members(
+    url: str,
+    scheduler: Optional[FetchScheduler] = None,
+    timeout: tuple[float, float] = (10.0, 60.0),
+    limiter: Optional[BandwidthLimiter] = None,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Stream archive from URL and yield its regular files without writing to disk
+
+    The HTTP body is decompressed on the fly with tarfile stream mode, so download and
+    processing overlap and only one member is held in memory at a time
+
+    Args:
+        url (str): Archive download URL
+        scheduler (FetchScheduler | None): Scheduler applying per-host limits and retries
+        timeout (tuple[float, float]): Connect and read timeouts in seconds
+        limiter (BandwidthLimiter | None): Shared bandwidth budget charged per read
+
+    Yields:
+        tuple[str, bytes]: Member path inside the archive and its content
+    """
+
+    http = scheduler or requests
+
+    with http.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        body = response.raw
+        if limiter is not None:
+            body = _ThrottledReader(response.raw, limiter)
+
+        mode = "r|bz2" if url.endswith("bz2") else "r|gz"
+        with tarfile.open(fileobj=body, mode=mode) as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                member_file = tar.extractfile(member)
+                if member_file is not None:
+                    yield member.name, member_file.read()
+
+
+def _sync_archive(
+    url: str,
+    config,
+    manifest: dict[str, dict],
+    label: str,
+    scheduler: Optional[FetchScheduler] = None,
+    limiter: Optional[BandwidthLimiter] = None,
+) -> None:
+    """
+    Download and extract archive, skipping work recorded as done in the download manifest
+
+    The manifest entry stores the archive URL, size, validators and SHA-256 so unchanged
+    remote files are not fetched again and unchanged archives are not extracted again
+
+    Args:
+        url (str): Archive download URL
+        config (DocsConfig): Docs configuration with download and extraction paths
+        manifest (dict[str, dict]): Download manifest keyed by archive name, updated in place
+        label (str): Name used in progress messages
+        scheduler (FetchScheduler | None): Scheduler applying per-host limits and retries
+        limiter (BandwidthLimiter | None): Shared bandwidth budget of downloads
+    """
+
+    archive_name = os.path.basename(url)
+    archive_path = os.path.join(config.downloads_path, archive_name)
+
+    # Only trust entries that describe the archive currently on disk
+    entry = manifest.get(archive_name, {})
+    if (
+        entry.get("url") != url
+        or not os.path.exists(archive_path)
+        or os.path.getsize(archive_path) != entry.get("size")
+    ):
+        entry = {}
+
+    key = f"{config.project_name}/{label}"
+    with measure("download", key) as event:
+        result = _download_file(
+            url,
+            archive_path,
+            scheduler=scheduler,
+            timeout=(config.connect_timeout, config.read_timeout),
+            validators=entry,
+            limiter=limiter,
+        )
+        if result is None:
+            event.errors += 1
+            return
+        if not result.not_modified:
+            event.bytes = result.size
+
+    if result.not_modified:
+        print(f"Unchanged {label}")
+    else:
+        print(f"Downloaded {label}")
+        entry = {
+            **entry,
+            "url": url,
+            "size": result.size,
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+            "sha256": _sha256_file(archive_path),
+        }
+    manifest[archive_name] = entry
+
+    extracted_roots = entry.get("extracted_roots")
+    if (
+        entry.get("extracted_sha256") == entry["sha256"]
+        and extracted_roots
+        and all(
+            os.path.exists(os.path.join(config.extracted_path, root))
+            for root in extracted_roots
+        )
+    ):
+        print(f"Skipping extraction of {label}: archive unchanged")
+        return
+
+    with measure("extract", key) as event:
+        extracted_roots = _extract_archive(
+            archive_path, str(config.extracted_path), config.decompress_workers
+        )
+        event.bytes = entry["size"]
+        if extracted_roots is None:
+            event.errors += 1
+    if extracted_roots is not None:
+        entry["extracted_sha256"] = entry["sha256"]
+        entry["extracted_roots"] = extracted_roots
+        print(f"Extracted {label}")
 
 
 def _parse_update_date(date_text: str) -> Optional[str]:
@@ -0,0 +1,111 @@
+from typing import Any
+
+import requests
+import yaml
+
+from src.config import DocsConfig, DocsSource, VersionCheck
+from src.fetch_scheduler import FetchScheduler
+from src.instrumentation import measure
+from src.utils import (
+    _conditional_get,
+    _load_json_file,
+    _map_concurrently,
+    _save_json_file,
+    _update_http_cache,
+)
+
+
+def _check_version(
+    source: DocsSource,
+    config: DocsConfig,
+    check: VersionCheck,
+    scheduler: FetchScheduler,
+    http_cache: dict[str, dict],
+) -> dict[str, Any]:
+    """Check docs page of a version and build its updated versions.yaml entry"""
+
+    with measure("update", f"{config.project_name}/{check.label}") as event:
+        try:
+            cache_entry = http_cache.get(check.url)
+            response = _conditional_get(
+                scheduler,
+                check.url,
+                cache_entry,
+                timeout=(config.connect_timeout, config.read_timeout),
+            )
+
+            # Reuse parsed page info when page has not changed since last run
+            if response.status_code == 304 and cache_entry:
+                page_info = cache_entry["page_info"]
+            else:
+                response.raise_for_status()
+                event.bytes = len(response.content)
+                page_info = source.parse_version_page(response.content, check)
+                _update_http_cache(http_cache, check.url, response, page_info)
+
+            version_entry = source.build_version_entry(config, check, page_info)
+
+        # Failed request, or a page or cached entry missing the expected values
+        except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+            print(f"Error processing {check.label}: {e}")
+            event.errors += 1
+            version_entry = source.build_version_entry(config, check, None)
+
+    print(f"Finished checking {check.label}")
+    return version_entry
+
+
+def update_versions(
+    jobs: list[tuple[DocsSource, DocsConfig]],
+    scheduler: FetchScheduler,
+    max_workers: int,
+) -> None:
+    """
+    Update version information of all sources
+
+    Pages of every source are checked on one bounded thread pool, each source's results
+    are merged back into its versions.yaml in sorted order
+
+    Args:
+        jobs (list[tuple[DocsSource, DocsConfig]]): Sources to update with their configs
+        scheduler (FetchScheduler): Scheduler shared by all page checks
+        max_workers (int): Number of pages checked concurrently
+    """
+
+    source_data = []
+    pending_checks = []
+    for source, config in jobs:
+        with open(config.versions_file, "r") as file:
+            data: dict = yaml.safe_load(file)
+
+        checks, unchanged_versions = source.discover_versions(config, data)
+        http_cache = _load_json_file(config.http_cache_file)
+        source_data.append((data, unchanged_versions, http_cache))
+        pending_checks.extend((source, config, check, http_cache) for check in checks)
+
+    # Check pages concurrently, results come back in submission order
+    results = _map_concurrently(
+        lambda pending: _check_version(
+            pending[0], pending[1], pending[2], scheduler, pending[3]
+        ),
+        pending_checks,
+        max_workers,
+    )
+
+    for (source, config), (data, unchanged_versions, http_cache) in zip(
+        jobs, source_data
+    ):
+        updated_versions = {
+            check.key: version_entry
+            for (_, check_config, check, _), version_entry in zip(
+                pending_checks, results
+            )
+            if check_config is config
+        }
+
+        data["versions"] = dict(
+            sorted({**unchanged_versions, **updated_versions}.items())
+        )
+        with open(config.versions_file, "w") as file:
+            yaml.dump(data, file, default_flow_style=False)
+        _save_json_file(config.http_cache_file, http_cache)
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import requests
+from huggingface_hub import (
+    CommitInfo,
+    CommitOperationAdd,
+    CommitOperationDelete,
+    RepoFile,
+)
+
+from src.data_uploader import _upload_data_to_hf
+
+REPO_ID = "example-org/example-repo"
+
+
+def _blob_id(content: bytes) -> str:
+    """Git blob id of file content"""
+
+    return hashlib.sha1(f"blob {len(content)}\0".encode() + content).hexdigest()
+
+
+class FakeHfApi:
+    """
+    In-memory stand-in for HfApi holding the files of one dataset repository
+
+    Files in lfs_paths are listed with an LFS SHA-256 like large files on the Hub, the
+    others only with their git blob id. Commits are applied to the files right away,
+    the first lost_responses commits raise a connection error after being applied
+
+    Args:
+        files (dict[str, bytes]): Content of remote files keyed by path in repo
+        lfs_paths (set[str]): Remote files stored with LFS
+        lost_responses (int): Number of applied commits whose response is lost
+    """
+
+    def __init__(
+        self,
+        files: dict[str, bytes],
+        lfs_paths: set[str] = frozenset(),
+        lost_responses: int = 0,
+    ):
+        self.files = dict(files)
+        self.lfs_paths = set(lfs_paths)
+        self.lost_responses = lost_responses
+        self.commits: list[list] = []
+        self.revisions: list[str] = []
+        self.pull_requests = 0
+
+    def auth_check(self, repo_id: str, **kwargs) -> None:
+        pass
+
+    def list_repo_tree(self, repo_id: str, path_in_repo: str, **kwargs):
+        for path, content in sorted(self.files.items()):
+            if not path.startswith(f"{path_in_repo}/"):
+                continue
+            lfs = None
+            if path in self.lfs_paths:
+                lfs = {
+                    "size": len(content),
+                    "oid": hashlib.sha256(content).hexdigest(),
+                    "pointerSize": 128,
+                }
+            yield RepoFile(path=path, size=len(content), oid=_blob_id(content), lfs=lfs)
+
+    def preupload_lfs_files(self, repo_id: str, additions: list, **kwargs) -> None:
+        pass
+
+    def create_pull_request(self, repo_id: str, title: str, **kwargs):
+        self.pull_requests += 1
+        return SimpleNamespace(
+            num=self.pull_requests, git_reference=f"refs/pr/{self.pull_requests}"
+        )
+
+    def create_commit(self, repo_id: str, operations: list, **kwargs) -> CommitInfo:
+        if kwargs.get("create_pr"):
+            self.pull_requests += 1
+        for operation in operations:
+            if isinstance(operation, CommitOperationAdd):
+                with open(operation.path_or_fileobj, "rb") as file:
+                    self.files[operation.path_in_repo] = file.read()
+            else:
+                del self.files[operation.path_in_repo]
+        self.commits.append(operations)
+        self.revisions.append(kwargs.get("revision"))
+
+        if self.lost_responses:
+            self.lost_responses -= 1
+            raise requests.ConnectionError("Connection reset")
+
+        return CommitInfo(
+            commit_url=f"https://huggingface.co/datasets/{repo_id}/commit/{len(self.commits)}",
+            commit_message=kwargs["commit_message"],
+            commit_description="",
+            oid=str(len(self.commits)),
+            pr_url=f"https://huggingface.co/datasets/{repo_id}/discussions/{self.pull_requests}",
+        )
+
+
+class UploadDataTest(unittest.TestCase):
+    """Diff of local data files against a fake Hub repository"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(temp_dir.name)
+
+        self.data_path = os.path.join("src", "test_docs", "data")
+        os.makedirs(self.data_path)
+
+    def write_local(self, name: str, content: bytes) -> None:
+        with open(os.path.join(self.data_path, name), "wb") as file:
+            file.write(content)
+
+    def upload(self, client: FakeHfApi, **kwargs) -> None:
+        with redirect_stdout(StringIO()), patch("src.data_uploader.time.sleep"):
+            _upload_data_to_hf("test", REPO_ID, "token", client=client, **kwargs)
+
+    def committed_paths(self, client: FakeHfApi) -> list[tuple[str, str]]:
+        return [
+            (type(operation).__name__, operation.path_in_repo)
+            for commit in client.commits
+            for operation in commit
+        ]
+
+    def test_identical_files_are_not_committed(self):
+        self.write_local("a.jsonl", b"a\n")
+        self.write_local("b.jsonl", b"b\n")
+        client = FakeHfApi(
+            {"data/test_docs/a.jsonl": b"a\n", "data/test_docs/b.jsonl": b"b\n"},
+            lfs_paths={"data/test_docs/b.jsonl"},
+        )
+
+        self.upload(client)
+
+        self.assertEqual(client.commits, [])
+
+    def test_added_and_changed_files_are_committed(self):
+        self.write_local("same.jsonl", b"same\n")
+        self.write_local("changed.jsonl", b"new\n")
+        self.write_local("lfs.jsonl", b"new lfs\n")
+        self.write_local("added.jsonl", b"added\n")
+        client = FakeHfApi(
+            {
+                "data/test_docs/same.jsonl": b"same\n",
+                "data/test_docs/changed.jsonl": b"old\n",
+                "data/test_docs/lfs.jsonl": b"old lfs\n",
+            },
+            lfs_paths={"data/test_docs/lfs.jsonl"},
+        )
+
+        self.upload(client)
+
+        self.assertEqual(
+            sorted(self.committed_paths(client)),
+            [
+                ("CommitOperationAdd", "data/test_docs/added.jsonl"),
+                ("CommitOperationAdd", "data/test_docs/changed.jsonl"),
+                ("CommitOperationAdd", "data/test_docs/lfs.jsonl"),
+            ],
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join("src", "test_docs", "upload_journal.json"))
+        )
+
+    def test_local_only_files_are_not_uploaded(self):
+        self.write_local("a.jsonl", b"a\n")
+        self.write_local("a.jsonl.idx", b"\0" * 16)
+        self.write_local(".manifest.json", b"{}")
+        client = FakeHfApi({})
+
+        self.upload(client)
+
+        self.assertEqual(
+            self.committed_paths(client),
+            [("CommitOperationAdd", "data/test_docs/a.jsonl")],
+        )
+
+    def test_remote_only_files_are_kept_without_delete(self):
+        self.write_local("a.jsonl", b"a\n")
+        client = FakeHfApi(
+            {"data/test_docs/a.jsonl": b"a\n", "data/test_docs/old.jsonl": b"old\n"}
+        )
+
+        self.upload(client)
+
+        self.assertEqual(client.commits, [])
+        self.assertIn("data/test_docs/old.jsonl", client.files)
+
+    def test_remote_only_files_are_deleted_with_delete(self):
+        self.write_local("a.jsonl", b"a\n")
+        client = FakeHfApi(
+            {
+                "data/test_docs/a.jsonl": b"a\n",
+                "data/test_docs/old.jsonl": b"old\n",
+                "data/other_docs/b.jsonl": b"b\n",
+            }
+        )
+
+        self.upload(client, delete=True)
+
+        self.assertEqual(
+            self.committed_paths(client),
+            [(CommitOperationDelete.__name__, "data/test_docs/old.jsonl")],
+        )
+        self.assertIn("data/other_docs/b.jsonl", client.files)
+
+    def test_batches_are_committed_to_one_pull_request(self):
+        for name in ["a", "b", "c"]:
+            self.write_local(f"{name}.jsonl", f"{name}\n".encode())
+        client = FakeHfApi({}, lost_responses=1)
+
+        self.upload(client, batch_files=1)
+
+        self.assertEqual(client.pull_requests, 1)
+        self.assertEqual(set(client.revisions), {"refs/pr/1"})
+        self.assertEqual(
+            sorted(client.files),
+            [
+                "data/test_docs/a.jsonl",
+                "data/test_docs/b.jsonl",
+                "data/test_docs/c.jsonl",
+            ],
+        )
+
+    def test_interrupted_upload_resumes_on_its_pull_request(self):
+        self.write_local("a.jsonl", b"a\n")
+        self.write_local("b.jsonl", b"b\n")
+        journal = {
+            "repo_id": REPO_ID,
+            "pr_revision": "refs/pr/7",
+            "files": {
+                "data/test_docs/a.jsonl": hashlib.sha256(b"a\n").hexdigest(),
+            },
+        }
+        with open(os.path.join("src", "test_docs", "upload_journal.json"), "w") as file:
+            json.dump(journal, file)
+        client = FakeHfApi({})
+
+        self.upload(client)
+
+        self.assertEqual(client.pull_requests, 0)
+        self.assertEqual(client.revisions, ["refs/pr/7"])
+        self.assertEqual(
+            self.committed_paths(client),
+            [("CommitOperationAdd", "data/test_docs/b.jsonl")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from types import SimpleNamespace
+
+from src.config import DocsConfig
+from src.delta import generate_deltas
+from src.docs_processor import _open_writer, _record_output, _remove_output
+from src.shard_writer import read_output
+from src.utils import _load_json_file
+
+
+class GenerateDeltasTest(unittest.TestCase):
+    """Pairing of versions into deltas"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(temp_dir.name)
+
+        os.makedirs(os.path.join("src", "test_docs"))
+        with open(os.path.join("src", "test_docs", "versions.yaml"), "w") as file:
+            file.write("{}\n")
+
+        self.config = DocsConfig(project_name="test_docs")
+        self.versions = ["3.11", "3.12", "3.13"]
+        self.source = SimpleNamespace(
+            version_outputs=lambda config: [
+                self.output_file(version) for version in self.versions
+            ]
+        )
+
+    def output_file(self, version: str) -> str:
+        return os.path.join(self.config.output_path, f"python-{version}.jsonl")
+
+    def delta_file(self, version: str) -> str:
+        return os.path.join(
+            self.config.output_path, "deltas", f"python-{version}-delta.jsonl"
+        )
+
+    def write_version(self, version: str, titles: list[str]) -> None:
+        output_file = self.output_file(version)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with _open_writer(output_file, self.config) as writer:
+            writer.write_many(
+                {
+                    "section_title": title,
+                    "section_content": f"{title} of {version}",
+                    "file_name": "index.txt",
+                }
+                for title in titles
+            )
+        _record_output(self.config, output_file, writer)
+
+    def generate(self) -> None:
+        with redirect_stdout(StringIO()):
+            generate_deltas([(self.source, self.config)])
+
+    def test_consecutive_versions_are_paired(self):
+        self.write_version("3.11", ["a"])
+        self.write_version("3.12", ["a", "b"])
+        self.write_version("3.13", ["b"])
+
+        self.generate()
+
+        self.assertFalse(os.path.exists(self.delta_file("3.11")))
+        self.assertEqual(len(list(read_output(self.delta_file("3.12")))), 2)
+        self.assertEqual(len(list(read_output(self.delta_file("3.13")))), 2)
+
+    def test_missing_version_keeps_delta_of_its_successor(self):
+        self.write_version("3.11", ["a"])
+        self.write_version("3.12", ["a", "b"])
+        self.write_version("3.13", ["b"])
+        self.generate()
+        with open(self.delta_file("3.13"), "rb") as file:
+            delta = file.read()
+
+        _remove_output(self.config, self.output_file("3.12"))
+        self.generate()
+
+        with open(self.delta_file("3.13"), "rb") as file:
+            self.assertEqual(file.read(), delta)
+        self.assertTrue(os.path.exists(self.delta_file("3.12")))
+
+    def test_unlisted_version_loses_its_delta(self):
+        self.write_version("3.11", ["a"])
+        self.write_version("3.12", ["b"])
+        self.generate()
+
+        self.versions = ["3.12"]
+        self.generate()
+
+        self.assertFalse(os.path.exists(self.delta_file("3.12")))
+        self.assertNotIn(
+            "python-3.12-delta.jsonl",
+            _load_json_file(self.config.dataset_manifest_file),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Optional
+
+from src.config import DocsConfig, DocsSource, OutputGroup
+from src.docs_processor import process_documentation, split_sections
+from src.shard_writer import read_output
+
+
+def _output_groups(config: DocsConfig) -> list[OutputGroup]:
+    """One output group per extracted version directory"""
+
+    return [
+        OutputGroup(
+            output_file=os.path.join(config.output_path, f"{version}.jsonl"),
+            label=f"version {version}",
+            input_files=sorted(
+                os.path.join(config.extracted_path, version, name)
+                for name in os.listdir(os.path.join(config.extracted_path, version))
+            ),
+        )
+        for version in sorted(os.listdir(config.extracted_path))
+    ]
+
+
+SOURCE = DocsSource(
+    name="test",
+    config_class=DocsConfig,
+    discover_versions=None,
+    parse_version_page=None,
+    build_version_entry=None,
+    output_groups=_output_groups,
+    stream_output=None,
+    segment=split_sections,
+)
+
+
+class ProcessDocumentationTest(unittest.TestCase):
+    """Incremental rebuild of stale outputs only"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(temp_dir.name)
+
+        os.makedirs(os.path.join("src", "test_docs"))
+        with open(os.path.join("src", "test_docs", "versions.yaml"), "w") as file:
+            file.write("{}\n")
+        self.config = DocsConfig(project_name="test_docs")
+        for version in ("1.0", "2.0"):
+            self.write_input(version, f"Title {version}\n=====\nText\n")
+
+    def write_input(self, version: str, text: str) -> None:
+        directory = os.path.join(self.config.extracted_path, version)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "index.txt"), "w") as file:
+            file.write(text)
+
+    def process(self, config: Optional[DocsConfig] = None) -> str:
+        output = StringIO()
+        with redirect_stdout(output):
+            process_documentation([(SOURCE, config or self.config)])
+        return output.getvalue()
+
+    def output_file(self, version: str) -> str:
+        return os.path.join(self.config.output_path, f"{version}.jsonl")
+
+    def test_unchanged_outputs_are_skipped(self):
+        self.process()
+        modified = os.path.getmtime(self.output_file("1.0"))
+
+        log = self.process()
+
+        self.assertIn("Skipping version 1.0: output up to date", log)
+        self.assertIn("Skipping version 2.0: output up to date", log)
+        self.assertEqual(os.path.getmtime(self.output_file("1.0")), modified)
+
+    def test_changed_input_rebuilds_only_its_output(self):
+        self.process()
+        self.write_input("2.0", "New title\n=====\nNew text\n")
+
+        log = self.process()
+
+        self.assertIn("Skipping version 1.0: output up to date", log)
+        self.assertIn("Successfully processed version 2.0", log)
+        self.assertEqual(
+            [
+                record["section_title"]
+                for record in read_output(self.output_file("2.0"))
+            ],
+            ["New title"],
+        )
+
+    def test_missing_output_is_rebuilt(self):
+        self.process()
+        os.remove(self.output_file("1.0"))
+
+        log = self.process()
+
+        self.assertIn("Successfully processed version 1.0", log)
+        self.assertTrue(os.path.exists(self.output_file("1.0")))
+
+    def test_changed_config_rebuilds_all_outputs(self):
+        self.process()
+
+        log = self.process(
+            DocsConfig(project_name="test_docs", section_separators=["="])
+        )
+
+        self.assertNotIn("Skipping", log)
+
+
+if __name__ == "__main__":
+    unittest.main()
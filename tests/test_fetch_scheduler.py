@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+import requests
+
+from src.fetch_scheduler import FetchScheduler
+from src.utils import _download_file
+
+BODY = b"0123456789" * 100
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves BODY with a strong ETag, answering every Range request with 416"""
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.headers.get("Range"):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(BODY)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", '"current"')
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+class FakeSession:
+    """Session returning preset responses or raising preset errors in order"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def request(self, method: str, url: str, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def _response(status_code: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = BytesIO(b"")
+    return response
+
+
+class FetchSchedulerTest(unittest.TestCase):
+    """Host slots and concurrency limit of the fetch scheduler"""
+
+    def in_flight(self, scheduler: FetchScheduler) -> int:
+        return scheduler._hosts["example.org"].in_flight
+
+    def test_streamed_response_holds_slot_until_closed(self):
+        scheduler = FetchScheduler(FakeSession(_response(200)), max_concurrency=1)
+
+        response = scheduler.get("https://example.org/file", stream=True)
+        self.assertEqual(self.in_flight(scheduler), 1)
+
+        response.close()
+        response.close()
+        self.assertEqual(self.in_flight(scheduler), 0)
+
+    def test_retried_streamed_responses_free_their_slots(self):
+        scheduler = FetchScheduler(
+            FakeSession(_response(503), _response(200)), max_concurrency=1
+        )
+
+        with (
+            redirect_stdout(StringIO()),
+            patch("src.fetch_scheduler.time.sleep"),
+            scheduler.get("https://example.org/file", stream=True) as response,
+        ):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.in_flight(scheduler), 1)
+
+        self.assertEqual(self.in_flight(scheduler), 0)
+        self.assertEqual(scheduler.host_stats()["example.org"]["retries"], 1)
+
+    def test_unexpected_error_frees_slot_without_changing_limit(self):
+        scheduler = FetchScheduler(
+            FakeSession(requests.exceptions.InvalidURL("bad")), max_concurrency=4
+        )
+
+        with self.assertRaises(requests.exceptions.InvalidURL):
+            scheduler.get("https://example.org/file")
+
+        stats = scheduler.host_stats()["example.org"]
+        self.assertEqual(self.in_flight(scheduler), 0)
+        self.assertEqual(stats["concurrency"], 4)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(scheduler._hosts["example.org"].successes, 0)
+
+    def test_stale_partial_download_restarts_with_one_slot(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        destination = os.path.join(temp_dir.name, "docs.tar.bz2")
+        with open(f"{destination}.part", "wb") as file:
+            file.write(b"stale" * 300)
+        with open(f"{destination}.part.json", "w") as file:
+            json.dump({"etag": '"previous"'}, file)
+
+        scheduler = FetchScheduler(requests.Session(), max_concurrency=1)
+        results = []
+
+        def download() -> None:
+            with redirect_stdout(StringIO()):
+                results.append(
+                    _download_file(
+                        f"http://127.0.0.1:{server.server_port}/docs.tar.bz2",
+                        destination,
+                        scheduler,
+                        timeout=(5.0, 5.0),
+                    )
+                )
+
+        thread = threading.Thread(target=download, daemon=True)
+        thread.start()
+        thread.join(10)
+
+        self.assertFalse(thread.is_alive(), "Download waited on its own host slot")
+        self.assertEqual(results[0].etag, '"current"')
+        with open(destination, "rb") as file:
+            self.assertEqual(file.read(), BODY)
+        self.assertFalse(os.path.exists(f"{destination}.part.json"))
+        self.assertEqual(
+            scheduler._hosts[f"127.0.0.1:{server.server_port}"].in_flight, 0
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from src.gnu_docs.config import DocsConfig
+from src.gnu_docs.info_reader import iter_nodes, read_tag_table, split_nodes, walk_nodes
+
+PREAMBLE = b"This is manual.info, produced by makeinfo version 7.1.\n\n"
+
+NODES = [
+    (b"Top", b"(dir)", b"Overview", b"The manual.\n\n* Menu:\n"),
+    (b"Overview", b"Top", b"Usage", b"  What it does.  \n"),
+    (b"Usage", b"Top", b"", b"How to run it.\n\nMore text.\n"),
+]
+
+
+def _node(name: bytes, up: bytes, next_node: bytes, content: bytes) -> bytes:
+    header = b"File: manual.info,  Node: " + name
+    if next_node:
+        header += b",  Next: " + next_node
+    return b"\x1f\n" + header + b",  Up: " + up + b"\n\n" + content
+
+
+def _tag_table(offsets: list[tuple[bytes, int]]) -> bytes:
+    entries = b"".join(b"Node: %s\x7f%d\n" % entry for entry in offsets)
+    return b"\x1f\nTag Table:\n" + entries + b"Ref: anchor\x7f1\n\x1f\nEnd Tag Table\n"
+
+
+def _unsplit_manual() -> bytes:
+    """Manual in one file, with node offsets in its tag table"""
+
+    buffer = PREAMBLE
+    offsets = []
+    for node in NODES:
+        offsets.append((node[0], len(buffer)))
+        buffer += _node(*node)
+    return buffer + _tag_table(offsets)
+
+
+def _split_manual() -> tuple[bytes, dict[str, bytes]]:
+    """Main file with indirect and tag tables, and one subfile per node"""
+
+    subfiles = {}
+    indirect = []
+    offsets = []
+    # Offsets run on as if the subfiles followed the main file without preambles
+    offset = 1000
+    for index, node in enumerate(NODES, 1):
+        name = f"manual.info-{index}"
+        subfiles[name] = PREAMBLE + _node(*node)
+        indirect.append(b"%s: %d\n" % (name.encode(), offset))
+        offsets.append((node[0], offset))
+        offset += len(_node(*node))
+
+    main = PREAMBLE + b"\x1f\nIndirect:\n" + b"".join(indirect) + _tag_table(offsets)
+    return main, subfiles
+
+
+class InfoReaderTest(unittest.TestCase):
+    """Node by node reading of Info manuals through their tag table"""
+
+    def test_read_tag_table_leaves_out_anchors(self):
+        main, _ = _split_manual()
+
+        indirect, nodes = read_tag_table(main)
+
+        first, second = len(_node(*NODES[0])), len(_node(*NODES[1]))
+        self.assertEqual(
+            indirect,
+            [
+                ("manual.info-1", 1000),
+                ("manual.info-2", 1000 + first),
+                ("manual.info-3", 1000 + first + second),
+            ],
+        )
+        self.assertEqual([name for name, _ in nodes], ["Top", "Overview", "Usage"])
+
+    def test_tag_table_nodes_match_walked_nodes(self):
+        buffer = _unsplit_manual()
+
+        nodes = list(iter_nodes(buffer))
+
+        self.assertEqual(nodes, list(walk_nodes(buffer)))
+        self.assertEqual(
+            [header["Node"] for header, _ in nodes], ["Top", "Overview", "Usage"]
+        )
+        self.assertEqual(nodes[1][1], "What it does.")
+
+    def test_split_manual_matches_unsplit_manual(self):
+        main, subfiles = _split_manual()
+
+        nodes = list(iter_nodes(main, subfiles.__getitem__))
+
+        self.assertEqual(nodes, list(iter_nodes(_unsplit_manual())))
+
+    def test_stale_tag_table_falls_back_to_walking(self):
+        buffer = _unsplit_manual().replace(b"Node: Usage\x7f", b"Node: Gone\x7f")
+
+        self.assertEqual(list(iter_nodes(buffer)), list(walk_nodes(buffer)))
+
+    def test_extracted_split_manual_is_read_from_main_file(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(temp_dir.name)
+        os.makedirs(os.path.join("src", "gnu_docs"))
+        with open(os.path.join("src", "gnu_docs", "versions.yaml"), "w") as file:
+            file.write("{}\n")
+
+        config = DocsConfig()
+        os.makedirs(config.extracted_path)
+        main, subfiles = _split_manual()
+        for name, content in [("manual.info", main), *subfiles.items()]:
+            with open(os.path.join(config.extracted_path, name), "wb") as file:
+                file.write(content)
+
+        sections = list(split_nodes(main, "manual.info", config))
+
+        self.assertEqual(
+            [(section.title, section.metadata["node_next"]) for section in sections],
+            [("Top", "Overview"), ("Overview", "Usage"), ("Usage", None)],
+        )
+        self.assertEqual(
+            list(split_nodes(subfiles["manual.info-2"], "manual.info-2", config)), []
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import random
+import unittest
+
+from src.segmenter import iter_sections
+
+SEPARATORS = ["*", "=", "-"]
+
+
+def _line_sections(buffer: bytes, separators: list[str]) -> list[tuple[str, str]]:
+    """Line by line splitting the compiled pattern segmenter replaced"""
+
+    lines = io.TextIOWrapper(io.BytesIO(buffer), encoding="utf-8").readlines()
+    sections = []
+    current_title = None
+    current_content = []
+    for i in range(1, len(lines)):
+        current_line = lines[i].strip()
+        previous_line = lines[i - 1].strip()
+
+        if any(current_line.startswith(sep * 4) for sep in separators):
+            if current_title:
+                sections.append((current_title, "\n".join(current_content).strip()))
+            current_title = previous_line
+            current_content = []
+        else:
+            current_content.append(current_line)
+
+    if current_title:
+        sections.append((current_title, "\n".join(current_content).strip()))
+    return sections
+
+
+def _random_document(rng: random.Random) -> bytes:
+    """Docs-like text mixing titles, separators, blank lines and odd newlines"""
+
+    pieces = [
+        "Title",
+        "Ünïcode title",
+        "",
+        "   indented text  ",
+        "plain text line",
+        "****",
+        "====",
+        "-----",
+        "  ========  ",
+        "***",
+        "*=*=",
+        "==== not only separators",
+        "  em space  ",
+    ]
+    newline = rng.choice(["\n", "\r\n", "\r"])
+    lines = [rng.choice(pieces) for _ in range(rng.randint(0, 40))]
+    text = newline.join(lines)
+    if rng.random() < 0.5:
+        text += newline
+    return text.encode("utf-8")
+
+
+class IterSectionsTest(unittest.TestCase):
+    """Compiled pattern segmenter matches the line by line one"""
+
+    def test_examples(self):
+        buffer = (
+            b"Intro\n\nFirst\n=====\nalpha\n  beta  \n\nSecond\n------\ngamma\n"
+            b"Third\n****\n"
+        )
+
+        self.assertEqual(
+            list(iter_sections(buffer, SEPARATORS)),
+            [
+                ("First", "alpha\nbeta\n\nSecond"),
+                ("Second", "gamma\nThird"),
+                ("Third", ""),
+            ],
+        )
+
+    def test_first_line_is_never_a_separator(self):
+        self.assertEqual(list(iter_sections(b"====\ntext\n", SEPARATORS)), [])
+
+    def test_matches_line_splitting_on_random_documents(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            buffer = _random_document(rng)
+            with self.subTest(buffer=buffer):
+                self.assertEqual(
+                    list(iter_sections(buffer, SEPARATORS)),
+                    _line_sections(buffer, SEPARATORS),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()